@@ -12,7 +12,7 @@ import logging
 import os
 import threading
 import numpy as np
-from queue import Queue
+from queue import Queue, Full, Empty
 from concurrent.futures import ThreadPoolExecutor
 import atexit
 
@@ -32,15 +32,118 @@ if not COLLECTOR_ID:
 # ロガーの設定
 logger = setup_logger(__name__)
 
-# ===== ThreadPoolExecutorの設定 =====
-# 画像アップロード用（軽量・頻繁）
-image_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="image_upload")
+class DropOldestExecutor:
+    """
+    上限付きキューで動作するワーカープール
+
+    ThreadPoolExecutorはキューが無制限のため、S3が遅延するとタスクが溜まり続けメモリを圧迫する。
+    キューが満杯の場合は最も古いタスクを破棄して最新のタスクを投入する（フレームスキップと同じ考え方）。
+    """
+
+    def __init__(self, max_workers: int, maxsize: int, thread_name_prefix: str, on_drop=None):
+        """
+        初期化
+
+        Args:
+            max_workers: ワーカースレッド数
+            maxsize: キューの最大長
+            thread_name_prefix: スレッド名のプレフィックス
+            on_drop: タスク破棄時に破棄タスクの引数で呼ばれるコールバック（オプション）
+        """
+        self._queue = Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._on_drop = on_drop
+        self._thread_name_prefix = thread_name_prefix
+        self._shutdown = False
+        self.dropped_count = 0
+        self._threads = []
+        for i in range(max_workers):
+            thread = threading.Thread(
+                target=self._worker,
+                name=f"{thread_name_prefix}_{i}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _worker(self):
+        """キューからタスクを取り出して順次実行"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            fn, args, kwargs = item
+            try:
+                fn(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"{self._thread_name_prefix} タスク実行エラー: {e}")
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        タスクを投入（キューが満杯の場合は最も古いタスクを破棄）
+
+        Args:
+            fn: 実行する関数
+            *args, **kwargs: 関数に渡す引数
+        """
+        if self._shutdown:
+            raise RuntimeError(f"{self._thread_name_prefix} はシャットダウン済みです")
+
+        item = (fn, args, kwargs)
+        with self._lock:
+            while True:
+                try:
+                    self._queue.put_nowait(item)
+                    return
+                except Full:
+                    try:
+                        dropped = self._queue.get_nowait()
+                    except Empty:
+                        continue
+                    self.dropped_count += 1
+                    logger.warning(f"{self._thread_name_prefix} キュー満杯のため古いタスクを破棄しました（累計: {self.dropped_count}件）")
+                    if self._on_drop:
+                        try:
+                            self._on_drop(*dropped[1], **dropped[2])
+                        except Exception as e:
+                            logger.warning(f"{self._thread_name_prefix} 破棄タスクの後処理エラー: {e}")
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        """
+        ワーカースレッドを停止（キューに残ったタスクは処理してから停止）
+
+        Args:
+            wait: Trueの場合はワーカースレッドの終了を待機
+            cancel_futures: ThreadPoolExecutorとの互換性のための引数（未使用）
+        """
+        if self._shutdown:
+            return
+        self._shutdown = True
+        for _ in self._threads:
+            self._queue.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+def _discard_video_upload(video_path, *args, **kwargs):
+    """破棄された動画アップロードタスクの一時ファイルを削除"""
+    remove_temp_video(video_path)
+
+# 動画エンコードのtime_base（1ms単位、固定値）
+FIXED_TIME_BASE = Fraction(1, 1000)
+
+# ===== ワーカープールの設定 =====
+# 画像アップロード用（軽量・頻繁）: 上限付きキュー、満杯時は古いフレームを破棄
+image_executor = DropOldestExecutor(max_workers=3, maxsize=16, thread_name_prefix="image_upload")
 
 # 動画エンコード用（重量・低頻度）
 video_encode_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="video_encode")
 
-# 動画アップロード用（中量・低頻度）
-video_upload_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="video_upload")
+# 動画アップロード用（中量・低頻度）: 上限付きキュー、破棄時は一時ファイルを削除
+video_upload_executor = DropOldestExecutor(
+    max_workers=2, maxsize=4, thread_name_prefix="video_upload",
+    on_drop=_discard_video_upload
+)
 
 def cleanup_executors():
     """プログラム終了時にスレッドプールをクリーンアップ"""
@@ -92,8 +195,6 @@ def encode_video_from_buffer(frame_buffer, video_start_time, video_end_time, cam
         output_stream.pix_fmt = 'yuv420p'
         
         # time_baseを固定値として設定（1ms単位）
-        from fractions import Fraction
-        FIXED_TIME_BASE = Fraction(1, 1000)
         output_stream.time_base = FIXED_TIME_BASE
         
         # エンコーダオプション
@@ -106,13 +207,16 @@ def encode_video_from_buffer(frame_buffer, video_start_time, video_end_time, cam
         successful_frames = 0
         failed_frames = 0
         
+        # PTSを事前計算（time_base=1/1000の場合、フレーム時間をミリ秒で表現）
+        pts_arr = (np.arange(len(frame_buffer), dtype=np.int64) * 1000) // fps
+        
         for idx, frame_array in enumerate(frame_buffer):
             try:
                 # NumPy配列からAVフレームを作成（既にyuv420p形式）
                 frame = av.VideoFrame.from_ndarray(frame_array, format='yuv420p')
                 
-                # PTSを正しく計算（time_base=1/1000の場合、フレーム時間をミリ秒で表現）
-                frame.pts = int(idx * 1000 / fps)
+                # 事前計算したPTSを設定
+                frame.pts = int(pts_arr[idx])
                 # time_baseは固定値を使用（reformat後に変わらないように）
                 frame.time_base = FIXED_TIME_BASE
                 
@@ -192,7 +296,8 @@ def async_upload_image(img_byte_arr, s3_key, s3path, current_time, camera_id, bu
     try:
         if upload_to_s3_with_retry(s3, bucket_name, s3_key, img_byte_arr):
             logger.info(f"画像をS3にアップロードしました: {s3path}")
-            file_id = insert_file_record(dynamodb, camera_id, current_time, current_time, s3path, COLLECTOR_ID, 'image')
+            file_record = insert_file_record(dynamodb, camera_id, current_time, current_time, s3path, COLLECTOR_ID, 'image')
+            file_id = file_record['file_id'] if file_record else None
             if file_id:
                 logger.info(f"ファイルレコードをDynamoDBに保存しました: {file_id}")
                 
@@ -280,7 +385,8 @@ def async_upload_video(video_path, start_time, end_time, camera_id, bucket_name,
         logger.info(f"動画を保存しました: {s3path}")
         
         # DynamoDBにファイルレコードを挿入
-        file_id = insert_file_record(dynamodb, camera_id, start_time, end_time, s3path, COLLECTOR_ID, 'video')
+        file_record = insert_file_record(dynamodb, camera_id, start_time, end_time, s3path, COLLECTOR_ID, 'video')
+        file_id = file_record['file_id'] if file_record else None
         
         if file_id:
             logger.info(f"動画レコード保存完了: {file_id}")
@@ -311,22 +417,31 @@ def async_upload_video(video_path, start_time, end_time, camera_id, bucket_name,
         logger.error(traceback.format_exc())
     finally:
         # 一時ファイルと一時ディレクトリを削除
-        try:
-            if os.path.exists(video_path):
-                os.remove(video_path)
-                logger.info(f"一時ファイルを削除しました: {video_path}")
-                
-                # 親ディレクトリも削除（空の場合）
-                import shutil
-                parent_dir = os.path.dirname(video_path)
-                if os.path.exists(parent_dir) and os.path.isdir(parent_dir):
-                    try:
-                        shutil.rmtree(parent_dir)
-                        logger.info(f"一時ディレクトリを削除しました: {parent_dir}")
-                    except Exception as dir_e:
-                        logger.warning(f"一時ディレクトリ削除エラー: {dir_e}")
-        except Exception as e:
-            logger.warning(f"一時ファイル削除エラー: {e}")
+        remove_temp_video(video_path)
+
+def remove_temp_video(video_path):
+    """
+    動画の一時ファイルと一時ディレクトリを削除
+    
+    Args:
+        video_path: 一時ファイルのパス
+    """
+    try:
+        if os.path.exists(video_path):
+            os.remove(video_path)
+            logger.info(f"一時ファイルを削除しました: {video_path}")
+            
+            # 親ディレクトリも削除（空の場合）
+            import shutil
+            parent_dir = os.path.dirname(video_path)
+            if os.path.exists(parent_dir) and os.path.isdir(parent_dir):
+                try:
+                    shutil.rmtree(parent_dir)
+                    logger.info(f"一時ディレクトリを削除しました: {parent_dir}")
+                except Exception as dir_e:
+                    logger.warning(f"一時ディレクトリ削除エラー: {dir_e}")
+    except Exception as e:
+        logger.warning(f"一時ファイル削除エラー: {e}")
 
 def process_hls_stream(camera_id: str, interval: int, duration: int, bucket_name: str) -> None:
     """
@@ -13,8 +13,6 @@ import boto3
 from botocore.exceptions import NoCredentialsError, ClientError
 import av
 import click
-from PIL import Image
-import io
 import time
 import uuid
 import logging
@@ -22,15 +20,19 @@ import cv2
 import numpy as np
 import json
 import ast
+import functools
 from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
 import threading
-from queue import Queue, Empty
+import signal
+from collections import deque
+from queue import Empty
 
 # shared.commonから共通関数をインポート
 from shared.common import *
 
 from shared.hls_connector import HlsConnectorFactory
-from shared.yolo_detector import YoloDetector, filter_detections_by_class, build_class_detect_data
+from shared.yolo_detector import YoloDetector, build_detection_arrays, class_filter_mask, build_class_detect_data
 from shared.eventbridge_publisher import (
     EventBridgePublisher,
     EVENT_TYPE_CLASS_DETECT,
@@ -50,17 +52,141 @@ if not COLLECTOR_ID:
     import sys
     sys.exit(1)
 
+# YOLO推論のバッチサイズ（ワーカーが溜まったフレームをまとめて推論する最大数）
+YOLO_BATCH_SIZE = max(1, int(os.environ.get('YOLO_BATCH_SIZE', '4')))
+
+# HLS再接続の待機設定（直前まで受信できていれば即時再接続、そうでなければ指数バックオフ）
+HLS_RECONNECT_MAX_WAIT_SEC = 30
+HLS_RECENT_FRAME_SEC = 5
+
+# スレッド種別ごとのCPUアフィニティ（例: "decoder=0,1;yolo=2-3;save=4,5"、未設定時は固定しない）
+CPU_AFFINITY_MAP = os.environ.get('CPU_AFFINITY_MAP', '')
+
 # ロガーの設定
 logger = setup_logger(__name__)
 
+
+def _parse_cpu_affinity_map(value: str) -> dict:
+    """
+    CPU_AFFINITY_MAP環境変数を解析
+    
+    Args:
+        value: "役割=CPU番号リスト" を ; 区切りで並べた文字列（CPU番号は , 区切り、a-b で範囲指定）
+        
+    Returns:
+        dict: 役割名 → CPU番号のset
+    """
+    affinity_map = {}
+    for entry in value.split(';'):
+        if not entry.strip():
+            continue
+        try:
+            role, cpus_str = entry.split('=', 1)
+            cpus = set()
+            for part in cpus_str.split(','):
+                part = part.strip()
+                if not part:
+                    continue
+                if '-' in part:
+                    start, end = part.split('-', 1)
+                    cpus.update(range(int(start), int(end) + 1))
+                else:
+                    cpus.add(int(part))
+        except ValueError:
+            logger.warning(f"CPU_AFFINITY_MAPの形式が不正なため無視します: {entry}")
+            continue
+        if cpus:
+            affinity_map[role.strip()] = cpus
+    return affinity_map
+
+
+_CPU_AFFINITY = _parse_cpu_affinity_map(CPU_AFFINITY_MAP)
+
+# 終了要求（SIGTERM）で再接続待機を中断するためのイベント
+_shutdown_event = threading.Event()
+
+
+def pin_current_thread(role: str) -> None:
+    """
+    呼び出し元スレッドをCPU_AFFINITY_MAPで指定されたCPUに固定
+    
+    Linuxではsched_setaffinity(0, ...)は呼び出し元スレッドのみに作用し、
+    以降にそのスレッドから生成されるスレッド（FFmpegのデコードスレッド等）に継承される。
+    'yolo' の場合はtorchのintra-opスレッド数も固定したCPU数に合わせる。
+    
+    Args:
+        role: スレッドの役割（'decoder' / 'yolo' / 'save'）
+    """
+    cpus = _CPU_AFFINITY.get(role)
+    if not cpus or not hasattr(os, 'sched_setaffinity'):
+        return
+    try:
+        # コンテナに割り当てられていないCPUは除外する
+        cpus = cpus & os.sched_getaffinity(0) or cpus
+        os.sched_setaffinity(0, cpus)
+        logger.info(f"📌 {role}スレッドをCPU {sorted(cpus)} に固定しました")
+        if role == 'yolo':
+            # YoloDetectorは固定前のメインスレッドで全vCPU分の推論スレッド数を設定するため、
+            # 固定したCPU数に合わせ直す（少数のCPUに過剰なtorchスレッドを載せない）
+            import torch
+            torch.set_num_threads(len(cpus))
+            logger.info(f"📌 torch推論スレッド数を {len(cpus)} に設定しました")
+    except OSError as e:
+        logger.warning(f"{role}スレッドのCPUアフィニティ設定に失敗しました: {e}")
+
 # Shapely（エリア検出用）
 try:
-    from shapely.geometry import Point, Polygon, box
+    import shapely
+    from shapely.geometry import Polygon
     SHAPELY_AVAILABLE = True
 except ImportError:
     logger.warning("Shapely がインストールされていません。area_detect機能は使用できません。")
     SHAPELY_AVAILABLE = False
 
+# Numba（center判定の高速化用、オプション）
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    logger.warning("Numba がインストールされていません。center判定はShapelyで実行します。")
+    NUMBA_AVAILABLE = False
+
+
+def _points_in_polygon(xs, ys, verts_x, verts_y):
+    """
+    点群がポリゴン内にあるか一括判定（交差数判定法 / crossing number）
+    
+    Args:
+        xs: 点のX座標配列（float64）
+        ys: 点のY座標配列（float64）
+        verts_x: ポリゴン頂点のX座標配列（float64）
+        verts_y: ポリゴン頂点のY座標配列（float64）
+        
+    Returns:
+        np.ndarray: 点ごとのポリゴン内判定（bool配列）
+    """
+    n_points = xs.shape[0]
+    n_verts = verts_x.shape[0]
+    result = np.zeros(n_points, dtype=np.bool_)
+    for i in range(n_points):
+        px = xs[i]
+        py = ys[i]
+        inside = False
+        j = n_verts - 1
+        for k in range(n_verts):
+            # 点から右方向へ伸ばした半直線と辺(j, k)の交差判定
+            if (verts_y[k] > py) != (verts_y[j] > py):
+                cross_x = (verts_x[j] - verts_x[k]) * (py - verts_y[k]) / (verts_y[j] - verts_y[k]) + verts_x[k]
+                if px < cross_x:
+                    inside = not inside
+            j = k
+        result[i] = inside
+    return result
+
+
+if NUMBA_AVAILABLE:
+    _points_in_polygon = njit(cache=True, fastmath=True)(_points_in_polygon)
+
 # ThreadPoolExecutor（非同期画像保存とdetector実行用）
 # 注意: グローバル変数として定義せず、関数内でローカル作成する
 
@@ -79,6 +205,9 @@ class TrackingManager:
         self.camera_id = camera_id
         self.collector_type = collector_type
         
+        # エリア判定の詳細ログ（検出ごと）はDEBUGレベル時のみ出力（f-string生成も省略）
+        self._debug = logger.isEnabledFor(logging.DEBUG)
+        
         # コレクター設定を環境変数COLLECTOR_IDから取得
         from shared.database import get_collector_by_id
         
@@ -99,8 +228,9 @@ class TrackingManager:
         
         # collect_classをリストに変換（カンマまたは|区切り）
         collect_class_str = settings.get('collect_class', 'person')
-        import re
-        self.collect_classes = [c.strip() for c in re.split(r'[,|]', collect_class_str) if c.strip()]
+        self.collect_classes = [c for c in (s.strip() for s in collect_class_str.replace('|', ',').split(',')) if c]
+        # クラス名の所属判定用（小文字化済み、O(1)参照）
+        self._collect_classes_set = frozenset(c.lower() for c in self.collect_classes)
         
         # confidence閾値を取得（デフォルト: 0.5）
         self.confidence_threshold = float(settings.get('confidence', 0.5))
@@ -116,6 +246,13 @@ class TrackingManager:
         area_detect_iou_threshold = settings.get('area_detect_iou_threshold', 0.5)
         self.area_detect_iou_threshold = float(area_detect_iou_threshold if area_detect_iou_threshold is not None else 0.5)
         
+        # 判定方法ごとのエリア判定処理を選択（設定は実行中に変わらないため初期化時に決定）
+        self._area_mask_impl = {
+            'center': self._area_mask_center,
+            'intersects': self._area_mask_intersects,
+            'iou': self._area_mask_iou
+        }.get(self.area_detect_type, self._area_mask_center)
+        
         # エリア検出判定方法を取得（デフォルト: track_ids_change）
         self.area_detect_method = settings.get('area_detect_method', 'track_ids_change')
         
@@ -123,6 +260,19 @@ class TrackingManager:
             try:
                 area_points = ast.literal_eval(detect_area_str)
                 self.detect_area_polygon = Polygon(area_points)
+                # 判定のたびに座標列を走査しないよう、空間インデックスを事前構築（prepared geometry）
+                shapely.prepare(self.detect_area_polygon)
+                # center判定（Numba）用に頂点座標をfloat64配列で保持
+                area_coords = np.asarray(self.detect_area_polygon.exterior.coords, dtype=np.float64)
+                self._area_verts_x = np.ascontiguousarray(area_coords[:, 0])
+                self._area_verts_y = np.ascontiguousarray(area_coords[:, 1])
+                # エリアが軸平行な矩形の場合、IoUは解析的に計算できるため外接矩形を保持
+                self._area_bounds = self.detect_area_polygon.bounds
+                self._area_is_rect = self.detect_area_polygon.equals(self.detect_area_polygon.envelope)
+                if NUMBA_AVAILABLE:
+                    # 初回フレームでJITコンパイルが走らないよう事前にコンパイル
+                    empty = np.empty(0, dtype=np.float64)
+                    _points_in_polygon(empty, empty, self._area_verts_x, self._area_verts_y)
                 logger.info(f"=" * 60)
                 logger.info(f"エリア検出設定:")
                 logger.info(f"  - エリアポリゴン座標: {area_points}")
@@ -141,30 +291,32 @@ class TrackingManager:
         logger.info(f"トラックイベントタイプ: {self.track_eventtype}")
         
         # タイムスタンプ管理
-        self.last_track_time_ms = None
-        self.last_capture_jpeg_time = None
+        # 間隔判定はtime.monotonic_ns()を基準にナノ秒単位で行う
+        self.capture_track_interval_ns = self.capture_track_interval_ms * 1_000_000
+        self.last_track_time_ns = None
+        self.last_capture_jpeg_time_ns = None
         
         # capture.jpeg更新間隔（10分）
-        self.capture_jpeg_interval = 600
+        self.capture_jpeg_interval_ns = 600 * 1_000_000_000
         
         # イベント発火間隔管理（疎結合: detector を知らない）
-        self.last_event_time_ms = 0
-        self.event_interval_ms = self.capture_track_interval_ms  # collector 設定を使用
-        logger.info(f"イベント発火間隔: {self.event_interval_ms}ms")
+        self.last_event_time_ns = 0
+        self.event_interval_ns = self.capture_track_interval_ns  # collector 設定を使用
+        logger.info(f"イベント発火間隔: {self.capture_track_interval_ms}ms")
         
         # YOLOモデルパス
         self.model_path = settings.get('model_path', 'v9-c')
         logger.info(f"YOLOモデルパス: {self.model_path}")
         
         # area_detect用の状態管理（前回の領域内track_idセット）
-        self.previous_area_track_ids = set()
+        self.previous_area_track_ids = frozenset()
         
         # class_count_change用: 前回のエリア内オブジェクト数
         self.previous_area_count = 0
         
-        # 最新の侵入・退出ID（EventBridge用）
-        self.intrusion_ids = []
-        self.exit_ids = []
+        # 最新の侵入・退出ID（EventBridge用、変更不可のタプルで保持し保存時に変換せずそのまま渡す）
+        self.intrusion_ids = ()
+        self.exit_ids = ()
         
         # class_count_change用: 侵入数・退出数（EventBridge用）
         self.intrusion_count = 0
@@ -174,8 +326,8 @@ class TrackingManager:
         self.area_event_triggered = False
         
         # エリア判定状態の定期ログ用（30秒に1回）
-        self.last_area_status_log_ms = None
-        self.area_status_log_interval_ms = 30000  # 30秒
+        self.last_area_status_log_ns = None
+        self.area_status_log_interval_ns = 30_000_000_000  # 30秒
         
         # 定期画像保存設定（環境変数で制御、デフォルト: False）
         enable_periodic_save_env = os.environ.get('ENABLE_PERIODIC_SAVE', 'false').lower()
@@ -183,10 +335,11 @@ class TrackingManager:
         self.capture_track_image_counter = int(settings.get('capture_track_image_counter', 25))
         
         # 画像保存用タイマー（時間ベース）
-        self.last_periodic_save_time_ms = 0
-        self.periodic_save_interval_ms = self.capture_track_interval_ms * self.capture_track_image_counter
+        self.last_periodic_save_time_ns = 0
+        periodic_save_interval_ms = self.capture_track_interval_ms * self.capture_track_image_counter
+        self.periodic_save_interval_ns = periodic_save_interval_ms * 1_000_000
         
-        logger.info(f"定期画像保存: enabled={self.capture_track_image_flg}, interval={self.periodic_save_interval_ms}ms ({self.periodic_save_interval_ms/1000:.1f}秒)")
+        logger.info(f"定期画像保存: enabled={self.capture_track_image_flg}, interval={periodic_save_interval_ms}ms ({periodic_save_interval_ms/1000:.1f}秒)")
         
         # 仮想 Detector の取得/作成（一度だけ実行、既存があれば再利用）
         self.virtual_detector = get_or_create_collector_internal_detector(
@@ -202,13 +355,13 @@ class TrackingManager:
             self.virtual_detector_id = get_collector_internal_detector_id(self.collector_id)
             logger.warning(f"仮想 Detector の取得/作成に失敗しました。detector_id={self.virtual_detector_id} を使用します")
     
-    def should_save_image_for_tracking(self, has_detector_trigger: bool, current_time_ms: int) -> tuple:
+    def should_save_image_for_tracking(self, has_detector_trigger: bool, current_time_ns: int) -> tuple:
         """
         トラッキング時に画像を保存すべきかを判定（時間ベース）
         
         Args:
             has_detector_trigger: detectorがトリガーされたか
-            current_time_ms: 現在時刻（ミリ秒）
+            current_time_ns: 現在時刻（time.monotonic_ns()、ナノ秒）
         
         Returns:
             tuple[bool, str]: (保存すべきか, 保存理由)
@@ -218,7 +371,7 @@ class TrackingManager:
         """
         # 1. detectorトリガーの場合は必ず保存
         if has_detector_trigger:
-            self.last_periodic_save_time_ms = current_time_ms  # タイマーリセット
+            self.last_periodic_save_time_ns = current_time_ns  # タイマーリセット
             return True, 'detector'
         
         # 2. 定期保存が無効な場合はスキップ
@@ -226,14 +379,14 @@ class TrackingManager:
             return False, ''
         
         # 3. 時間ベースで定期保存判定
-        if self.last_periodic_save_time_ms == 0:
+        if self.last_periodic_save_time_ns == 0:
             # 初回は保存
-            self.last_periodic_save_time_ms = current_time_ms
+            self.last_periodic_save_time_ns = current_time_ns
             return True, 'periodic'
         
-        elapsed_ms = current_time_ms - self.last_periodic_save_time_ms
-        if elapsed_ms >= self.periodic_save_interval_ms:
-            self.last_periodic_save_time_ms = current_time_ms
+        elapsed_ns = current_time_ns - self.last_periodic_save_time_ns
+        if elapsed_ns >= self.periodic_save_interval_ns:
+            self.last_periodic_save_time_ns = current_time_ns
             return True, 'periodic'
         
         return False, ''
@@ -248,100 +401,216 @@ class TrackingManager:
         Returns:
             bool: エリア内ならTrue
         """
-        if not self.detect_area_polygon or not SHAPELY_AVAILABLE:
-            return False
+        return bool(self._area_mask([detection])[0])
+    
+    def _area_mask(self, detections: list, arrays: dict = None) -> np.ndarray:
+        """
+        複数の検出結果をまとめてエリア判定（Shapely 2.x のベクトル化APIで一括処理）
+        
+        判定方法（area_detect_type）ごとの処理は初期化時に _area_mask_impl として選択済み。
         
-        bbox = detection['bbox']  # [x1, y1, x2, y2]
-        center = detection['center']  # [center_x, center_y]
-        track_id = detection.get('track_id', 'unknown')
-        class_name = detection.get('class', 'unknown')
+        Args:
+            detections: 検出情報リスト（bbox, centerを含む）
+            arrays: detectionsのフィールドごとの配列（build_detection_arrays()の結果、省略時は生成）
+            
+        Returns:
+            np.ndarray: 検出ごとのエリア内判定（bool配列）
+        """
+        if not detections or not self.detect_area_polygon or not SHAPELY_AVAILABLE:
+            return np.zeros(len(detections), dtype=bool)
         
-        result = False
+        if arrays is None:
+            arrays = build_detection_arrays(detections)
+        return self._area_mask_impl(detections, arrays)
+    
+    def _area_mask_intersects(self, detections: list, arrays: dict) -> np.ndarray:
+        """一部でも重なり判定（高速）"""
+        bboxes = arrays['bboxes']
+        mask = np.zeros(len(detections), dtype=bool)
+        # エリアの外接矩形と重ならないbboxはShapelyに渡さず除外
+        candidates = self._bbox_bounds_candidates(bboxes)
+        if candidates.any():
+            bbox_polygons = self._bbox_polygons(bboxes[candidates])
+            mask[candidates] = shapely.intersects(bbox_polygons, self.detect_area_polygon)
+        if self._debug:
+            for detection, result in zip(detections, mask):
+                logger.debug(f"[エリア判定] ID={detection.get('track_id', 'unknown')}, class={detection.get('class', 'unknown')}, bbox={detection['bbox']}, 判定={'エリア内' if result else 'エリア外'} (intersects)")
+        return mask
+    
+    def _area_mask_iou(self, detections: list, arrays: dict) -> np.ndarray:
+        """IoU閾値判定（柔軟、やや低速）"""
+        bboxes = arrays['bboxes']
+        if self._area_is_rect:
+            # 矩形エリアの場合はShapelyを使わず解析的に計算（高速）
+            ious = self._rect_ious(bboxes)
+        else:
+            # エリアの外接矩形と重ならないbboxはIoU=0としてShapelyに渡さない
+            candidates = self._bbox_bounds_candidates(bboxes)
+            ious = np.zeros(len(detections), dtype=np.float64)
+            if candidates.any():
+                candidate_ious = self._polygon_ious(bboxes[candidates])
+                if candidate_ious is None:
+                    return np.zeros(len(detections), dtype=bool)
+                ious[candidates] = candidate_ious
+        
+        mask = ious >= self.area_detect_iou_threshold
+        if self._debug:
+            for detection, iou, result in zip(detections, ious, mask):
+                logger.debug(f"[エリア判定] ID={detection.get('track_id', 'unknown')}, class={detection.get('class', 'unknown')}, bbox={detection['bbox']}, IoU={iou:.3f}, 閾値={self.area_detect_iou_threshold}, 判定={'エリア内' if result else 'エリア外'} (iou)")
+        return mask
+    
+    def _area_mask_center(self, detections: list, arrays: dict) -> np.ndarray:
+        """中心点判定（高速）。未知の判定方法の場合もデフォルトとして使用"""
+        centers = arrays['centers']
+        mask = np.zeros(len(detections), dtype=bool)
+        # エリアの外接矩形の外にある中心点は多角形判定を行わず除外
+        minx, miny, maxx, maxy = self._area_bounds
+        candidates = (
+            (centers[:, 0] >= minx) & (centers[:, 0] <= maxx)
+            & (centers[:, 1] >= miny) & (centers[:, 1] <= maxy)
+        )
+        if candidates.any():
+            xs = np.ascontiguousarray(centers[candidates, 0])
+            ys = np.ascontiguousarray(centers[candidates, 1])
+            if NUMBA_AVAILABLE:
+                mask[candidates] = _points_in_polygon(xs, ys, self._area_verts_x, self._area_verts_y)
+            else:
+                mask[candidates] = shapely.contains_xy(self.detect_area_polygon, xs, ys)
+        if self._debug:
+            label = 'center' if self.area_detect_type == 'center' else 'default:center'
+            for detection, result in zip(detections, mask):
+                center = detection['center']
+                logger.debug(f"[エリア判定] ID={detection.get('track_id', 'unknown')}, class={detection.get('class', 'unknown')}, center=({center[0]:.0f},{center[1]:.0f}), 判定={'エリア内' if result else 'エリア外'} ({label})")
+        return mask
+    
+    def _bbox_bounds_candidates(self, bboxes: np.ndarray) -> np.ndarray:
+        """
+        エリアの外接矩形と重なるbboxを一括判定（Shapely判定前の高速な除外用）
         
-        if self.area_detect_type == 'center':
-            # 中心点判定（高速）
-            point = Point(center[0], center[1])
-            result = self.detect_area_polygon.contains(point)
-            logger.info(f"[エリア判定] ID={track_id}, class={class_name}, center=({center[0]:.0f},{center[1]:.0f}), 判定={'エリア内' if result else 'エリア外'} (center)")
+        Args:
+            bboxes: bbox配列 [x1, y1, x2, y2] (N, 4)
+            
+        Returns:
+            np.ndarray: 外接矩形と重なる可能性があるか（bool配列）
+        """
+        minx, miny, maxx, maxy = self._area_bounds
+        return (
+            (bboxes[:, 2] >= minx) & (bboxes[:, 0] <= maxx)
+            & (bboxes[:, 3] >= miny) & (bboxes[:, 1] <= maxy)
+        )
+    
+    def _rect_ious(self, bboxes: np.ndarray) -> np.ndarray:
+        """
+        軸平行な矩形エリアとbboxのIoUを解析的に一括計算
         
-        elif self.area_detect_type == 'intersects':
-            # 一部でも重なり判定（高速）
-            bbox_polygon = box(bbox[0], bbox[1], bbox[2], bbox[3])
-            result = bbox_polygon.intersects(self.detect_area_polygon)
-            logger.info(f"[エリア判定] ID={track_id}, class={class_name}, bbox={bbox}, 判定={'エリア内' if result else 'エリア外'} (intersects)")
+        Args:
+            bboxes: bbox配列 [x1, y1, x2, y2] (N, 4)
+            
+        Returns:
+            np.ndarray: 検出ごとのIoU
+        """
+        ax1, ay1, ax2, ay2 = self._area_bounds
+        x1, y1, x2, y2 = bboxes[:, 0], bboxes[:, 1], bboxes[:, 2], bboxes[:, 3]
+        
+        inter_w = np.clip(np.minimum(x2, ax2) - np.maximum(x1, ax1), 0, None)
+        inter_h = np.clip(np.minimum(y2, ay2) - np.maximum(y1, ay1), 0, None)
+        intersection_areas = inter_w * inter_h
+        union_areas = (x2 - x1) * (y2 - y1) + (ax2 - ax1) * (ay2 - ay1) - intersection_areas
+        
+        return np.divide(
+            intersection_areas, union_areas,
+            out=np.zeros_like(intersection_areas), where=union_areas > 0
+        )
+    
+    def _polygon_ious(self, bboxes: np.ndarray):
+        """
+        任意形状のエリアとbboxのIoUをShapelyで一括計算
         
-        elif self.area_detect_type == 'iou':
-            # IoU閾値判定（柔軟、やや低速）
-            bbox_polygon = box(bbox[0], bbox[1], bbox[2], bbox[3])
+        Args:
+            bboxes: bbox配列 [x1, y1, x2, y2] (N, 4)
             
-            # 交差部分と和集合を計算
-            try:
-                intersection = bbox_polygon.intersection(self.detect_area_polygon)
-                union = bbox_polygon.union(self.detect_area_polygon)
-                
-                intersection_area = intersection.area
-                union_area = union.area
-                
-                if union_area == 0:
-                    result = False
-                else:
-                    iou = intersection_area / union_area
-                    result = iou >= self.area_detect_iou_threshold
-                    logger.info(f"[エリア判定] ID={track_id}, class={class_name}, bbox={bbox}, IoU={iou:.3f}, 閾値={self.area_detect_iou_threshold}, 判定={'エリア内' if result else 'エリア外'} (iou)")
-            except Exception as e:
-                logger.error(f"IoU計算エラー: {e}")
-                result = False
-        else:
-            # デフォルトは中心点判定
-            point = Point(center[0], center[1])
-            result = self.detect_area_polygon.contains(point)
-            logger.info(f"[エリア判定] ID={track_id}, class={class_name}, center=({center[0]:.0f},{center[1]:.0f}), 判定={'エリア内' if result else 'エリア外'} (default:center)")
+        Returns:
+            np.ndarray: 検出ごとのIoU、計算エラー時はNone
+        """
+        bbox_polygons = self._bbox_polygons(bboxes)
+        ious = np.zeros(len(bboxes), dtype=np.float64)
+        
+        # エリアと重ならないbboxはIoU=0のため、交差・和集合の計算を省略
+        overlap = shapely.intersects(bbox_polygons, self.detect_area_polygon)
+        if not overlap.any():
+            return ious
         
-        return result
+        # 交差部分と和集合の面積を一括計算
+        try:
+            candidates = bbox_polygons[overlap]
+            intersection_areas = shapely.area(shapely.intersection(candidates, self.detect_area_polygon))
+            union_areas = shapely.area(shapely.union(candidates, self.detect_area_polygon))
+            ious[overlap] = np.divide(
+                intersection_areas, union_areas,
+                out=np.zeros_like(intersection_areas), where=union_areas > 0
+            )
+        except Exception as e:
+            logger.error(f"IoU計算エラー: {e}")
+            return None
+        
+        return ious
     
-    def should_do_tracking(self, current_time_ms: int) -> bool:
+    @staticmethod
+    def _bbox_polygons(bboxes: np.ndarray) -> np.ndarray:
+        """
+        bbox配列を一括でPolygon配列に変換（shapely.boxのベクトル化呼び出し）
+        
+        Args:
+            bboxes: bbox配列 [x1, y1, x2, y2] (N, 4)
+            
+        Returns:
+            np.ndarray: bboxごとのPolygon配列
+        """
+        return shapely.box(bboxes[:, 0], bboxes[:, 1], bboxes[:, 2], bboxes[:, 3])
+    
+    def should_do_tracking(self, current_time_ns: int) -> bool:
         """
         トラッキング実行タイミング判定
         
         Args:
-            current_time_ms: 現在時刻（ミリ秒）
+            current_time_ns: 現在時刻（time.monotonic_ns()、ナノ秒）
             
         Returns:
             実行すべきかどうか
         """
-        if self.last_track_time_ms is None:
+        if self.last_track_time_ns is None:
             return True
         
         # capture_track_intervalが0の場合はトラッキングオフ
         if self.capture_track_interval_ms == 0:
             return False
         
-        elapsed = current_time_ms - self.last_track_time_ms
-        return elapsed >= self.capture_track_interval_ms
+        elapsed = current_time_ns - self.last_track_time_ns
+        return elapsed >= self.capture_track_interval_ns
     
-    def update_track_time(self, current_time_ms: int):
+    def update_track_time(self, current_time_ns: int):
         """トラック時刻を更新"""
-        self.last_track_time_ms = current_time_ms
+        self.last_track_time_ns = current_time_ns
     
-    def should_update_capture_jpeg(self, current_time: datetime) -> bool:
-        """capture.jpeg更新タイミング判定"""
-        if self.last_capture_jpeg_time is None:
+    def should_update_capture_jpeg(self, current_time_ns: int) -> bool:
+        """capture.jpeg更新タイミング判定（current_time_ns: time.monotonic_ns()）"""
+        if self.last_capture_jpeg_time_ns is None:
             return True
         
-        elapsed = (current_time - self.last_capture_jpeg_time).total_seconds()
-        return elapsed >= self.capture_jpeg_interval
+        return (current_time_ns - self.last_capture_jpeg_time_ns) >= self.capture_jpeg_interval_ns
     
-    def update_capture_jpeg_time(self, current_time: datetime):
-        """capture.jpeg更新時刻を更新"""
-        self.last_capture_jpeg_time = current_time
+    def update_capture_jpeg_time(self, current_time_ns: int):
+        """capture.jpeg更新時刻を更新（current_time_ns: time.monotonic_ns()）"""
+        self.last_capture_jpeg_time_ns = current_time_ns
     
-    def check_event_conditions(self, current_time_ms: int, filtered_detections: list) -> bool:
+    def check_event_conditions(self, current_time_ns: int, filtered_detections: list, filtered_arrays: dict = None) -> bool:
         """
         イベント発生条件をチェック（疎結合: detector を知らない）
         
         Args:
-            current_time_ms: 現在時刻（ミリ秒）
+            current_time_ns: 現在時刻（time.monotonic_ns()、ナノ秒）
             filtered_detections: collect_classに合致する検出リスト
+            filtered_arrays: filtered_detectionsのフィールドごとの配列（build_detection_arrays()の結果、オプション）
             
         Returns:
             bool: イベントを発火すべきか
@@ -352,8 +621,8 @@ class TrackingManager:
         
         if self.track_eventtype == 'class_detect':
             # (1) class_detect の場合: オブジェクト検出あり → イベント発火
-            if self._should_fire_event(current_time_ms):
-                self.last_event_time_ms = current_time_ms
+            if self._should_fire_event(current_time_ns):
+                self.last_event_time_ns = current_time_ns
                 logger.info(f"【ClassDetect】イベント発火: 検出数={len(filtered_detections)}")
                 return True
             return False
@@ -364,11 +633,14 @@ class TrackingManager:
                 logger.warning("area_detect指定されていますが、ポリゴンが設定されていないか、Shapelyが利用できません")
                 return False
             
-            # 現在の領域内track_idセットを構築
-            current_area_track_ids = set()
-            for detection in filtered_detections:
-                if self._is_in_area(detection):
-                    current_area_track_ids.add(detection['track_id'])
+            # 現在の領域内track_idセットを構築（全検出を一括判定）
+            area_mask = self._area_mask(filtered_detections, filtered_arrays)
+            current_area_track_ids = frozenset(
+                detection['track_id']
+                for detection, in_area in zip(filtered_detections, area_mask)
+                if in_area
+            )
+            previous_area_track_ids = self.previous_area_track_ids
             
             current_count = len(current_area_track_ids)
             should_fire = False
@@ -378,13 +650,15 @@ class TrackingManager:
                 # (2-1) track_ids_change モード
                 # track_idの変化で侵入・退出を判定
                 # ========================================
-                if current_area_track_ids != self.previous_area_track_ids:
-                    entered_ids = current_area_track_ids - self.previous_area_track_ids
-                    exited_ids = self.previous_area_track_ids - current_area_track_ids
+                # 対称差（1回の走査）で変化を検出し、変化がある場合のみ侵入・退出に分割
+                changed_ids = current_area_track_ids ^ previous_area_track_ids
+                if changed_ids:
+                    entered_ids = changed_ids & current_area_track_ids
+                    exited_ids = changed_ids - entered_ids
                     
                     # EventBridge用に侵入・退出IDを保存
-                    self.intrusion_ids = list(entered_ids)
-                    self.exit_ids = list(exited_ids)
+                    self.intrusion_ids = tuple(entered_ids)
+                    self.exit_ids = tuple(exited_ids)
                     
                     # 侵入数・退出数を設定
                     self.intrusion_count = len(entered_ids)
@@ -395,8 +669,8 @@ class TrackingManager:
                         should_fire = True
                 else:
                     # 変化がなければ侵入・退出IDと数をクリア
-                    self.intrusion_ids = []
-                    self.exit_ids = []
+                    self.intrusion_ids = ()
+                    self.exit_ids = ()
                     self.intrusion_count = 0
                     self.exit_count = 0
             
@@ -412,8 +686,8 @@ class TrackingManager:
                     exited_count = max(0, previous_count - current_count)
                     
                     # entered_ids / exited_ids は空配列（個体識別しない）
-                    self.intrusion_ids = []
-                    self.exit_ids = []
+                    self.intrusion_ids = ()
+                    self.exit_ids = ()
                     
                     # 侵入数・退出数を設定
                     self.intrusion_count = entered_count
@@ -425,35 +699,39 @@ class TrackingManager:
                         should_fire = True
                 else:
                     # 変化がなければクリア
-                    self.intrusion_ids = []
-                    self.exit_ids = []
+                    self.intrusion_ids = ()
+                    self.exit_ids = ()
                     self.intrusion_count = 0
                     self.exit_count = 0
                     self.area_event_triggered = False
             
             # 定期的に現在の状態をログ出力（30秒に1回）
-            self._log_area_status_periodic(current_time_ms, filtered_detections, current_area_track_ids, current_count)
+            self._log_area_status_periodic(current_time_ns, filtered_detections, current_area_track_ids, current_count)
             
-            # 状態を更新
-            self.previous_area_track_ids = current_area_track_ids
+            # 状態を更新（変化がない場合は前回のセットをそのまま保持）
+            if current_area_track_ids != previous_area_track_ids:
+                self.previous_area_track_ids = current_area_track_ids
             self.previous_area_count = current_count
             
             if should_fire:
-                self.last_event_time_ms = current_time_ms
+                self.last_event_time_ns = current_time_ns
                 logger.info(f"【AreaDetect】イベント発火")
             
             return should_fire
         
         return False
     
-    def _should_fire_event(self, current_time_ms: int) -> bool:
+    def _should_fire_event(self, current_time_ns: int) -> bool:
         """イベント発火間隔チェック"""
-        if self.last_event_time_ms == 0:
+        if self.last_event_time_ns == 0:
             return True
-        return (current_time_ms - self.last_event_time_ms) >= self.event_interval_ms
+        return (current_time_ns - self.last_event_time_ns) >= self.event_interval_ns
     
     def _log_area_change(self, filtered_detections: list, current_area_track_ids: set, method: str, entered_ids: set = None, exited_ids: set = None):
-        """エリア変化のログ出力"""
+        """エリア変化のログ出力（DEBUGレベル時のみ）"""
+        if not self._debug:
+            return
+        
         inside_tracks = []
         outside_tracks = []
         for detection in filtered_detections:
@@ -471,15 +749,18 @@ class TrackingManager:
                 outside_tracks.append(track_info)
         
         if entered_ids is not None and exited_ids is not None:
-            logger.info(f"【🎯🎯🎯 エリア変化検出（{method}）🎯🎯🎯】侵入={list(entered_ids)}, 退出={list(exited_ids)}")
-        logger.info(f"  - エリア内track（{len(inside_tracks)}件）: {inside_tracks if inside_tracks else 'なし'}")
-        logger.info(f"  - エリア外track（{len(outside_tracks)}件）: {outside_tracks if outside_tracks else 'なし'}")
+            logger.debug(f"【🎯🎯🎯 エリア変化検出（{method}）🎯🎯🎯】侵入={list(entered_ids)}, 退出={list(exited_ids)}")
+        logger.debug(f"  - エリア内track（{len(inside_tracks)}件）: {inside_tracks if inside_tracks else 'なし'}")
+        logger.debug(f"  - エリア外track（{len(outside_tracks)}件）: {outside_tracks if outside_tracks else 'なし'}")
     
-    def _log_area_status_periodic(self, current_time_ms: int, filtered_detections: list, current_area_track_ids: set, current_count: int):
-        """定期的に現在の状態をログ出力（30秒に1回）"""
+    def _log_area_status_periodic(self, current_time_ns: int, filtered_detections: list, current_area_track_ids: set, current_count: int):
+        """定期的に現在の状態をログ出力（30秒に1回、DEBUGレベル時のみ）"""
+        if not self._debug:
+            return
+        
         should_log_status = (
-            self.last_area_status_log_ms is None or
-            (current_time_ms - self.last_area_status_log_ms) >= self.area_status_log_interval_ms
+            self.last_area_status_log_ns is None or
+            (current_time_ns - self.last_area_status_log_ns) >= self.area_status_log_interval_ns
         )
         
         if should_log_status:
@@ -499,22 +780,247 @@ class TrackingManager:
                 else:
                     outside_tracks.append(track_info)
             
-            logger.info(f"【定期状態ログ】method={self.area_detect_method}, エリア内数={current_count}, track_ids={list(current_area_track_ids)}")
-            logger.info(f"  - エリア内詳細（{len(inside_tracks)}件）: {inside_tracks if inside_tracks else 'なし'}")
-            logger.info(f"  - エリア外詳細（{len(outside_tracks)}件）: {outside_tracks if outside_tracks else 'なし'}")
-            self.last_area_status_log_ms = current_time_ms
+            logger.debug(f"【定期状態ログ】method={self.area_detect_method}, エリア内数={current_count}, track_ids={list(current_area_track_ids)}")
+            logger.debug(f"  - エリア内詳細（{len(inside_tracks)}件）: {inside_tracks if inside_tracks else 'なし'}")
+            logger.debug(f"  - エリア外詳細（{len(outside_tracks)}件）: {outside_tracks if outside_tracks else 'なし'}")
+            self.last_area_status_log_ns = current_time_ns
+
+
+class FrameRingBuffer:
+    """
+    デコードスレッド→YOLOワーカー間のフレーム受け渡し用リングバッファ
+    
+    満杯時は最も古いフレームを破棄して新しいフレームを追加する（プロデューサーはブロックしない）。
+    YOLOの処理が追いつかない場合でも、ワーカーは常に最新のフレームを処理する。
+    
+    プロデューサー1・コンシューマー1専用。deque の append/popleft はスレッドセーフなためロックは使わず、
+    待機中のコンシューマーの起床のみ Event で行う（Event が既にセット済みならフレーム投入時のロック取得なし）。
+    """
+    
+    def __init__(self, maxlen: int = 1):
+        """
+        初期化
+        
+        Args:
+            maxlen: 保持する最大フレーム数
+        """
+        self._frames = deque(maxlen=maxlen)
+        self._available = threading.Event()
+    
+    def put(self, item):
+        """
+        フレームを追加（満杯時は最も古いフレームを破棄）
+        
+        Args:
+            item: フレームデータ（Noneは終了シグナル）
+            
+        Returns:
+            破棄されたフレームデータ（破棄がない場合はNone）
+            ※ コンシューマーと同時に動作するため、統計・ログ用の目安として扱う
+        """
+        dropped = None
+        if len(self._frames) == self._frames.maxlen:
+            try:
+                dropped = self._frames[0]
+            except IndexError:
+                # 直前にコンシューマーが取り出した場合
+                pass
+        self._frames.append(item)
+        if not self._available.is_set():
+            self._available.set()
+        return dropped
+    
+    def _wait(self, timeout: float = None):
+        """フレームが投入されるまでtimeoutまで待機（空のままならEmpty）"""
+        if self._frames:
+            return
+        # クリア後に再確認し、クリアと投入が競合した場合の取りこぼしを防ぐ
+        self._available.clear()
+        if not self._frames:
+            self._available.wait(timeout)
+            if not self._frames:
+                raise Empty
+    
+    def get(self, timeout: float = None):
+        """
+        最も古いフレームを取り出す（空の場合はtimeoutまで待機）
+        
+        Args:
+            timeout: 最大待機時間（秒）
+            
+        Returns:
+            フレームデータ
+            
+        Raises:
+            Empty: timeout までにフレームが追加されなかった場合
+        """
+        self._wait(timeout)
+        return self._frames.popleft()
+    
+    def get_batch(self, max_items: int, timeout: float = None) -> list:
+        """
+        溜まっているフレームを古い順に最大max_items件まとめて取り出す
+        
+        1件目が届くまではtimeoutまで待機するが、2件目以降は待たない（低FPS時に遅延を増やさない）。
+        
+        Args:
+            max_items: 取り出す最大件数
+            timeout: 1件目の最大待機時間（秒）
+            
+        Returns:
+            フレームデータのリスト（1件以上）
+            
+        Raises:
+            Empty: timeout までにフレームが追加されなかった場合
+        """
+        self._wait(timeout)
+        items = []
+        while self._frames and len(items) < max_items:
+            items.append(self._frames.popleft())
+        return items
+
+
+class TrackLogBuffer:
+    """
+    TRACK_LOG_TABLE への書き込みバッファ
+    
+    フレームごとの put_item をまとめ、batch_writer（BatchWriteItem、最大25件/リクエスト）で書き込む。
+    通常のフラッシュは dynamodb_executor で非同期に実行し、呼び出し元スレッドをブロックしない。
+    経過時間は最も古い未書き込みアイテムから数え、追加が途絶えた場合もワーカーループから
+    flush_if_due() を定期的に呼ぶことで FLUSH_INTERVAL_SEC を超えて滞留させない。
+    イベント発火時はEventBridge発行前に書き込みを確定させるため、呼び出し元で即時フラッシュする。
+    """
+    
+    # フラッシュ条件（件数 or 経過時間のいずれか早い方）
+    FLUSH_SIZE = 25
+    FLUSH_INTERVAL_SEC = 2.0
+    
+    def __init__(self, dynamodb, executor: ThreadPoolExecutor = None):
+        """
+        初期化
+        
+        Args:
+            dynamodb: DynamoDBリソース
+            executor: 非同期フラッシュ用のThreadPoolExecutor（Noneの場合は呼び出し元で書き込み）
+        """
+        self._table = dynamodb.Table(TRACK_LOG_TABLE)
+        self._executor = executor
+        self._pending = []
+        self._lock = threading.Lock()
+        # 最も古い未書き込みアイテムの追加時刻（バッファが空の場合はNone）
+        self._oldest_pending_time = None
+    
+    def add(self, item: dict, flush: bool = False):
+        """
+        アイテムをバッファに追加（条件を満たした場合はフラッシュ）
+        
+        Args:
+            item: DynamoDBアイテム
+            flush: Trueの場合は呼び出し元で即時フラッシュ（書き込み失敗時は例外を送出）
+        """
+        with self._lock:
+            if not self._pending:
+                self._oldest_pending_time = time.monotonic()
+            self._pending.append(item)
+            if not (flush
+                    or len(self._pending) >= self.FLUSH_SIZE
+                    or self._is_due()):
+                return
+            pending = self._take_pending()
+        
+        if flush:
+            self._write(pending, raise_on_error=True)
+        else:
+            self._submit(pending)
+    
+    def flush_if_due(self):
+        """最も古いアイテムが FLUSH_INTERVAL_SEC を超えて滞留している場合にフラッシュ（非同期）"""
+        # ロックなしの事前確認（空のときはロックを取らない）
+        if self._oldest_pending_time is None:
+            return
+        with self._lock:
+            if not self._is_due():
+                return
+            pending = self._take_pending()
+        self._submit(pending)
+    
+    def flush(self):
+        """バッファ内のアイテムをすべて書き込む（呼び出し元で同期実行）"""
+        with self._lock:
+            pending = self._take_pending()
+        self._write(pending, raise_on_error=False)
+    
+    def _take_pending(self) -> list:
+        """バッファ内のアイテムを取り出す（ロック取得済みで呼ぶこと）"""
+        pending = self._pending
+        self._pending = []
+        self._oldest_pending_time = None
+        return pending
+    
+    def _is_due(self) -> bool:
+        """最も古いアイテムの経過時間がフラッシュ間隔を超えたか（ロック取得済みで呼ぶこと）"""
+        return (self._oldest_pending_time is not None
+                and time.monotonic() - self._oldest_pending_time >= self.FLUSH_INTERVAL_SEC)
+    
+    def _submit(self, pending: list):
+        """dynamodb_executor で非同期に書き込む（executorがない場合は呼び出し元で書き込み）"""
+        if self._executor is None:
+            self._write(pending, raise_on_error=False)
+        else:
+            self._executor.submit(self._write, pending, False)
+    
+    def _write(self, pending: list, raise_on_error: bool):
+        """アイテムを batch_writer で書き込む"""
+        if not pending:
+            return
+        
+        try:
+            with self._table.batch_writer() as batch:
+                for item in pending:
+                    batch.put_item(Item=item)
+            logger.info(f"トラックログ一括保存: {len(pending)}件")
+        except Exception as e:
+            logger.error(f"トラックログ一括保存エラー（{len(pending)}件）: {e}")
+            if raise_on_error:
+                raise
+
+
+def _build_track_info(detection: dict) -> dict:
+    """
+    検出結果をTRACK_LOG_TABLE保存用のtrack情報に変換
+    
+    Args:
+        detection: 検出情報
+        
+    Returns:
+        dict: track情報（floatはDecimalに変換）
+    """
+    track_id = str(detection['track_id'])
+    x1, y1, x2, y2 = detection['bbox']
+    center_x, center_y = detection['center']
+    velocity_x, velocity_y = detection['velocity']
+    return {
+        'track_id': track_id,
+        'class': detection['class'],
+        'confidence': Decimal(str(detection['confidence'])),
+        'bbox': [int(x1), int(y1), int(x2), int(y2)],
+        'center': [int(center_x), int(center_y)],
+        'velocity': [Decimal(str(velocity_x)), Decimal(str(velocity_y))],
+        'track_status': detection['track_status']
+    }
 
 
-def save_track_log(dynamodb, camera_id: str, collector_id: str, 
+def save_track_log(track_log_buffer: TrackLogBuffer, camera_id: str, collector_id: str, 
                    current_time: datetime, all_detections: list, filtered_detections: list,
                    file_id: str, image_width: int, image_height: int,
                    area_track_ids: set = None, detect_area_polygon = None,
-                   entered_ids: set = None, exited_ids: set = None):
+                   entered_ids: Iterable = None, exited_ids: Iterable = None,
+                   flush: bool = False):
     """
     TRACK_LOG_TABLE にレコード保存（1フレームにつき1レコード）
     
     Args:
-        dynamodb: DynamoDBリソース
+        track_log_buffer: トラックログ書き込みバッファ
         camera_id: カメラID
         collector_id: コレクターID (UUID)
         current_time: 現在時刻
@@ -525,8 +1031,9 @@ def save_track_log(dynamodb, camera_id: str, collector_id: str,
         image_height: 画像高さ
         area_track_ids: 領域内track_idセット（area_detectの場合）
         detect_area_polygon: 検出エリアポリゴン（area_detectの場合）
-        entered_ids: 今回侵入したtrack_idセット（area_detectの場合）
-        exited_ids: 今回退出したtrack_idセット（area_detectの場合）
+        entered_ids: 今回侵入したtrack_id（重複なし、area_detectの場合）
+        exited_ids: 今回退出したtrack_id（重複なし、area_detectの場合）
+        flush: Trueの場合はバッファせず即時書き込み（イベント発火時）
         
     Returns:
         tuple: (track_log_id, track_data_dict)
@@ -536,40 +1043,18 @@ def save_track_log(dynamodb, camera_id: str, collector_id: str,
     try:
         import uuid
         
-        track_table = dynamodb.Table(TRACK_LOG_TABLE)
-        
         time_str = format_for_db(current_time)
         track_log_id = str(uuid.uuid4())
         
         # track_alldata: 全検出結果をMapに変換（key: track_id, value: track情報）
-        track_alldata = {}
-        for detection in all_detections:
-            track_id = str(detection['track_id'])
-            x1, y1, x2, y2 = detection['bbox']
-            track_alldata[track_id] = {
-                'track_id': track_id,
-                'class': detection['class'],
-                'confidence': Decimal(str(detection['confidence'])),
-                'bbox': [int(x1), int(y1), int(x2), int(y2)],
-                'center': [int(c) for c in detection['center']],
-                'velocity': [Decimal(str(v)) for v in detection['velocity']],
-                'track_status': detection['track_status']
-            }
+        track_alldata = {str(d['track_id']): _build_track_info(d) for d in all_detections}
         
         # track_classdata: フィルタ後の検出結果をMapに変換
+        # フィルタ後の検出は全検出のサブセットのため、変換済みのtrack情報を再利用（Decimal変換を重複させない）
         track_classdata = {}
         for detection in filtered_detections:
             track_id = str(detection['track_id'])
-            x1, y1, x2, y2 = detection['bbox']
-            track_classdata[track_id] = {
-                'track_id': track_id,
-                'class': detection['class'],
-                'confidence': Decimal(str(detection['confidence'])),
-                'bbox': [int(x1), int(y1), int(x2), int(y2)],
-                'center': [int(c) for c in detection['center']],
-                'velocity': [Decimal(str(v)) for v in detection['velocity']],
-                'track_status': detection['track_status']
-            }
+            track_classdata[track_id] = track_alldata.get(track_id) or _build_track_info(detection)
         
         # area_in_data / area_out_data: エリア判定に基づいて分類
         area_in_data = {}
@@ -611,7 +1096,7 @@ def save_track_log(dynamodb, camera_id: str, collector_id: str,
         if exited_ids_str:
             item['exited_ids'] = exited_ids_str
         
-        track_table.put_item(Item=item)
+        track_log_buffer.add(item, flush=flush)
         
         logger.info(f"トラックログ保存: track_log_id={track_log_id}, file_id={file_id}, "
                    f"全検出数={len(all_detections)}, フィルタ後={len(filtered_detections)}, "
@@ -642,7 +1127,7 @@ def save_track_log(dynamodb, camera_id: str, collector_id: str,
 
 
 def yolo_processing_worker(
-    processing_queue: Queue,
+    processing_queue: FrameRingBuffer,
     tracker: 'YoloDetector',
     manager: TrackingManager,
     s3, dynamodb,
@@ -650,14 +1135,16 @@ def yolo_processing_worker(
     camera_id: str,
     image_save_executor: ThreadPoolExecutor,
     detector_executor: ThreadPoolExecutor,
+    upload_executor: ThreadPoolExecutor,
     event_publisher: EventBridgePublisher,
+    track_log_buffer: TrackLogBuffer,
     worker_stats: dict
 ):
     """
     YOLOトラッキング処理ワーカースレッド（単一スレッドで順次処理）
     
     Args:
-        processing_queue: フレーム処理キュー
+        processing_queue: フレーム処理用リングバッファ
         tracker: YoloDetectorインスタンス
         manager: TrackingManagerインスタンス
         s3: S3クライアント
@@ -666,93 +1153,138 @@ def yolo_processing_worker(
         camera_id: カメラID
         image_save_executor: 画像保存用ThreadPoolExecutor
         detector_executor: Detector実行用ThreadPoolExecutor
+        upload_executor: S3アップロード並列化用ThreadPoolExecutor
         event_publisher: EventBridgePublisherインスタンス
+        track_log_buffer: トラックログ書き込みバッファ
         worker_stats: ワーカー統計情報（処理フレーム数など）
     """
     logger.info("🔧 YOLOワーカースレッド開始")
+    pin_current_thread('yolo')
+    # イベントタイプに特化した画像保存関数を1回だけ選択
+    save_handler = select_save_handler(manager)
     processed_count = 0
+    # YUV→RGB変換先のバッファ（バッチ内の位置ごとに確保し、解像度が変わらない限り再利用）
+    # RGBフレームは推論・BGR変換でのみ参照され、保存スレッドには新規確保したBGRフレームを渡すため再利用できる
+    rgb_buffers = []
     
     try:
         while True:
-            # キューからフレームデータを取得（ブロッキング、タイムアウト付き）
+            # 保存が途絶えてもトラックログを滞留させない（フレームが来ない間もタイムアウトごとに確認）
+            track_log_buffer.flush_if_due()
+            
+            # リングバッファから溜まっているフレームをまとめて取得（ブロッキング、タイムアウト付き）
             try:
-                frame_data = processing_queue.get(timeout=1.0)
+                frame_batch = processing_queue.get_batch(YOLO_BATCH_SIZE, timeout=1.0)
             except Empty:
                 continue
             
-            # 終了シグナル
-            if frame_data is None:
-                logger.info("🛑 YOLOワーカースレッド終了シグナル受信")
-                break
+            # 終了シグナル（バッチ内の終了シグナルより前のフレームは処理してから終了）
+            stop_requested = None in frame_batch
+            if stop_requested:
+                frame_batch = frame_batch[:frame_batch.index(None)]
             
-            # フレームデータ取り出し
-            frame_rgb = frame_data['frame_rgb']
-            current_time = frame_data['current_time']
-            current_time_ms = frame_data['current_time_ms']
-            image_width = frame_data['image_width']
-            image_height = frame_data['image_height']
+            # YUV420Pで受け取ったフレームをRGBに変換（I420 → RGB、1回のcvtColor、変換先バッファは再利用）
+            for index, frame_data in enumerate(frame_batch):
+                if frame_data['frame_rgb'] is None:
+                    frame_yuv = frame_data['frame_yuv']
+                    # I420は (高さ*3/2, 幅) の単一プレーン
+                    rgb_shape = (frame_yuv.shape[0] * 2 // 3, frame_yuv.shape[1], 3)
+                    if index >= len(rgb_buffers):
+                        rgb_buffers.extend([None] * (index + 1 - len(rgb_buffers)))
+                    rgb_buffer = rgb_buffers[index]
+                    if rgb_buffer is None or rgb_buffer.shape != rgb_shape:
+                        rgb_buffer = rgb_buffers[index] = np.empty(rgb_shape, dtype=np.uint8)
+                    frame_data['frame_rgb'] = cv2.cvtColor(frame_yuv, cv2.COLOR_YUV2RGB_I420, dst=rgb_buffer)
+                    frame_data['frame_yuv'] = None
             
             try:
-                # YOLO推論実行（RGB形式で渡す）
-                detections = tracker.detect(frame_rgb)
-                
-                # デバッグ: 検出結果を確認（信頼度付き）
-                if detections:
-                    det_summary = [f"{d['class']}({d['confidence']:.2f})" for d in detections[:5]]
-                    logger.info(f"🔍 YOLO検出結果: {len(detections)}個 - {det_summary}{'...' if len(detections) > 5 else ''}")
-                else:
-                    logger.info(f"🔍 YOLO検出結果: 0個")
-                
-                # 指定クラス + confidence閾値でフィルタリング（共通関数使用）
-                logger.info(f"🔍 フィルタ条件: classes={manager.collect_classes}, confidence>={manager.confidence_threshold}")
-                
-                filtered_detections = filter_detections_by_class(
-                    detections,
-                    manager.collect_classes,
-                    manager.confidence_threshold
-                )
-                
-                # フィルタ後の結果を詳細に表示
-                if filtered_detections:
-                    filtered_summary = [f"{d['class']}({d['confidence']:.2f})" for d in filtered_detections[:5]]
-                    logger.info(f"✅ 最終判定: {len(filtered_detections)}個を検出 - {filtered_summary}{'...' if len(filtered_detections) > 5 else ''}")
+                # YOLO推論実行（RGB形式、複数フレームは1回のバッチ推論）
+                if len(frame_batch) == 1:
+                    batch_detections = [tracker.detect(frame_batch[0]['frame_rgb'])]
                 else:
-                    logger.info(f"✅ 最終判定: 検出なし")
-                
-                # イベント発生条件をチェック（疎結合: detector を知らない）
-                should_fire_event = manager.check_event_conditions(current_time_ms, filtered_detections)
-                
-                # 画像保存判定（イベント発火 or 定期保存）
-                should_save, save_reason = manager.should_save_image_for_tracking(
-                    has_detector_trigger=should_fire_event,
-                    current_time_ms=current_time_ms
-                )
-                
-                if should_save:
-                    logger.info(f"画像保存: 理由={save_reason}, should_fire_event={should_fire_event}")
+                    batch_detections = tracker.detect_batch([frame_data['frame_rgb'] for frame_data in frame_batch])
+            except Exception as e:
+                logger.error(f"⚠️  YOLOワーカー推論エラー: {e}", exc_info=True)
+                batch_detections = []
+            
+            for frame_data, detections in zip(frame_batch, batch_detections):
+                # フレームデータ取り出し
+                frame_rgb = frame_data['frame_rgb']
+                current_time = frame_data['current_time']
+                current_time_ns = frame_data['current_time_ns']
+                image_width = frame_data['image_width']
+                image_height = frame_data['image_height']
                     
-                    # アノテーション用にBGR変換（OpenCV描画のため）
-                    frame_bgr = cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2BGR)
-                    annotated_frame = tracker.annotate(frame_bgr, filtered_detections)
+                try:
+                    # デバッグ: 検出結果を確認（信頼度付き）
+                    if detections:
+                        det_summary = [f"{d['class']}({d['confidence']:.2f})" for d in detections[:5]]
+                        logger.info(f"🔍 YOLO検出結果: {len(detections)}個 - {det_summary}{'...' if len(detections) > 5 else ''}")
+                    else:
+                        logger.info(f"🔍 YOLO検出結果: 0個")
                     
-                    # 画像保存を非同期で実行（別スレッド）
-                    image_save_executor.submit(
-                        save_image_async,
-                        s3, dynamodb, bucket_name, camera_id,
-                        manager, frame_rgb.copy(), annotated_frame.copy(),
-                        current_time, detections, filtered_detections,
-                        image_width, image_height,
-                        detector_executor,
-                        event_publisher,
-                        should_fire_event=should_fire_event,
-                        save_reason=save_reason
+                    # 指定クラス + confidence閾値でフィルタリング（共通関数使用）
+                    logger.info(f"🔍 フィルタ条件: classes={manager.collect_classes}, confidence>={manager.confidence_threshold}")
+                    
+                    # 検出結果をフィールドごとの配列に変換し、フィルタ・エリア判定をベクトル化
+                    detection_arrays = build_detection_arrays(detections)
+                    keep_mask = class_filter_mask(
+                        detection_arrays,
+                        manager.collect_classes,
+                        manager.confidence_threshold
                     )
-                
-                processed_count += 1
-                worker_stats['processed_frames'] = processed_count
-                
-            except Exception as e:
-                logger.error(f"⚠️  YOLOワーカー処理エラー: {e}", exc_info=True)
+                    filtered_detections = [d for d, keep in zip(detections, keep_mask) if keep]
+                    filtered_arrays = {key: values[keep_mask] for key, values in detection_arrays.items()}
+                    
+                    # フィルタ後の結果を詳細に表示
+                    if filtered_detections:
+                        filtered_summary = [f"{d['class']}({d['confidence']:.2f})" for d in filtered_detections[:5]]
+                        logger.info(f"✅ 最終判定: {len(filtered_detections)}個を検出 - {filtered_summary}{'...' if len(filtered_detections) > 5 else ''}")
+                    else:
+                        logger.info(f"✅ 最終判定: 検出なし")
+                    
+                    # イベント発生条件をチェック（疎結合: detector を知らない）
+                    should_fire_event = manager.check_event_conditions(current_time_ns, filtered_detections, filtered_arrays)
+                    
+                    # 画像保存判定（イベント発火 or 定期保存）
+                    should_save, save_reason = manager.should_save_image_for_tracking(
+                        has_detector_trigger=should_fire_event,
+                        current_time_ns=current_time_ns
+                    )
+                    
+                    if should_save:
+                        logger.info(f"画像保存: 理由={save_reason}, should_fire_event={should_fire_event}")
+                        
+                        # BGRに1回だけ変換し、アノテーション描画と元画像のJPEGエンコードの両方で使う
+                        # （OpenCVの描画・エンコードはBGRが前提のため、保存スレッド側での再変換が不要になる）
+                        frame_bgr = cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2BGR)
+                        annotated_frame = tracker.annotate(frame_bgr, filtered_detections)
+                        
+                        # 画像保存を非同期で実行（別スレッド）
+                        # frame_bgrはここで新規確保され、annotated_frameはannotateが新規に返すため、コピー不要
+                        image_save_executor.submit(
+                            save_handler,
+                            s3, dynamodb, bucket_name, camera_id,
+                            manager, frame_bgr, annotated_frame,
+                            current_time, detections, filtered_detections,
+                            image_width, image_height,
+                            detector_executor,
+                            event_publisher,
+                            track_log_buffer,
+                            should_fire_event=should_fire_event,
+                            save_reason=save_reason,
+                            upload_executor=upload_executor
+                        )
+                    
+                    processed_count += 1
+                    worker_stats['processed_frames'] = processed_count
+                    
+                except Exception as e:
+                    logger.error(f"⚠️  YOLOワーカー処理エラー: {e}", exc_info=True)
+            
+            if stop_requested:
+                logger.info("🛑 YOLOワーカースレッド終了シグナル受信")
+                break
     
     except Exception as e:
         logger.error(f"❌ YOLOワーカースレッドでエラー: {e}", exc_info=True)
@@ -773,11 +1305,18 @@ def process_hls_stream_with_tracking(camera_id: str, bucket_name: str) -> None:
         起動時にDynamoDBから最新設定を読み込むため、ポーリングは不要。
     """
     # ThreadPoolExecutorを関数内で作成（再試行ループでも新規作成される）
-    image_save_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix='ImageSave')
+    image_save_executor = ThreadPoolExecutor(
+        max_workers=3, thread_name_prefix='ImageSave',
+        initializer=pin_current_thread, initargs=('save',)
+    )
     detector_executor = ThreadPoolExecutor(max_workers=5, thread_name_prefix='Detector')
+    # 元画像とアノテーション画像のS3アップロードを並列に行うためのExecutor
+    # （image_save_executor内から同じExecutorに投入して待つとデッドロックし得るため分離）
+    upload_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix='S3Upload')
+    dynamodb_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='DynamoDB')
     
-    # フレーム処理キュー（maxsize=1で最新フレームのみ保持）
-    processing_queue = Queue(maxsize=1)
+    # フレーム処理用リングバッファ（最大YOLO_BATCH_SIZE件保持、満杯時は古いフレームを破棄）
+    processing_queue = FrameRingBuffer(maxlen=YOLO_BATCH_SIZE)
     
     # ワーカースレッド統計情報
     worker_stats = {'processed_frames': 0}
@@ -785,6 +1324,9 @@ def process_hls_stream_with_tracking(camera_id: str, bucket_name: str) -> None:
     # YOLOワーカースレッド（Noneで初期化、後で設定）
     yolo_worker_thread = None
     
+    # トラックログ書き込みバッファ（Noneで初期化、後で設定）
+    track_log_buffer = None
+    
     # フレームカウンター
     frame_count = 0
     skipped_frame_count = 0
@@ -796,6 +1338,7 @@ def process_hls_stream_with_tracking(camera_id: str, bucket_name: str) -> None:
         # AWS クライアントの初期化
         s3 = get_s3_client()
         dynamodb = get_dynamodb_resource()
+        track_log_buffer = TrackLogBuffer(dynamodb, dynamodb_executor)
         
         # カメラ情報の取得
         camera_info = get_camera_info(camera_id)
@@ -844,7 +1387,9 @@ def process_hls_stream_with_tracking(camera_id: str, bucket_name: str) -> None:
                 camera_id,
                 image_save_executor,
                 detector_executor,
+                upload_executor,
                 event_publisher,
+                track_log_buffer,
                 worker_stats
             ),
             daemon=True,
@@ -856,6 +1401,7 @@ def process_hls_stream_with_tracking(camera_id: str, bucket_name: str) -> None:
         # HLS再接続ループ（ストリーム終了時は再接続、エラー時は外側に投げる）
         container = None
         hls_reconnect_count = 0
+        hls_backoff_count = 0  # 連続してフレームを受信できなかった再接続の回数
         
         while True:
             try:
@@ -869,14 +1415,20 @@ def process_hls_stream_with_tracking(camera_id: str, bucket_name: str) -> None:
                 
                 # pyavによりHLSストリームを開く
                 logger.info(f"📡 HLS接続開始（再接続回数: {hls_reconnect_count}）")
+                # デコードスレッド（FFmpeg内部スレッドも継承）をYOLOワーカーと別のCPUに固定
+                pin_current_thread('decoder')
                 container = av.open(hls_url, options=av_options)
                 video_stream = container.streams.video[0]
+                # FFmpeg内部のスレッド（フレーム/スライス並列）でデコードする
+                # ネイティブスレッドで実行されGILを保持しないため、YOLOワーカーと競合しない
+                video_stream.thread_type = 'AUTO'
                 
                 # ストリーム情報を表示
                 logger.info(f"入力ストリーム情報:")
                 logger.info(f"  - 解像度: {video_stream.width}x{video_stream.height}")
                 logger.info(f"  - フレームレート: {video_stream.average_rate}")
                 logger.info(f"  - コーデック: {video_stream.codec_context.name}")
+                logger.info(f"  - デコードスレッド: {video_stream.codec_context.thread_type}")
 
                 image_width = video_stream.width
                 image_height = video_stream.height
@@ -884,57 +1436,100 @@ def process_hls_stream_with_tracking(camera_id: str, bucket_name: str) -> None:
                 # 開始時刻を記録（FPS計算用）
                 start_time = time.time()
                 fps_frame_count = 0  # FPS計算用の別カウンター
+                
+                # トラッキング間隔に相当するフレーム数（平均フレームレートから算出）。
+                # 1フレーム手前から時刻判定を始めるよう1を引き、フレームレート不明時やトラッキング無効時はゲートしない
+                average_rate = video_stream.average_rate
+                if average_rate and manager.capture_track_interval_ms > 0:
+                    track_frame_gap = max(0, int(manager.capture_track_interval_ms * float(average_rate) / 1000) - 1)
+                else:
+                    track_frame_gap = 0
+                frames_since_track = track_frame_gap
+                # フレームスキップのDEBUGログ判定用（毎フレームのレベル判定を避ける）
+                debug_enabled = logger.isEnabledFor(logging.DEBUG)
+                logger.info(f"  - トラッキング判定フレーム間隔: {track_frame_gap}")
 
+                # 最後にトラッキング判定を行ったフレームの時刻（再接続の待機時間判定用）
+                current_time_ns = None
+                
                 # 入力ストリーム内のフレームを取得
                 logger.info("📹 HLSストリームのフレーム取得ループを開始します...")
                 for frame in container.decode(video=0):
                     frame_count += 1
+                    fps_frame_count += 1
+                    # 128フレームごとに取得FPSをログ出力（2の冪のマスク判定で剰余演算を避ける）
+                    if (fps_frame_count & 127) == 0:
+                        elapsed = time.time() - start_time
+                        logger.info(
+                            "📊 取得フレーム数: %d, 取得FPS: %.2f, 処理済み: %d, スキップ: %d",
+                            fps_frame_count, fps_frame_count / elapsed if elapsed > 0 else 0,
+                            worker_stats['processed_frames'], skipped_frame_count
+                        )
+                    
+                    # トラッキング間隔に満たないことがフレーム数から明らかなフレームは時刻取得も省略する
+                    # （時刻による間隔判定は下で従来どおり行う。capture.jpeg判定も最大1間隔分遅れるだけなので同様に省略）
+                    frames_since_track += 1
+                    if frames_since_track < track_frame_gap:
+                        continue
+                    
+                    # 終了要求があればフレーム取得を打ち切る
+                    if _shutdown_event.is_set():
+                        break
                     
-                    current_time = now_utc()
-                    current_time_ms = int(time.time() * 1000)
+                    # 間隔判定用の単調時刻のみ取得し、
+                    # UTC時刻（datetime）はトラッキング・capture.jpeg更新を行うフレームでのみ生成する
+                    current_time_ns = time.monotonic_ns()
+                    current_time = None
                     
-                    # トラッキング実行タイミング判定（毎フレーム実行）
-                    should_track = manager.should_do_tracking(current_time_ms)
+                    # トラッキング実行タイミング判定
+                    should_track = manager.should_do_tracking(current_time_ns)
                     
                     if should_track and manager.capture_track_interval_ms > 0:
-                        # フレームをRGB形式のnumpy arrayで取得（BGR変換しない）
-                        frame_rgb = frame.to_ndarray(format='rgb24')
+                        frame_yuv = None
+                        frame_rgb = None
+                        if frame.format.name == 'yuv420p' and frame.width % 2 == 0 and frame.height % 2 == 0:
+                            # HLS(H.264)の大半はYUV420P。デコードスレッドではプレーンを詰めるだけにし、
+                            # RGB変換はワーカー側でOpenCVで行う（スキップされたフレームは変換自体を省略）
+                            frame_yuv = frame.to_ndarray(format='yuv420p')
+                        else:
+                            # フレームをRGB形式のnumpy arrayで取得（BGR変換しない）
+                            frame_rgb = frame.to_ndarray(format='rgb24')
+                            # to_ndarrayはデコードごとに新規確保されたバッファを返すためコピー不要
+                            # 行パディングがある場合のみ連続配列に詰め直す（最大1回のコピー）
+                            if not frame_rgb.flags['C_CONTIGUOUS']:
+                                frame_rgb = np.ascontiguousarray(frame_rgb)
                         
-                        # キューが満杯なら古いフレームを破棄（フレームスキップ）
-                        if processing_queue.full():
-                            try:
-                                old_frame = processing_queue.get_nowait()
-                                skipped_frame_count += 1
-                                logger.debug(f"⏭️  フレームスキップ: {old_frame['current_time']}")
-                            except Empty:
-                                pass
+                        current_time = now_utc()
                         
-                        # 最新フレームをキューに投入
+                        # 最新フレームを投入（未処理の古いフレームは破棄＝フレームスキップ）
                         frame_data = {
-                            'frame_rgb': frame_rgb.copy(),  # コピーして安全に渡す
+                            'frame_yuv': frame_yuv,
+                            'frame_rgb': frame_rgb,
                             'current_time': current_time,
-                            'current_time_ms': current_time_ms,
+                            'current_time_ns': current_time_ns,
                             'image_width': image_width,
                             'image_height': image_height
                         }
-                        processing_queue.put(frame_data)
+                        old_frame = processing_queue.put(frame_data)
+                        if old_frame is not None:
+                            skipped_frame_count += 1
+                            if debug_enabled:
+                                logger.debug("⏭️  フレームスキップ: %s", old_frame['current_time'])
                         
                         # トラック時刻を更新（ワーカーの完了を待たない）
-                        manager.update_track_time(current_time_ms)
+                        manager.update_track_time(current_time_ns)
+                        frames_since_track = 0
                     
                     # capture.jpeg更新（10分間隔）
-                    if manager.should_update_capture_jpeg(current_time):
-                        capture_and_save_capture_jpeg(
-                            frame, current_time, camera_id, bucket_name, s3, dynamodb
+                    # エンコード・S3アップロード・DynamoDB更新は画像保存スレッドで行い、デコードを止めない
+                    # （pyavのフレームバッファは再利用され得るため、BGRのnumpy配列に変換してから渡す）
+                    if manager.should_update_capture_jpeg(current_time_ns):
+                        image_save_executor.submit(
+                            capture_and_save_capture_jpeg,
+                            frame.to_ndarray(format='bgr24'), current_time or now_utc(),
+                            camera_id, bucket_name, s3, dynamodb
                         )
-                        manager.update_capture_jpeg_time(current_time)
-                    
-                    fps_frame_count += 1
-                    if fps_frame_count % 100 == 0:
-                        elapsed = time.time() - start_time
-                        fps = fps_frame_count / elapsed if elapsed > 0 else 0
-                        processed = worker_stats.get('processed_frames', 0)
-                        logger.info(f"📊 取得フレーム数: {fps_frame_count}, 取得FPS: {fps:.2f}, 処理済み: {processed}, スキップ: {skipped_frame_count}")
+                        manager.update_capture_jpeg_time(current_time_ns)
 
                 # ループが正常終了した場合（ストリーム終了）
                 logger.warning(f"⚠️  HLSストリームのフレーム取得ループが終了しました（取得フレーム数: {fps_frame_count}）")
@@ -947,10 +1542,23 @@ def process_hls_stream_with_tracking(camera_id: str, bucket_name: str) -> None:
                     except Exception as e:
                         logger.warning(f"⚠️  AVコンテナのクローズに失敗: {e}")
                 
-                # 1秒待機後にHLS再接続
+                if _shutdown_event.is_set():
+                    logger.info("🛑 終了要求を受信したため、HLS再接続を行わずに終了します")
+                    return
+                
+                # 直前までフレームを受信できていた場合は即時再接続、そうでなければ指数バックオフ
                 hls_reconnect_count += 1
-                logger.info("🔄 1秒待機後、HLSストリームを再接続します...")
-                time.sleep(1)  # nosemgrep: arbitrary-sleep - 意図的な待機（HLS再接続間隔）
+                if current_time_ns is not None and time.monotonic_ns() - current_time_ns < HLS_RECENT_FRAME_SEC * 1_000_000_000:
+                    hls_backoff_count = 0
+                    wait_sec = 0
+                else:
+                    wait_sec = min(HLS_RECONNECT_MAX_WAIT_SEC, 2 ** hls_backoff_count)
+                    hls_backoff_count += 1
+                logger.info(f"🔄 {wait_sec}秒待機後、HLSストリームを再接続します...")
+                # 終了要求（SIGTERM）で待機を中断する
+                if wait_sec and _shutdown_event.wait(wait_sec):
+                    logger.info("🛑 終了要求を受信したため、HLS再接続を行わずに終了します")
+                    return
                 # while Trueループの先頭に戻る（HLS再接続）
                 
             except Exception as e:
@@ -992,9 +1600,48 @@ def process_hls_stream_with_tracking(camera_id: str, bucket_name: str) -> None:
             logger.info("detector_executor シャットダウン完了")
         except Exception as e:
             logger.error(f"detector_executor シャットダウンエラー: {e}")
+        
+        try:
+            upload_executor.shutdown(wait=True)
+            logger.info("upload_executor シャットダウン完了")
+        except Exception as e:
+            logger.error(f"upload_executor シャットダウンエラー: {e}")
+        
+        # バッファに残っているトラックログを書き込む
+        if track_log_buffer:
+            track_log_buffer.flush()
+        
+        try:
+            dynamodb_executor.shutdown(wait=True)
+            logger.info("dynamodb_executor シャットダウン完了")
+        except Exception as e:
+            logger.error(f"dynamodb_executor シャットダウンエラー: {e}")
 
 
-def upload_annotated_image(s3, bucket_name: str, s3_key: str, frame, is_bgr: bool = False) -> bool:
+def encode_jpeg(frame, quality: int = 95):
+    """
+    フレームをOpenCV（libjpeg-turbo）でJPEGエンコード
+    
+    Args:
+        frame: pyav.VideoFrame または numpy array (BGR)
+        quality: JPEG画質
+        
+    Returns:
+        JPEGバイト列、エンコード失敗時はNone
+    """
+    if hasattr(frame, 'to_ndarray'):
+        # pyav.VideoFrameはPIL Imageを経由せずBGRで取り出す
+        frame_bgr = frame.to_ndarray(format='bgr24')
+    else:
+        frame_bgr = frame
+    
+    ok, encoded = cv2.imencode('.jpg', frame_bgr, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        return None
+    return encoded.tobytes()
+
+
+def upload_annotated_image(s3, bucket_name: str, s3_key: str, frame) -> bool:
     """
     画像をS3にアップロード
     
@@ -1002,30 +1649,16 @@ def upload_annotated_image(s3, bucket_name: str, s3_key: str, frame, is_bgr: boo
         s3: S3クライアント
         bucket_name: バケット名
         s3_key: S3キー
-        frame: pyav.VideoFrame または numpy array (RGB or BGR)
-        is_bgr: True の場合、BGRとして扱う（アノテーション画像用）
+        frame: pyav.VideoFrame または numpy array (BGR)
         
     Returns:
         成功したかどうか
     """
     try:
-        # pyav.VideoFrameの場合はPIL Imageに変換
-        if hasattr(frame, 'to_image'):
-            img = frame.to_image()
-        else:
-            # numpy arrayの場合
-            if is_bgr:
-                # BGR → RGB 変換
-                img_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                img = Image.fromarray(img_rgb)
-            else:
-                # RGB形式 → そのまま PIL に変換
-                img = Image.fromarray(frame)
-        
-        # JPEGに変換
-        img_byte_arr = io.BytesIO()
-        img.save(img_byte_arr, format='JPEG', quality=95)
-        img_bytes = img_byte_arr.getvalue()
+        img_bytes = encode_jpeg(frame, quality=95)
+        if img_bytes is None:
+            logger.error("JPEGエンコードに失敗しました")
+            return False
         
         # S3アップロード
         return upload_to_s3_with_retry(s3, bucket_name, s3_key, img_bytes)
@@ -1035,18 +1668,84 @@ def upload_annotated_image(s3, bucket_name: str, s3_key: str, frame, is_bgr: boo
         return False
 
 
-def save_image_async(
+def _upload_images_and_file_record(
+    s3, dynamodb, bucket_name: str, camera_id: str,
+    manager, frame, annotated_frame, current_time,
+    upload_executor: ThreadPoolExecutor = None
+):
+    """
+    元画像・アノテーション画像のS3アップロードとFILE_TABLEへの保存（イベントタイプ共通部分）
+    
+    Returns:
+        tuple: (file_data, s3path_orig, s3path_detect)、失敗時はNone
+               file_data は FILE_TABLE に保存したレコード（detect-log 保存にそのまま使う）
+    """
+    # S3パス生成（元画像）- collector_id を使用
+    s3_key_orig, s3path_orig = generate_s3_path(
+        camera_id, manager.collector_id, 'image', 
+        current_time, bucket_name, 'jpeg'
+    )
+    
+    # S3パス生成（アノテーション画像）- collector_id を使用
+    s3_key_detect, s3path_detect = generate_s3_path(
+        camera_id, manager.collector_id, 'image_detect', 
+        current_time, bucket_name, 'jpeg'
+    )
+    
+    # 元画像とアノテーション画像（いずれもBGR形式）をS3にアップロード
+    # upload_executorがあれば元画像を別スレッドで並列にアップロードする
+    if upload_executor is not None:
+        orig_future = upload_executor.submit(upload_annotated_image, s3, bucket_name, s3_key_orig, frame)
+        detect_uploaded = upload_annotated_image(s3, bucket_name, s3_key_detect, annotated_frame)
+        orig_uploaded = orig_future.result()
+    else:
+        orig_uploaded = upload_annotated_image(s3, bucket_name, s3_key_orig, frame)
+        detect_uploaded = orig_uploaded and upload_annotated_image(s3, bucket_name, s3_key_detect, annotated_frame)
+    
+    if not orig_uploaded:
+        logger.error(f"元画像のアップロードに失敗: {s3path_orig}")
+        return None
+    
+    logger.info(f"元画像をS3にアップロード: {s3path_orig}")
+    
+    if not detect_uploaded:
+        logger.error(f"アノテーション画像のアップロードに失敗: {s3path_detect}")
+        return None
+    
+    logger.info(f"アノテーション画像をS3にアップロード: {s3path_detect}")
+    
+    # FILE_TABLE に保存
+    file_data = insert_file_record(
+        dynamodb, camera_id, current_time, current_time,
+        s3path_orig, manager.collector_id, 'image',
+        s3path_detect=s3path_detect
+    )
+    
+    if not file_data:
+        logger.error(f"ファイルレコードの保存に失敗")
+        return None
+    
+    logger.info(f"ファイルレコード保存: {file_data['file_id']}")
+    return file_data, s3path_orig, s3path_detect
+
+
+def _save_class_detect_async(
     s3, dynamodb, bucket_name: str, camera_id: str, 
     manager, frame, annotated_frame,
     current_time, detections, filtered_detections,
     image_width: int, image_height: int,
     detector_executor,
     event_publisher,
+    track_log_buffer,
     should_fire_event: bool = False,
-    save_reason: str = 'detector'
+    save_reason: str = 'detector',
+    upload_executor: ThreadPoolExecutor = None
 ):
     """
-    画像保存を非同期で実行（疎結合: detector を知らない）
+    画像保存を非同期で実行（class_detect用、疎結合: detector を知らない）
+    
+    エリア判定を行わないイベントタイプ（class_detect 以外の未知のタイプを含む）はこちらで処理する。
+    select_save_handler() が返す画像保存関数はすべてこの引数で呼び出される。
     
     Args:
         s3: S3クライアント
@@ -1054,7 +1753,7 @@ def save_image_async(
         bucket_name: S3バケット名
         camera_id: カメラID
         manager: TrackingManagerインスタンス
-        frame: 元画像フレーム
+        frame: 元画像フレーム（BGR形式）
         annotated_frame: アノテーション付き画像フレーム
         current_time: 現在時刻
         save_reason: 保存理由 ('detector' or 'periodic')
@@ -1064,230 +1763,248 @@ def save_image_async(
         image_height: 画像高さ
         detector_executor: detector実行用のThreadPoolExecutor（未使用、互換性のため残す）
         event_publisher: EventBridgePublisherインスタンス
+        track_log_buffer: トラックログ書き込みバッファ
         should_fire_event: イベントを発火すべきか（bool）
+        upload_executor: 元画像のアップロードを並列実行するThreadPoolExecutor（Noneの場合は順次アップロード）
     """
     try:
-        # S3パス生成（元画像）- collector_id を使用
-        s3_key_orig, s3path_orig = generate_s3_path(
-            camera_id, manager.collector_id, 'image', 
-            current_time, bucket_name, 'jpeg'
+        saved = _upload_images_and_file_record(
+            s3, dynamodb, bucket_name, camera_id,
+            manager, frame, annotated_frame, current_time,
+            upload_executor
         )
+        if saved is None:
+            return
+        file_data, s3path_orig, s3path_detect = saved
+        file_id = file_data['file_id']
         
-        # S3パス生成（アノテーション画像）- collector_id を使用
-        s3_key_detect, s3path_detect = generate_s3_path(
-            camera_id, manager.collector_id, 'image_detect', 
-            current_time, bucket_name, 'jpeg'
+        # TRACK_LOG_TABLE に保存
+        # イベント発火時はEventBridge発行前に書き込みを確定させる（即時フラッシュ）
+        track_log_id, track_data = save_track_log(
+            track_log_buffer, camera_id, manager.collector_id,
+            current_time, detections, filtered_detections,
+            file_id, image_width, image_height,
+            None, manager.detect_area_polygon,
+            None, None,
+            flush=should_fire_event
         )
         
-        # 元画像をS3にアップロード（RGB形式）
-        if not upload_annotated_image(s3, bucket_name, s3_key_orig, frame, is_bgr=False):
-            logger.error(f"元画像のアップロードに失敗: {s3path_orig}")
-            return
-        
-        logger.info(f"元画像をS3にアップロード: {s3path_orig}")
+        logger.info(f"トラックログ保存: {track_log_id}")
         
-        # アノテーション画像をS3にアップロード（BGR形式）
-        if not upload_annotated_image(s3, bucket_name, s3_key_detect, annotated_frame, is_bgr=True):
-            logger.error(f"アノテーション画像のアップロードに失敗: {s3path_detect}")
+        # class_detect 以外では check_event_conditions がイベントを発火しない
+        if not should_fire_event:
             return
         
-        logger.info(f"アノテーション画像をS3にアップロード: {s3path_detect}")
+        # ClassDetectEvent を発行（疎結合: 1回のみ、detector_id なし）
+        if not filtered_detections:
+            logger.info("[ClassDetectEvent] filtered_detections が空のため、イベント発行をスキップ")
+            return
         
-        # FILE_TABLE に保存
-        file_id = insert_file_record(
-            dynamodb, camera_id, current_time, current_time,
-            s3path_orig, manager.collector_id, 'image',
-            s3path_detect=s3path_detect
+        logger.info(f"【⭐️⭐️⭐️ EventBridge発行: ClassDetectEvent ⭐️⭐️⭐️】collector_id={manager.collector_id}")
+        event_publisher.publish_class_detect_event(
+            camera_id=camera_id,
+            collector_id=manager.collector_id,
+            file_id=file_id,
+            s3path=s3path_orig,
+            s3path_detect=s3path_detect,
+            track_log_id=track_log_id,
+            detections=detections,
+            filtered_detections=filtered_detections,
+            image_width=image_width,
+            image_height=image_height,
+            timestamp=current_time
         )
         
-        if not file_id:
-            logger.error(f"ファイルレコードの保存に失敗")
-            return
+        # detect-log 保存（仮想 Detector を使用）
+        if manager.virtual_detector_id:
+            # 検出情報を構築（共通関数使用）
+            detections_data = build_class_detect_data(detections, filtered_detections)
+            
+            detect_log_result = save_class_detect_log(
+                detector_id=manager.virtual_detector_id,
+                file_data=file_data,
+                detections=detections_data,
+                track_log_id=track_log_id,
+                s3path_detect=s3path_detect
+            )
+            if detect_log_result:
+                logger.info(f"detect-log 保存完了 (class_detect): {detect_log_result.get('detect_log_id')}")
+            else:
+                logger.warning("detect-log 保存に失敗しました (class_detect)")
         
-        logger.info(f"ファイルレコード保存: {file_id}")
+    except Exception as e:
+        logger.error(f"画像保存処理でエラー: {e}", exc_info=True)
+
+
+def _save_area_detect_async(
+    s3, dynamodb, bucket_name: str, camera_id: str, 
+    manager, frame, annotated_frame,
+    current_time, detections, filtered_detections,
+    image_width: int, image_height: int,
+    detector_executor,
+    event_publisher,
+    track_log_buffer,
+    should_fire_event: bool = False,
+    save_reason: str = 'detector',
+    upload_executor: ThreadPoolExecutor = None,
+    area_polygon: list = None
+):
+    """
+    画像保存を非同期で実行（area_detect用、引数は_save_class_detect_asyncと同じ）
+    
+    Args:
+        area_polygon: イベントに載せるエリアポリゴン座標リスト（select_save_handlerで事前計算）
+    """
+    try:
+        saved = _upload_images_and_file_record(
+            s3, dynamodb, bucket_name, camera_id,
+            manager, frame, annotated_frame, current_time,
+            upload_executor
+        )
+        if saved is None:
+            return
+        file_data, s3path_orig, s3path_detect = saved
+        file_id = file_data['file_id']
         
-        # TRACK_LOG_TABLE に保存
-        area_track_ids = manager.previous_area_track_ids if manager.track_eventtype == 'area_detect' else None
-        # area_detectの場合、entered_ids と exited_ids を渡す
-        entered_ids = set(manager.intrusion_ids) if manager.track_eventtype == 'area_detect' else None
-        exited_ids = set(manager.exit_ids) if manager.track_eventtype == 'area_detect' else None
+        # TRACK_LOG_TABLE に保存（entered_ids と exited_ids を渡す）
+        intrusion_ids = manager.intrusion_ids
+        exit_ids = manager.exit_ids
         
+        # イベント発火時はEventBridge発行前に書き込みを確定させる（即時フラッシュ）
         track_log_id, track_data = save_track_log(
-            dynamodb, camera_id, manager.collector_id,
+            track_log_buffer, camera_id, manager.collector_id,
             current_time, detections, filtered_detections,
             file_id, image_width, image_height,
-            area_track_ids, manager.detect_area_polygon,
-            entered_ids, exited_ids
+            manager.previous_area_track_ids, manager.detect_area_polygon,
+            intrusion_ids, exit_ids,
+            flush=should_fire_event
         )
         
         logger.info(f"トラックログ保存: {track_log_id}")
         
-        # EventBridgeイベントを発行（疎結合: 1回のみ、detector_id なし）
-        if should_fire_event:
-            if manager.track_eventtype == 'class_detect':
-                # 1. ClassDetectEvent を発行
-                if not filtered_detections:
-                    logger.info("[ClassDetectEvent] filtered_detections が空のため、イベント発行をスキップ")
-                else:
-                    logger.info(f"【⭐️⭐️⭐️ EventBridge発行: ClassDetectEvent ⭐️⭐️⭐️】collector_id={manager.collector_id}")
-                    event_publisher.publish_class_detect_event(
-                        camera_id=camera_id,
-                        collector_id=manager.collector_id,
-                        file_id=file_id,
-                        s3path=s3path_orig,
-                        s3path_detect=s3path_detect,
-                        track_log_id=track_log_id,
-                        detections=detections,
-                        filtered_detections=filtered_detections,
-                        image_width=image_width,
-                        image_height=image_height,
-                        timestamp=current_time
-                    )
+        if not should_fire_event:
+            return
+        
+        # AreaDetectEvent を発行（疎結合: 1回のみ、detector_id なし）
+        # エリア変化がない場合はイベント発行しない
+        has_area_change = bool(intrusion_ids or exit_ids or manager.area_event_triggered)
+        
+        if not has_area_change:
+            logger.info("[AreaDetectEvent] エリア変化がないため、イベント発行をスキップ")
+        else:
+            logger.info(f"【⭐️⭐️⭐️ EventBridge発行: AreaDetectEvent ⭐️⭐️⭐️】collector_id={manager.collector_id}, method={manager.area_detect_method}, intrusion_count={manager.intrusion_count}, exit_count={manager.exit_count}")
+            event_publisher.publish_area_detect_event(
+                camera_id=camera_id,
+                collector_id=manager.collector_id,
+                file_id=file_id,
+                s3path=s3path_orig,
+                s3path_detect=s3path_detect,
+                track_log_id=track_log_id,
+                time=track_data['time'],
+                track_alldata=track_data['track_alldata'],
+                track_classdata=track_data['track_classdata'],
+                area_in_data=track_data['area_in_data'],
+                area_out_data=track_data['area_out_data'],
+                area_in_count=track_data['area_in_count'],
+                area_out_count=track_data['area_out_count'],
+                intrusion_ids=intrusion_ids,
+                exit_ids=exit_ids,
+                area_polygon=area_polygon,
+                image_width=image_width,
+                image_height=image_height,
+                timestamp=current_time,
+                area_detect_method=manager.area_detect_method,
+                intrusion_count=manager.intrusion_count,
+                exit_count=manager.exit_count
+            )
             
-            elif manager.track_eventtype == 'area_detect':
-                # 2. AreaDetectEvent を発行
-                intrusion_ids = manager.intrusion_ids
-                exit_ids = manager.exit_ids
-                
-                # エリア変化がない場合はイベント発行しない
-                has_area_change = bool(intrusion_ids or exit_ids or manager.area_event_triggered)
-                
-                if not has_area_change:
-                    logger.info("[AreaDetectEvent] エリア変化がないため、イベント発行をスキップ")
-                else:
-                    # エリアポリゴンを座標リストに変換
-                    area_polygon = None
-                    if manager.detect_area_polygon and SHAPELY_AVAILABLE:
-                        try:
-                            coords = list(manager.detect_area_polygon.exterior.coords)
-                            area_polygon = [[int(x), int(y)] for x, y in coords[:-1]]
-                        except Exception as e:
-                            logger.warning(f"エリアポリゴン座標の取得エラー: {e}")
-                    
-                    logger.info(f"【⭐️⭐️⭐️ EventBridge発行: AreaDetectEvent ⭐️⭐️⭐️】collector_id={manager.collector_id}, method={manager.area_detect_method}, intrusion_count={manager.intrusion_count}, exit_count={manager.exit_count}")
-                    event_publisher.publish_area_detect_event(
-                        camera_id=camera_id,
-                        collector_id=manager.collector_id,
-                        file_id=file_id,
-                        s3path=s3path_orig,
-                        s3path_detect=s3path_detect,
-                        track_log_id=track_log_id,
-                        time=track_data['time'],
-                        track_alldata=track_data['track_alldata'],
-                        track_classdata=track_data['track_classdata'],
-                        area_in_data=track_data['area_in_data'],
-                        area_out_data=track_data['area_out_data'],
-                        area_in_count=track_data['area_in_count'],
-                        area_out_count=track_data['area_out_count'],
-                        intrusion_ids=intrusion_ids,
-                        exit_ids=exit_ids,
-                        area_polygon=area_polygon,
-                        image_width=image_width,
-                        image_height=image_height,
-                        timestamp=current_time,
-                        area_detect_method=manager.area_detect_method,
-                        intrusion_count=manager.intrusion_count,
-                        exit_count=manager.exit_count
-                    )
-                    
-                    # イベント発行後にフラグをリセット
-                    manager.area_event_triggered = False
+            # イベント発行後にフラグをリセット
+            manager.area_event_triggered = False
         
         # detect-log 保存（仮想 Detector を使用）
-        if should_fire_event and manager.virtual_detector_id:
-            # file_data を構築（insert_file_record と同じ情報）
-            file_data = {
-                'file_id': file_id,
-                'camera_id': camera_id,
-                'collector_id': manager.collector_id,
-                'file_type': 'image',
-                's3path': s3path_orig,
-                's3path_detect': s3path_detect,
-                'start_time': format_for_db(current_time),
-                'end_time': format_for_db(current_time)
-            }
-            # NOTE: insert_file_record は file_id のみ返却するため、ここで file_data を構築している
-            #       将来的に insert_file_record が file_data 全体を返すように変更すれば、この重複は解消できる
+        if manager.virtual_detector_id:
+            intrusion_count = manager.intrusion_count
+            exit_count = manager.exit_count
             
-            if manager.track_eventtype == 'class_detect':
-                # ClassDetect の detect-log 保存
-                if filtered_detections:
-                    # 検出情報を構築（共通関数使用）
-                    detections_data = build_class_detect_data(detections, filtered_detections)
-                    
-                    detect_log_result = save_class_detect_log(
-                        detector_id=manager.virtual_detector_id,
-                        file_data=file_data,
-                        detections=detections_data,
-                        track_log_id=track_log_id,
-                        s3path_detect=s3path_detect
-                    )
-                    if detect_log_result:
-                        logger.info(f"detect-log 保存完了 (class_detect): {detect_log_result.get('detect_log_id')}")
-                    else:
-                        logger.warning("detect-log 保存に失敗しました (class_detect)")
+            # 変化があるかどうかの判定（IDs または Count で判定）
+            has_area_change = bool(intrusion_ids or exit_ids or intrusion_count > 0 or exit_count > 0 or manager.area_event_triggered)
             
-            elif manager.track_eventtype == 'area_detect':
-                # AreaDetect の detect-log 保存
-                intrusion_ids = manager.intrusion_ids
-                exit_ids = manager.exit_ids
-                intrusion_count = manager.intrusion_count
-                exit_count = manager.exit_count
+            if has_area_change:
+                # area_event を構築
+                # event_type は IDs または Count で判定（class_count_change モードでは IDs は空）
+                event_type = 'no_change'
+                has_intrusion = bool(intrusion_ids) or intrusion_count > 0
+                has_exit = bool(exit_ids) or exit_count > 0
                 
-                # 変化があるかどうかの判定（IDs または Count で判定）
-                has_area_change = bool(intrusion_ids or exit_ids or intrusion_count > 0 or exit_count > 0 or manager.area_event_triggered)
+                if has_intrusion and has_exit:
+                    event_type = 'both'
+                elif has_intrusion:
+                    event_type = 'intrusion'
+                elif has_exit:
+                    event_type = 'exit'
                 
-                if has_area_change:
-                    # area_event を構築
-                    # event_type は IDs または Count で判定（class_count_change モードでは IDs は空）
-                    event_type = 'no_change'
-                    has_intrusion = bool(intrusion_ids) or intrusion_count > 0
-                    has_exit = bool(exit_ids) or exit_count > 0
-                    
-                    if has_intrusion and has_exit:
-                        event_type = 'both'
-                    elif has_intrusion:
-                        event_type = 'intrusion'
-                    elif has_exit:
-                        event_type = 'exit'
-                    
-                    logger.info(f"detect-log 保存準備: event_type={event_type}, intrusion_count={intrusion_count}, exit_count={exit_count}, intrusion_ids={intrusion_ids}, exit_ids={exit_ids}")
-                    
-                    area_event = {
-                        'type': event_type,
-                        'intrusion_ids': list(intrusion_ids) if intrusion_ids else [],
-                        'exit_ids': list(exit_ids) if exit_ids else [],
-                        'intrusion_count': intrusion_count,
-                        'exit_count': exit_count
-                    }
-                    
-                    detect_log_result = save_area_detect_log(
-                        detector_id=manager.virtual_detector_id,
-                        file_data=file_data,
-                        area_event=area_event,
-                        area_in_data=track_data['area_in_data'],
-                        area_out_data=track_data['area_out_data'],
-                        area_in_count=track_data['area_in_count'],
-                        area_out_count=track_data['area_out_count'],
-                        area_detect_method=manager.area_detect_method,
-                        track_log_id=track_log_id,
-                        s3path_detect=s3path_detect
-                    )
-                    if detect_log_result:
-                        logger.info(f"detect-log 保存完了 (area_detect): {detect_log_result.get('detect_log_id')}")
-                    else:
-                        logger.warning("detect-log 保存に失敗しました (area_detect)")
+                logger.info(f"detect-log 保存準備: event_type={event_type}, intrusion_count={intrusion_count}, exit_count={exit_count}, intrusion_ids={intrusion_ids}, exit_ids={exit_ids}")
+                
+                area_event = {
+                    'type': event_type,
+                    'intrusion_ids': intrusion_ids,
+                    'exit_ids': exit_ids,
+                    'intrusion_count': intrusion_count,
+                    'exit_count': exit_count
+                }
+                
+                detect_log_result = save_area_detect_log(
+                    detector_id=manager.virtual_detector_id,
+                    file_data=file_data,
+                    area_event=area_event,
+                    area_in_data=track_data['area_in_data'],
+                    area_out_data=track_data['area_out_data'],
+                    area_in_count=track_data['area_in_count'],
+                    area_out_count=track_data['area_out_count'],
+                    area_detect_method=manager.area_detect_method,
+                    track_log_id=track_log_id,
+                    s3path_detect=s3path_detect
+                )
+                if detect_log_result:
+                    logger.info(f"detect-log 保存完了 (area_detect): {detect_log_result.get('detect_log_id')}")
+                else:
+                    logger.warning("detect-log 保存に失敗しました (area_detect)")
         
     except Exception as e:
         logger.error(f"画像保存処理でエラー: {e}", exc_info=True)
 
 
+def select_save_handler(manager):
+    """
+    イベントタイプに応じた画像保存関数を選択（カメラの稼働中にイベントタイプは変わらないため起動時に1回だけ判定）
+    
+    Args:
+        manager: TrackingManagerインスタンス
+        
+    Returns:
+        callable: _save_class_detect_asyncと同じ引数を取る画像保存関数
+    """
+    if manager.track_eventtype != 'area_detect':
+        return _save_class_detect_async
+    
+    # エリアポリゴンを座標リストに変換（ポリゴンは不変のため事前に1回だけ計算）
+    area_polygon = None
+    if manager.detect_area_polygon and SHAPELY_AVAILABLE:
+        try:
+            coords = list(manager.detect_area_polygon.exterior.coords)
+            area_polygon = [[int(x), int(y)] for x, y in coords[:-1]]
+        except Exception as e:
+            logger.warning(f"エリアポリゴン座標の取得エラー: {e}")
+    
+    return functools.partial(_save_area_detect_async, area_polygon=area_polygon)
+
+
 def capture_and_save_capture_jpeg(frame, current_time, camera_id, bucket_name, s3, dynamodb):
     """
     capture.jpegを更新
     
     Args:
-        frame: キャプチャするフレーム
+        frame: キャプチャするフレーム（BGR形式のnumpy arrayまたはpyav.VideoFrame）
         current_time: 現在時刻
         camera_id: カメラID
         bucket_name: S3バケット名
@@ -1295,16 +2012,11 @@ def capture_and_save_capture_jpeg(frame, current_time, camera_id, bucket_name, s
         dynamodb: DynamoDBリソース
     """
     try:
-        # pyav.VideoFrameの場合はPIL Imageに変換
-        if hasattr(frame, 'to_image'):
-            img = frame.to_image()
-        else:
-            # numpy arrayの場合
-            img = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-        
-        img_byte_arr = io.BytesIO()
-        img.save(img_byte_arr, format='JPEG')
-        img_byte_arr = img_byte_arr.getvalue()
+        # 画質はPILのデフォルトと同じ75
+        img_byte_arr = encode_jpeg(frame, quality=75)
+        if img_byte_arr is None:
+            logger.error("capture.jpegのJPEGエンコードに失敗しました")
+            return
 
         s3_key = f"collect/{camera_id}/capture.jpg"
         s3path = f"s3://{bucket_name}/{s3_key}"
@@ -1335,20 +2047,31 @@ def streaming(camera_id: str, bucket_name: str) -> None:
     - 設定変更時はAPIがECSタスクを停止し、サービスが自動的に再起動
     - エラー発生時は再試行（再接続対応）
     """
+    # ECSタスク停止時のSIGTERMで再接続待機を中断し、バッファのフラッシュ等を行って終了する
+    def _handle_sigterm(signum, frame):
+        logger.info("🛑 SIGTERMを受信しました。処理を終了します...")
+        _shutdown_event.set()
+    
+    signal.signal(signal.SIGTERM, _handle_sigterm)
+    
     # エラーが発生しても再試行を繰り返す無限ループ
     # 設定変更時はAPIがECSタスクを停止し、サービスが自動的にタスクを再起動する
-    while True:
+    while not _shutdown_event.is_set():
         try:
             logger.info(f"HLS+YOLOトラッキング処理（イベント駆動版）を開始します: カメラID={camera_id}")
             process_hls_stream_with_tracking(camera_id, bucket_name)
+            if _shutdown_event.is_set():
+                break
             # ✅ process_hls_stream_with_tracking内でHLS再接続ループが動いているため、
             # ここに到達するのは例外発生時のみ
             logger.warning("⚠️  process_hls_stream_with_tracking が予期せず正常終了しました")
-            time.sleep(1)  # nosemgrep: arbitrary-sleep - 意図的な待機（再試行間隔）
+            _shutdown_event.wait(1)
         except Exception as e:
             logger.error(f"エラーが発生しました: {e}")
             logger.info(f"{RETRY_WAIT_SEC}秒待機後、処理を再試行します...")
-            time.sleep(RETRY_WAIT_SEC)
+            _shutdown_event.wait(RETRY_WAIT_SEC)
+    
+    logger.info("✅ HLS+YOLOトラッキング処理を終了しました")
 
 
 if __name__ == "__main__":
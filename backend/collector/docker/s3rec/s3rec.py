@@ -2,14 +2,25 @@ import boto3
 import os
 import json
 from datetime import datetime, timedelta, UTC, timezone
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 import sys
 import logging
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # common_setup.pyを実行してsys.pathに追加
 from shared.common import *
 from shared.eventbridge_publisher import EventBridgePublisher
 
+# orjson（レスポンスボディの高速シリアライズ用、オプション）
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # 環境変数の取得とエラーハンドリング
 CAMERA_ID = os.environ.get('CAMERA_ID')
 if not CAMERA_ID:
@@ -26,12 +37,88 @@ if not BUCKET_NAME:
     print("ERROR: BUCKET_NAME環境変数が設定されていません。")
     sys.exit(1)
 
+# カメラ情報のキャッシュ有効期間（秒）。ウォームスタート時はDynamoDBを参照しない
+CAMERA_INFO_CACHE_TTL_SEC = 300
+# バッチ内の複数オブジェクトを並列処理する最大スレッド数
+# （S3/DynamoDBクライアントの接続プールとアダプティブリトライは shared.common の設定を共有し、
+#   プールサイズはDockerfileのAWS_MAX_POOL_CONNECTIONSで並列度に合わせて広げている）
+MAX_PARALLEL_RECORDS = 10
+# 再配信の仕組みがない呼び出し（EventBridge直接）で、一時的なエラー（500）を再試行する最大回数と初回待機時間
+MAX_PROCESS_ATTEMPTS = 3
+RETRY_BASE_DELAY_SEC = 0.5
+# テスト用: 設定するとカメラ情報を毎回DynamoDBから取得する
+INVALIDATE_CACHE = os.environ.get('INVALIDATE_CACHE', '').lower() in ('1', 'true', 'yes')
+
+# CopyObject（単一リクエスト）でコピーできる最大サイズ。これを超える場合はマネージドのマルチパートコピーを使う
+MAX_SINGLE_COPY_SIZE = 5 * 1024 * 1024 * 1024
+
+# フォールバック時のストリーミングアップロード設定（8MBごとのマルチパートで、本体全体をメモリに載せない）
+STREAM_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    use_threads=True
+)
+
 # Initialize AWS clients
 dynamodb = get_dynamodb_resource()
 s3_client = get_s3_client()
 
-# ロガーの設定
-logger = setup_logger('s3Rec')
+# ロガーの設定（本番ではLOG_LEVEL=WARNINGでINFOログを抑制できる）
+logger = setup_logger('s3Rec', getattr(logging, os.environ.get('LOG_LEVEL', 'INFO').upper(), logging.INFO))
+
+# EventBridgePublisherを初期化（疎結合: detector を知らない）
+# AWSクライアントと同様にモジュールスコープで作成し、ウォームスタート時は再利用する
+try:
+    event_publisher = EventBridgePublisher(
+        create_boto3_session_func=create_boto3_session,
+        collector_type='s3Rec',
+        event_bus_name=os.environ.get('EVENT_BUS_NAME', 'default')
+    )
+    logger.info("EventBridgePublisher初期化完了: collector_id=%s", COLLECTOR_ID)
+except Exception as e:
+    logger.warning("EventBridgePublisher初期化に失敗しました（処理は継続）: %s", e)
+    event_publisher = None
+
+def _to_json(obj):
+    """
+    レスポンスボディをJSON文字列に変換（orjsonが利用可能な場合はorjsonを使用）
+    
+    Args:
+        obj: シリアライズ対象
+        
+    Returns:
+        str: JSON文字列（非ASCII文字はエスケープしない）
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=str).decode('utf-8')
+    return json.dumps(obj, default=str, ensure_ascii=False)
+
+# Content-Type → (拡張子, ファイルタイプ)
+_CT_MAP = {
+    'image/jpeg': ('jpg', 'image'),
+    'image/png': ('png', 'image'),
+    'image/gif': ('gif', 'image'),
+    'video/mp4': ('mp4', 'video'),
+    'video/avi': ('avi', 'video'),
+    'video/mov': ('mov', 'video'),
+}
+
+# オブジェクトキーの拡張子 → (拡張子, ファイルタイプ)
+_EXT_MAP = {
+    'jpg': ('jpg', 'image'),
+    'jpeg': ('jpg', 'image'),
+    'png': ('png', 'image'),
+    'gif': ('gif', 'image'),
+    'mp4': ('mp4', 'video'),
+    'avi': ('avi', 'video'),
+    'mov': ('mov', 'video'),
+}
+
+# Content-Typeのメジャータイプごとのデフォルト
+_CT_MAJOR_DEFAULT = {
+    'image': ('jpg', 'image'),
+    'video': ('mp4', 'video'),
+}
 
 def get_file_extension_and_type(content_type, object_key):
     """
@@ -45,40 +132,141 @@ def get_file_extension_and_type(content_type, object_key):
         (file_extension, file_type)のタプル
     """
     # オブジェクトキーから拡張子を取得
-    key_extension = object_key.lower().split('.')[-1] if '.' in object_key else ''
+    _, dot, key_extension = object_key.rpartition('.')
+    key_extension = key_extension.lower() if dot else ''
     
     # Content-Typeベースの判定
     if content_type:
         content_type = content_type.lower()
-        if content_type.startswith('image/'):
-            if content_type == 'image/jpeg' or key_extension in ['jpg', 'jpeg']:
-                return 'jpg', 'image'
-            elif content_type == 'image/png' or key_extension == 'png':
-                return 'png', 'image'
-            elif content_type == 'image/gif' or key_extension == 'gif':
-                return 'gif', 'image'
-            else:
-                return 'jpg', 'image'  # デフォルト
-        elif content_type.startswith('video/'):
-            if content_type == 'video/mp4' or key_extension == 'mp4':
-                return 'mp4', 'video'
-            elif content_type == 'video/avi' or key_extension == 'avi':
-                return 'avi', 'video'
-            elif content_type == 'video/mov' or key_extension == 'mov':
-                return 'mov', 'video'
-            else:
-                return 'mp4', 'video'  # デフォルト
+        result = _CT_MAP.get(content_type)
+        if result:
+            return result
+        
+        # image/* や video/* で未知のサブタイプは、同じタイプの拡張子があればそれを使い、なければデフォルト
+        major_type = content_type.partition('/')[0]
+        default = _CT_MAJOR_DEFAULT.get(major_type)
+        if default:
+            result = _EXT_MAP.get(key_extension)
+            return result if result and result[1] == major_type else default
     
     # Content-Typeが不明な場合は拡張子で判定
-    if key_extension in ['jpg', 'jpeg', 'png', 'gif']:
-        return key_extension if key_extension != 'jpeg' else 'jpg', 'image'
-    elif key_extension in ['mp4', 'avi', 'mov']:
-        return key_extension, 'video'
+    return _EXT_MAP.get(key_extension, ('jpg', 'image'))
+
+def copy_s3_object(source_bucket, source_key, dest_key, content_type, content_length):
+    """
+    S3オブジェクトを出力バケットにサーバー側でコピー（データはLambdaを経由しない）
+    
+    5GiB以下のオブジェクトはCopyObjectを直接呼ぶ（マネージドコピーはサイズ取得のために
+    HeadObjectを再度発行するため、取得済みのサイズで判定する）。5GiBを超える場合のみ
+    マネージドのマルチパートコピーを使う。アクセス権限の都合でコピーできない場合
+    （クロスアカウントでGetObjectのみ許可されている等）は、GetObjectのストリームを
+    そのままマルチパートアップロードするフォールバックを行う。
     
-    # デフォルト
-    return 'jpg', 'image'
+    Args:
+        source_bucket: ソースS3バケット名
+        source_key: ソースS3オブジェクトキー
+        dest_key: コピー先のS3オブジェクトキー（BUCKET_NAME内）
+        content_type: コピー先のContent-Type
+        content_length: ソースオブジェクトのサイズ（HeadObjectで取得済みの値）
+        
+    Returns:
+        成功した場合True
+    """
+    copy_source = {'Bucket': source_bucket, 'Key': source_key}
+    try:
+        if content_length <= MAX_SINGLE_COPY_SIZE:
+            s3_client.copy_object(
+                CopySource=copy_source,
+                Bucket=BUCKET_NAME,
+                Key=dest_key,
+                MetadataDirective='REPLACE',
+                ContentType=content_type
+            )
+        else:
+            s3_client.copy(
+                CopySource=copy_source,
+                Bucket=BUCKET_NAME,
+                Key=dest_key,
+                ExtraArgs={'MetadataDirective': 'REPLACE', 'ContentType': content_type}
+            )
+        return True
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') not in ('AccessDenied', '403'):
+            raise
+        logger.warning("サーバー側コピーが拒否されたため、ダウンロードしてアップロードします: %s", e)
+    
+    # 本体を一括で読み込まず、チャンク単位でアップロードする（ピークメモリはチャンクサイズ程度）
+    get_response = s3_client.get_object(Bucket=source_bucket, Key=source_key)
+    s3_client.upload_fileobj(
+        get_response['Body'], BUCKET_NAME, dest_key,
+        ExtraArgs={'ContentType': content_type},
+        Config=STREAM_TRANSFER_CONFIG
+    )
+    return True
+
+def _update_capture_field(s3path_capture):
+    """
+    DynamoDBのcaptureフィールドを単独で更新（ファイルレコードとまとめて書き込めなかった場合用）
+    
+    Args:
+        s3path_capture: キャプチャ画像のS3パス
+    """
+    if update_camera_capture_image(dynamodb, CAMERA_ID, s3path_capture):
+        logger.info("DynamoDBのcaptureフィールドを更新しました: %s", CAMERA_ID)
+    else:
+        logger.warning("DynamoDBのcaptureフィールド更新に失敗しました: %s", CAMERA_ID)
+
+# 検証済みカメラ情報のキャッシュ（Lambdaコンテナの再利用時に引き継がれる）
+_camera_info_cache = {'value': None, 'expires': 0.0}
+
+# 並列処理時に初回キャプチャ画像の保存を1オブジェクトだけが行うためのロック
+_capture_lock = threading.Lock()
+
+def load_camera_info():
+    """
+    カメラ情報を取得して検証（検証済みの結果はCAMERA_INFO_CACHE_TTL_SEC秒キャッシュ）
+    
+    Returns:
+        (camera_info, error_result) のタプル。検証に失敗した場合は camera_info が None で、
+        error_result に処理結果の辞書が入る
+    """
+    now = time.monotonic()
+    if not INVALIDATE_CACHE and _camera_info_cache['value'] is not None and now < _camera_info_cache['expires']:
+        return _camera_info_cache['value'], None
+    
+    camera_info = get_camera_info(CAMERA_ID)
+    if not camera_info:
+        logger.error("カメラ情報が見つからないか、無効です: %s", CAMERA_ID)
+        return None, {
+            'statusCode': 400,
+            'error': f'カメラ情報が見つかりません: {CAMERA_ID}'
+        }
+
+    # カメラタイプを検証（s3タイプをサポート）
+    if camera_info.get('type') != 's3':
+        logger.error("サポートされていないカメラタイプです: %s", camera_info.get('type'))
+        return None, {
+            'statusCode': 400,
+            'error': f'サポートされていないカメラタイプ: {camera_info.get("type")}'
+        }
 
-def process_s3_object(source_bucket, source_key, event_time, event_publisher=None):
+    logger.info("カメラ情報を取得しました: %s (type: %s)", CAMERA_ID, camera_info.get('type'))
+    _camera_info_cache['value'] = camera_info
+    _camera_info_cache['expires'] = now + CAMERA_INFO_CACHE_TTL_SEC
+    return camera_info, None
+
+# 起動時にカメラ情報を検証し、設定不備（未登録・タイプ不一致）ならS3/DynamoDBを呼ぶ前にコンテナを終了させる
+# （DynamoDBへの一時的な接続エラーは致命的とせず、初回イベント時の取得に任せる）
+try:
+    _, _startup_error = load_camera_info()
+except Exception as e:
+    logger.warning("起動時のカメラ情報取得に失敗しました（初回イベント時に再取得）: %s", e)
+    _startup_error = None
+if _startup_error:
+    logger.error("カメラ設定が不正なため終了します: %s", _startup_error['error'])
+    sys.exit(1)
+
+def process_s3_object(source_bucket, source_key, event_time, event_publisher=None, camera_info=None, pending_events=None):
     """
     S3オブジェクトを処理してコピーし、DynamoDBに記録（疎結合: detector を知らない）
     
@@ -87,34 +275,23 @@ def process_s3_object(source_bucket, source_key, event_time, event_publisher=Non
         source_key: ソースS3オブジェクトキー
         event_time: イベント発生時刻
         event_publisher: EventBridgePublisher（オプション）
+        camera_info: load_camera_info() で取得済みのカメラ情報（Noneの場合はここで取得）
+        pending_events: 指定した場合はイベントを発行せず (detail_type, detail) を追加する
+                        （呼び出し元で publish_batch によりまとめて発行する）
         
     Returns:
         処理結果の辞書
     """
     try:
-        # カメラ情報を取得
-        camera_info = get_camera_info(CAMERA_ID)
-        if not camera_info:
-            logger.error(f"カメラ情報が見つからないか、無効です: {CAMERA_ID}")
-            return {
-                'statusCode': 400,
-                'error': f'カメラ情報が見つかりません: {CAMERA_ID}'
-            }
-
-        # カメラタイプを検証（s3タイプをサポート）
-        if camera_info.get('type') != 's3':
-            logger.error(f"サポートされていないカメラタイプです: {camera_info.get('type')}")
-            return {
-                'statusCode': 400,
-                'error': f'サポートされていないカメラタイプ: {camera_info.get("type")}'
-            }
-
-        logger.info(f"カメラ情報を取得しました: {CAMERA_ID} (type: {camera_info.get('type')})")
+        if camera_info is None:
+            camera_info, error_result = load_camera_info()
+            if error_result:
+                return error_result
 
         # イベント時刻をdatetimeオブジェクトに変換
         if isinstance(event_time, str):
-            # ISO 8601形式の文字列をパース
-            timestamp = datetime.fromisoformat(event_time.replace('Z', '+00:00'))
+            # ISO 8601形式の文字列をパース（Python 3.11以降のfromisoformatは末尾の'Z'をそのまま解釈できる）
+            timestamp = datetime.fromisoformat(event_time)
         elif isinstance(event_time, datetime):
             timestamp = event_time
         else:
@@ -122,32 +299,26 @@ def process_s3_object(source_bucket, source_key, event_time, event_publisher=Non
             from shared.timezone_utils import now_utc
             timestamp = now_utc()
         
-        logger.info(f"イベント時刻をタイムスタンプとして使用: {timestamp}")
+        logger.info("イベント時刻をタイムスタンプとして使用: %s", timestamp)
 
-        # S3オブジェクトのメタデータとデータを取得
+        # S3オブジェクトのメタデータを取得
+        # （本体はサーバー側コピーするため読み込まない）
         try:
-            # オブジェクトのメタデータを取得
             head_response = s3_client.head_object(Bucket=source_bucket, Key=source_key)
             content_type = head_response.get('ContentType', '')
             content_length = head_response.get('ContentLength', 0)
             
-            logger.info(f"オブジェクトメタデータ取得: {source_key}")
-            logger.info(f"  ContentType: {content_type}")
-            logger.info(f"  ContentLength: {content_length}")
-
-            # オブジェクトデータを取得
-            get_response = s3_client.get_object(Bucket=source_bucket, Key=source_key)
-            object_data = get_response['Body'].read()
+            logger.info("オブジェクトメタデータ取得: %s (ContentType: %s, ContentLength: %s)", source_key, content_type, content_length)
             
-            if len(object_data) == 0:
-                logger.error(f"オブジェクトが空です: {source_key}")
+            if content_length == 0:
+                logger.error("オブジェクトが空です: %s", source_key)
                 return {
                     'statusCode': 400,
                     'error': 'オブジェクトが空です'
                 }
 
         except ClientError as e:
-            logger.error(f"S3オブジェクトの取得に失敗しました: {e}")
+            logger.error("S3オブジェクトの取得に失敗しました: %s", e)
             return {
                 'statusCode': 404,
                 'error': f'S3オブジェクトの取得に失敗: {e}'
@@ -155,71 +326,98 @@ def process_s3_object(source_bucket, source_key, event_time, event_publisher=Non
 
         # ファイル拡張子とタイプを判定
         file_extension, file_type = get_file_extension_and_type(content_type, source_key)
-        logger.info(f"ファイルタイプ判定: {file_type}, 拡張子: {file_extension}")
+        logger.info("ファイルタイプ判定: %s, 拡張子: %s", file_type, file_extension)
 
-        # captureフィールドの確認と初回画像保存処理
-        capture_path = camera_info.get('capture')
-        if not capture_path and file_type == 'image':
-            logger.info(f"カメラ {CAMERA_ID} のcaptureが未設定のため、初回キャプチャ画像を保存します")
-            
-            try:
-                # capture.jpgとして保存
-                s3_key_capture = f"collect/{CAMERA_ID}/capture.jpg"
-                s3path_capture = f"s3://{BUCKET_NAME}/{s3_key_capture}"
-                
-                if upload_to_s3_with_retry(s3_client, BUCKET_NAME, s3_key_capture, object_data, 'image/jpeg'):
-                    logger.info(f"初回キャプチャ画像を保存しました: {s3path_capture}")
-                    
-                    # DynamoDBのcaptureフィールドを更新
-                    if update_camera_capture_image(dynamodb, CAMERA_ID, s3path_capture):
-                        logger.info(f"DynamoDBのcaptureフィールドを更新しました: {CAMERA_ID}")
-                    else:
-                        logger.warning(f"DynamoDBのcaptureフィールド更新に失敗しました: {CAMERA_ID}")
-                else:
-                    logger.error(f"初回キャプチャ画像の保存に失敗しました: {s3path_capture}")
-            except Exception as e:
-                logger.error(f"初回キャプチャ画像の保存中にエラーが発生しました: {e}")
-                # エラーが発生してもメイン処理は継続
-        
         # 新しいS3パスを生成 - collector_id を使用
         s3_key, s3path = generate_s3_path(CAMERA_ID, COLLECTOR_ID, file_type, timestamp, BUCKET_NAME, file_extension)
         
-        logger.info(f"新しいS3パス: {s3path}")
+        logger.info("新しいS3パス: %s", s3path)
 
         # 新しいS3バケットにコピー
         content_type_for_upload = f"{file_type}/{file_extension}" if file_extension else 'application/octet-stream'
         
-        if upload_to_s3_with_retry(s3_client, BUCKET_NAME, s3_key, object_data, content_type_for_upload):
-            logger.info(f"ファイルをS3にコピーしました: {s3path}")
+        if copy_s3_object(source_bucket, source_key, s3_key, content_type_for_upload, content_length):
+            logger.info("ファイルをS3にコピーしました: %s", s3path)
+            
+            # captureフィールドの確認と初回画像保存処理
+            # コピー済みのファイルから出力バケット内でサーバー側コピーする（ソースバケットへの再アクセス不要）
+            # （DynamoDBのcaptureフィールドはファイルレコードと同じリクエストで更新する）
+            pending_capture_s3path = None
+            if file_type == 'image':
+                s3_key_capture = f"collect/{CAMERA_ID}/capture.jpg"
+                s3path_capture = f"s3://{BUCKET_NAME}/{s3_key_capture}"
+                
+                # 同じバッチ内の他のオブジェクトで初回キャプチャを繰り返さないよう、先に確保する
+                with _capture_lock:
+                    claimed_capture = not camera_info.get('capture')
+                    if claimed_capture:
+                        camera_info['capture'] = s3path_capture
+                
+                if claimed_capture:
+                    logger.info("カメラ %s のcaptureが未設定のため、初回キャプチャ画像を保存します", CAMERA_ID)
+                    try:
+                        s3_client.copy_object(
+                            Bucket=BUCKET_NAME,
+                            Key=s3_key_capture,
+                            CopySource={'Bucket': BUCKET_NAME, 'Key': s3_key},
+                            MetadataDirective='REPLACE',
+                            ContentType='image/jpeg'
+                        )
+                        logger.info("初回キャプチャ画像を保存しました: %s", s3path_capture)
+                        pending_capture_s3path = s3path_capture
+                    except Exception as e:
+                        logger.error("初回キャプチャ画像の保存中にエラーが発生しました: %s", e)
+                        # エラーが発生してもメイン処理は継続し、次のオブジェクトで再試行する
+                        camera_info.pop('capture', None)
             
             # DynamoDBにファイルレコードを挿入
-            file_id = insert_file_record(
-                dynamodb, 
-                CAMERA_ID, 
-                timestamp,  # start_time
-                timestamp,  # end_time（ファイルコピーなので同じ時刻）
-                s3path, 
-                COLLECTOR_ID, 
-                file_type
-            )
+            if pending_capture_s3path:
+                # 初回キャプチャ時はcaptureフィールドの更新とまとめて1回のリクエストで書き込む
+                file_record = build_file_record_item(
+                    CAMERA_ID,
+                    timestamp,  # start_time
+                    timestamp,  # end_time（ファイルコピーなので同じ時刻）
+                    s3path,
+                    COLLECTOR_ID,
+                    file_type
+                )
+                if insert_file_record_with_capture(dynamodb, file_record, CAMERA_ID, pending_capture_s3path):
+                    logger.info("DynamoDBのcaptureフィールドを更新しました: %s", CAMERA_ID)
+                else:
+                    # まとめて書き込めなかった場合は個別に書き込む
+                    _update_capture_field(pending_capture_s3path)
+                    file_record = insert_file_record(
+                        dynamodb, CAMERA_ID, timestamp, timestamp,
+                        s3path, COLLECTOR_ID, file_type
+                    )
+            else:
+                file_record = insert_file_record(
+                    dynamodb, 
+                    CAMERA_ID, 
+                    timestamp,  # start_time
+                    timestamp,  # end_time（ファイルコピーなので同じ時刻）
+                    s3path, 
+                    COLLECTOR_ID, 
+                    file_type
+                )
+            file_id = file_record['file_id'] if file_record else None
             
             if file_id:
-                logger.info(f"ファイルレコードをDynamoDBに保存しました: {file_id}")
+                logger.info("ファイルレコードをDynamoDBに保存しました: %s", file_id)
                 
                 # EventBridge イベント発行（疎結合: 1回のみ）
                 if event_publisher:
                     try:
                         if file_type == 'image':
-                            event_publisher.publish_save_image_event(
+                            save_event = event_publisher.build_save_image_event(
                                 camera_id=CAMERA_ID,
                                 collector_id=COLLECTOR_ID,
                                 file_id=file_id,
                                 s3path=s3path,
                                 timestamp=timestamp
                             )
-                            logger.info(f"SaveImageEvent発行完了: collector_id={COLLECTOR_ID}")
-                        elif file_type == 'video':
-                            event_publisher.publish_save_video_event(
+                        else:
+                            save_event = event_publisher.build_save_video_event(
                                 camera_id=CAMERA_ID,
                                 collector_id=COLLECTOR_ID,
                                 file_id=file_id,
@@ -227,9 +425,13 @@ def process_s3_object(source_bucket, source_key, event_time, event_publisher=Non
                                 timestamp=timestamp,
                                 video_duration=0.0
                             )
-                            logger.info(f"SaveVideoEvent発行完了: collector_id={COLLECTOR_ID}")
+                        
+                        if pending_events is not None:
+                            pending_events.append(save_event)
+                        elif event_publisher.publish_batch([save_event]):
+                            logger.info("%s発行完了: collector_id=%s", save_event[0], COLLECTOR_ID)
                     except Exception as e:
-                        logger.error(f"EventBridge発行エラー: {e}")
+                        logger.error("EventBridge発行エラー: %s", e)
                         # エラーでもメイン処理は継続
                 
                 return {
@@ -253,7 +455,7 @@ def process_s3_object(source_bucket, source_key, event_time, event_publisher=Non
             }
             
     except Exception as e:
-        logger.error(f"ファイル処理中にエラーが発生しました: {e}")
+        logger.error("ファイル処理中にエラーが発生しました: %s", e)
         return {
             'statusCode': 500,
             'error': f'処理中にエラーが発生: {str(e)}'
@@ -264,25 +466,15 @@ def lambda_handler(event, context):
     Lambda関数のメインハンドラー
     S3イベントを受け取り、ファイルを処理する
     """
-    logger.info(f"Lambda関数が開始されました")
-    logger.info(f"環境変数 - CAMERA_ID: {CAMERA_ID}, COLLECTOR_ID: {COLLECTOR_ID}, BUCKET_NAME: {BUCKET_NAME}")
-    logger.info(f"受信イベント: {json.dumps(event, default=str, ensure_ascii=False)}")
-
-    # EventBridgePublisherを初期化（疎結合: detector を知らない）
-    event_publisher = None
-    try:
-        event_publisher = EventBridgePublisher(
-            create_boto3_session_func=create_boto3_session,
-            collector_type='s3Rec',
-            event_bus_name=os.environ.get('EVENT_BUS_NAME', 'default')
-        )
-        logger.info(f"EventBridgePublisher初期化完了: collector_id={COLLECTOR_ID}")
-    except Exception as e:
-        logger.warning(f"EventBridgePublisher初期化に失敗しました（処理は継続）: {e}")
-        event_publisher = None
+    logger.info("Lambda関数が開始されました")
+    logger.info("環境変数 - CAMERA_ID: %s, COLLECTOR_ID: %s, BUCKET_NAME: %s", CAMERA_ID, COLLECTOR_ID, BUCKET_NAME)
+    # イベント全体のJSON化はイベントサイズに比例して重いため、DEBUG出力時のみ行う
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("受信イベント: %s", _to_json(event))
 
     try:
-        # EventBridgeからのS3イベントを解析
+        # 処理対象のオブジェクト (source_bucket, source_key, event_time, item_identifier) を列挙
+        targets = []
         if 'detail' in event and 'bucket' in event['detail'] and 'object' in event['detail']:
             # EventBridge経由のS3イベント
             detail = event['detail']
@@ -290,35 +482,36 @@ def lambda_handler(event, context):
             source_key = detail['object']['key']
             event_time = event.get('time', format_for_db(now_utc()))
             
-            logger.info(f"EventBridge S3イベントを検出:")
-            logger.info(f"  Bucket: {source_bucket}")
-            logger.info(f"  Key: {source_key}")
-            logger.info(f"  EventTime: {event_time}")
+            logger.info("EventBridge S3イベントを検出: Bucket=%s, Key=%s, EventTime=%s", source_bucket, source_key, event_time)
+            targets.append((source_bucket, source_key, event_time, None))
             
         elif 'Records' in event:
-            # 直接のS3イベント（テスト用）
+            # 直接のS3イベント、またはSQS/EventBridge Pipesのバッチ（複数レコードはまとめて処理する）
             if len(event['Records']) == 0:
                 return {
                     'statusCode': 400,
-                    'body': json.dumps({'error': 'レコードが空です'})
-                }
-            
-            record = event['Records'][0]
-            if 's3' not in record:
-                return {
-                    'statusCode': 400,
-                    'body': json.dumps({'error': 'S3イベントではありません'})
+                    'body': _to_json({'error': 'レコードが空です'})
                 }
             
-            s3_info = record['s3']
-            source_bucket = s3_info['bucket']['name']
-            source_key = s3_info['object']['key']
-            event_time = record.get('eventTime', format_for_db(now_utc()))
+            for record in event['Records']:
+                parsed = parse_s3_event_record(record)
+                if parsed is None:
+                    # 解釈できないレコードは再試行しても成功しないため、バッチを止めずにスキップする
+                    logger.warning("S3イベントではないためスキップ: %s", _to_json(record))
+                    continue
+                
+                for source_bucket, source_key, event_time in parsed:
+                    logger.info("S3イベントを検出: Bucket=%s, Key=%s, EventTime=%s", source_bucket, source_key, event_time)
+                    # 部分バッチレスポンスの識別子はmessageIdを持つレコード（SQS等）のみ。
+                    # 直接のS3イベントは非同期呼び出しで再配信されないため、ここで再試行させる
+                    targets.append((source_bucket, source_key, event_time, record.get('messageId')))
             
-            logger.info(f"直接S3イベントを検出:")
-            logger.info(f"  Bucket: {source_bucket}")
-            logger.info(f"  Key: {source_key}")
-            logger.info(f"  EventTime: {event_time}")
+            if not targets:
+                logger.info("処理対象のS3オブジェクトがありません")
+                response = {'statusCode': 200, 'body': _to_json([])}
+                if any('messageId' in record for record in event['Records']):
+                    response['batchItemFailures'] = []
+                return response
             
         else:
             # テスト用のマニュアルイベント
@@ -326,29 +519,94 @@ def lambda_handler(event, context):
             source_key = event.get('source_key', 'test/file.jpg')
             event_time = event.get('event_time', format_for_db(now_utc()))
             
-            logger.info(f"テストイベントを検出:")
-            logger.info(f"  Bucket: {source_bucket}")
-            logger.info(f"  Key: {source_key}")
-            logger.info(f"  EventTime: {event_time}")
+            logger.info("テストイベントを検出: Bucket=%s, Key=%s, EventTime=%s", source_bucket, source_key, event_time)
+            targets.append((source_bucket, source_key, event_time, None))
+
+        # カメラ情報はバッチ全体で1回だけ取得・検証する
+        camera_info, error_result = load_camera_info()
+        if error_result:
+            response = {
+                'statusCode': error_result['statusCode'],
+                'body': _to_json(error_result)
+            }
+            # 部分バッチレスポンスでは全レコードを失敗として返す（返さないと全件削除される）
+            message_ids = [record['messageId'] for record in event.get('Records', []) if 'messageId' in record]
+            if message_ids:
+                response['batchItemFailures'] = [{'itemIdentifier': message_id} for message_id in message_ids]
+            return response
 
-        # ファイル処理を実行
-        result = process_s3_object(source_bucket, source_key, event_time, event_publisher)
+        # ファイル処理を実行（EventBridgeイベントは全オブジェクトの処理後にまとめて発行）
+        # 処理はS3コピーとDynamoDB書き込みのI/O待ちが大半のため、複数オブジェクトはスレッドで並列に処理する
+        pending_events = []
         
-        logger.info(f"処理結果: {result}")
+        def _process_target(target):
+            source_bucket, source_key, event_time, item_identifier = target
+            # 部分バッチレスポンスで再配信されるレコードは、ここでは再試行しない
+            max_attempts = 1 if item_identifier is not None else MAX_PROCESS_ATTEMPTS
+            for attempt in range(max_attempts):
+                if attempt > 0:
+                    delay = RETRY_BASE_DELAY_SEC * (2 ** (attempt - 1))
+                    logger.warning("処理を再試行します (%s/%s, %.1f秒後): %s", attempt + 1, max_attempts, delay, source_key)
+                    time.sleep(delay)
+                result = process_s3_object(
+                    source_bucket, source_key, event_time, event_publisher, camera_info, pending_events
+                )
+                if result['statusCode'] != 500:
+                    break
+            return result
         
-        return {
-            'statusCode': result['statusCode'],
-            'body': json.dumps(result, ensure_ascii=False)
-        }
+        if len(targets) == 1:
+            results = [_process_target(targets[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(len(targets), MAX_PARALLEL_RECORDS)) as executor:
+                results = list(executor.map(_process_target, targets))
+        
+        batch_item_failures = []
+        for (_, _, _, item_identifier), result in zip(targets, results):
+            logger.debug("処理結果: %s", result)
+            # 1メッセージに複数オブジェクトが含まれる場合も識別子は1回だけ返す
+            if (result['statusCode'] != 200 and item_identifier is not None
+                    and {'itemIdentifier': item_identifier} not in batch_item_failures):
+                batch_item_failures.append({'itemIdentifier': item_identifier})
+        
+        if pending_events:
+            # エラーでもメイン処理は継続（ファイルレコードは保存済み）
+            if event_publisher.publish_batch(pending_events):
+                logger.info("Save*Event発行完了: %s件, collector_id=%s", len(pending_events), COLLECTOR_ID)
+            else:
+                logger.error("EventBridge発行エラー: 一部のイベントを発行できませんでした（%s件中）", len(pending_events))
+        
+        if len(results) == 1:
+            response = {
+                'statusCode': results[0]['statusCode'],
+                'body': _to_json(results[0])
+            }
+        else:
+            failed_results = [result for result in results if result['statusCode'] != 200]
+            response = {
+                'statusCode': failed_results[0]['statusCode'] if failed_results else 200,
+                'body': _to_json(results)
+            }
+        
+        # レコード形式の呼び出し（SQS/Pipes等）では部分バッチレスポンス形式で失敗したレコードのみ返す
+        # （1レコードでも返さないと、失敗したメッセージが削除されて再配信されない）
+        if any(item_identifier is not None for _, _, _, item_identifier in targets):
+            response['batchItemFailures'] = batch_item_failures
+        return response
 
     except Exception as e:
-        logger.error(f"Lambda関数でエラーが発生しました: {e}")
-        return {
+        logger.error("Lambda関数でエラーが発生しました: %s", e)
+        response = {
             'statusCode': 500,
-            'body': json.dumps({
+            'body': _to_json({
                 'error': f'Lambda関数でエラーが発生: {str(e)}'
-            }, ensure_ascii=False)
+            })
         }
+        # 部分バッチレスポンスではbatchItemFailuresがないと全件成功として削除されるため、全レコードを失敗として返す
+        message_ids = [record['messageId'] for record in event.get('Records', []) if 'messageId' in record]
+        if message_ids:
+            response['batchItemFailures'] = [{'itemIdentifier': message_id} for message_id in message_ids]
+        return response
 
 # ローカルテスト用
 if __name__ == "__main__":
@@ -18,6 +18,8 @@ from botocore.exceptions import ClientError
 import sys
 import logging
 import io
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 
@@ -28,7 +30,8 @@ from shared.yolo_detector import YoloDetector, filter_detections_by_class, build
 from shared.detect_log_helper import (
     get_or_create_collector_internal_detector,
     get_collector_internal_detector_id,
-    save_class_detect_log
+    build_class_detect_log_item,
+    save_detect_log_index
 )
 
 # 環境変数の取得とエラーハンドリング
@@ -54,10 +57,50 @@ s3_client = get_s3_client()
 # ロガーの設定
 logger = setup_logger('s3Yolo')
 
+# TurboJPEG（libjpeg-turboのSIMD実装によるJPEGデコード/エンコード用、オプション）
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB, TJSAMP_420, TJSAMP_444
+    _turbo_jpeg = TurboJPEG()
+    TURBOJPEG_AVAILABLE = True
+except (ImportError, OSError, RuntimeError) as e:
+    logger.warning(f"TurboJPEG が利用できません。JPEGの変換はPillowで実行します: {e}")
+    TURBOJPEG_AVAILABLE = False
+
+# JPEG保存時の品質（コレクター設定の jpeg_quality_orig / jpeg_quality_detect で変更可能）
+# - 元画像（PNGからの変換時のみ使用）: 4:2:0サブサンプリング
+# - アノテーション画像: 枠線・ラベルの色にじみを避けるため4:4:4で保存
+JPEG_QUALITY_ORIG = 85
+JPEG_QUALITY_DETECT = 88
+
+# 1回のYOLO推論でまとめて処理する最大画像数（メモリ使用量の上限）
+MAX_BATCH_SIZE = 16
+
+# collect_classの区切り文字（| を , に揃えてから分割する）
+_CLASS_SEPARATOR_TRANS = str.maketrans('|', ',')
+
+# カメラ情報のキャッシュ有効期間（秒）。ウォームスタート時はDynamoDBを参照しない
+CAMERA_INFO_CACHE_TTL_SEC = 300
+# テスト用: 設定するとカメラ情報を毎回DynamoDBから取得する
+INVALIDATE_CACHE = os.environ.get('INVALIDATE_CACHE', '').lower() in ('1', 'true', 'yes')
+
+# 検出用にJPEGを縮小デコードする際の長辺の下限（モデル入力の640を下回らない範囲でDCT縮小する）
+DETECT_DECODE_MAX_SIDE = 640
+
+# 処理する画像の最大画素数（超える画像はデコードせずにスキップ、デフォルトは8K）
+MAX_IMAGE_PIXELS = int(os.environ.get('MAX_IMAGE_PIXELS', str(7680 * 4320)))
+
+# S3の読み込み・アップロードを並列実行するスレッドプール（Lambda warm start時に再利用）
+# S3 I/Oはネットワーク待ちが大半で、待機中はGILが解放されるためスレッドで並列化できる
+S3_IO_MAX_WORKERS = 16
+_s3_pool = ThreadPoolExecutor(max_workers=S3_IO_MAX_WORKERS)
+
 # グローバル変数（Lambda warm start時に再利用）
 _yolo_detector = None
 _collector_settings = None
 _virtual_detector_id = None
+_collect_classes = None
+_camera_info_cache = {'value': None, 'expires': 0.0}
+_annotation_font = None
 
 
 def get_yolo_detector(model_path: str = 'v9-s') -> YoloDetector:
@@ -67,11 +110,41 @@ def get_yolo_detector(model_path: str = 'v9-s') -> YoloDetector:
     global _yolo_detector
     if _yolo_detector is None:
         logger.info(f"YoloDetectorを初期化: model_path={model_path}")
-        _yolo_detector = YoloDetector(model_path=model_path)
+        # numpy array入力の前処理（レターボックス・正規化・CHW変換）はNumbaの1パスで行う
+        _yolo_detector = YoloDetector(model_path=model_path, use_numba_preprocess=True)
         logger.info("YoloDetector初期化完了")
     return _yolo_detector
 
 
+def get_cached_camera_info() -> dict:
+    """
+    カメラ情報を取得（CAMERA_INFO_CACHE_TTL_SEC秒キャッシュ、Lambda warm start対応）
+    """
+    now = time.monotonic()
+    if not INVALIDATE_CACHE and _camera_info_cache['value'] is not None and now < _camera_info_cache['expires']:
+        return _camera_info_cache['value']
+    
+    camera_info = get_camera_info(CAMERA_ID)
+    if camera_info:
+        _camera_info_cache['value'] = camera_info
+        _camera_info_cache['expires'] = now + CAMERA_INFO_CACHE_TTL_SEC
+    return camera_info
+
+
+def get_annotation_font():
+    """
+    アノテーション用フォントを取得（初回のみTTFを読み込み、Lambda warm start時は再利用）
+    """
+    global _annotation_font
+    if _annotation_font is None:
+        # デフォルトフォント（Lambda環境用）
+        try:
+            _annotation_font = ImageFont.truetype("/usr/share/fonts/dejavu/DejaVuSans.ttf", 14)
+        except (IOError, OSError):
+            _annotation_font = ImageFont.load_default()
+    return _annotation_font
+
+
 def get_collector_settings() -> dict:
     """
     コレクター設定を取得（キャッシュ）
@@ -86,6 +159,19 @@ def get_collector_settings() -> dict:
     return _collector_settings
 
 
+def get_collect_classes() -> list:
+    """
+    コレクター設定のcollect_class（カンマまたは|区切り）を分割したリストを取得（キャッシュ）
+    """
+    global _collect_classes
+    if _collect_classes is None:
+        collect_class_str = get_collector_settings().get('collect_class', 'person')
+        _collect_classes = [
+            c.strip() for c in collect_class_str.translate(_CLASS_SEPARATOR_TRANS).split(',') if c.strip()
+        ]
+    return _collect_classes
+
+
 def ensure_virtual_detector(camera_id: str, collector_mode: str) -> str:
     """
     仮想Detectorを取得/作成し、detector_idを返す
@@ -107,16 +193,160 @@ def ensure_virtual_detector(camera_id: str, collector_mode: str) -> str:
     return _virtual_detector_id
 
 
-def load_image_from_s3(source_bucket: str, source_key: str) -> tuple:
+def encode_jpeg(image, quality: int = JPEG_QUALITY_ORIG, full_chroma: bool = False) -> bytes:
+    """
+    画像をJPEGにエンコード
+    
+    numpy arrayはTurboJPEGが利用可能な場合はTurboJPEGでエンコードする。
+    PIL Image（アノテーション画像等）はnumpy arrayに戻さず、そのままPillowでエンコードする
+    （Pillowも内部でlibjpeg-turboを使用するため、画像全体のコピーを避ける方が速い）。
+    
+    Args:
+        image: 画像（RGB形式のnumpy array またはPIL Image）
+        quality: JPEG品質
+        full_chroma: Trueの場合は色差をサブサンプリングしない（4:4:4）、Falseの場合は4:2:0
+        
+    Returns:
+        bytes: JPEGデータ
+    """
+    if isinstance(image, np.ndarray):
+        if TURBOJPEG_AVAILABLE:
+            return _turbo_jpeg.encode(
+                np.ascontiguousarray(image), quality=quality, pixel_format=TJPF_RGB,
+                jpeg_subsample=TJSAMP_444 if full_chroma else TJSAMP_420
+            )
+        image = Image.fromarray(image)
+    
+    img_byte_arr = io.BytesIO()
+    image.save(img_byte_arr, format='JPEG', quality=quality, subsampling=0 if full_chroma else 2)
+    return img_byte_arr.getvalue()
+
+
+def get_jpeg_quality(setting_key: str, default: int) -> int:
+    """
+    コレクター設定からJPEG品質を取得（未設定・不正値の場合はデフォルト）
+    """
+    try:
+        return int(get_collector_settings().get(setting_key, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class ImageRejectedError(ValueError):
+    """画像ヘッダーの検証で処理対象外と判定された（再試行しても結果は変わらない）"""
+
+
+def is_jpeg(image_bytes: bytes) -> bool:
+    """
+    画像データがJPEGかどうかを判定（先頭のSOIマーカーで判定）
+    """
+    return image_bytes[:2] == b'\xff\xd8'
+
+
+def _validate_image_size(source_key: str, width: int, height: int):
+    """
+    画像ヘッダーから取得したサイズを検証（MAX_IMAGE_PIXELSを超える場合は ImageRejectedError）
+    """
+    if width * height > MAX_IMAGE_PIXELS:
+        raise ImageRejectedError(
+            f"画像サイズが上限を超えています: {source_key}, {width}x{height} (上限{MAX_IMAGE_PIXELS}画素)"
+        )
+
+
+def _jpeg_scale_denominator(width: int, height: int, max_side: int) -> int:
+    """
+    長辺がmax_side以上に収まる最大のJPEG縮小率（1/2, 1/4, 1/8）の分母を返す（縮小しない場合は1）
+    """
+    for denominator in (8, 4, 2):
+        if max(width, height) // denominator >= max_side:
+            return denominator
+    return 1
+
+
+def open_image_pil(image_bytes: bytes, source_key: str, max_side: int = None) -> tuple:
+    """
+    画像データをPillowでRGBのPIL Imageにデコード
+    
+    デコード前にヘッダーから画像サイズを取得し、MAX_IMAGE_PIXELSを超える画像は
+    デコードせずに ImageRejectedError を送出する。
+    
+    Args:
+        image_bytes: 画像データ
+        source_key: ソースS3オブジェクトキー（ログ用）
+        max_side: 指定した場合、JPEGは長辺がこの値を下回らない範囲でDCT縮小デコードする
+        
+    Returns:
+        tuple: (image_pil: PIL Image（RGB形式）, 元画像のサイズ (width, height))
+               デコードは最初にピクセルへアクセスした時点で行われる
+    """
+    # この時点ではヘッダーのみ読み込まれ、デコードはconvert/load時
+    image_pil = Image.open(io.BytesIO(image_bytes))
+    width, height = image_pil.size
+    _validate_image_size(source_key, width, height)
+    
+    if max_side and image_pil.format == 'JPEG':
+        # JPEGはdraftでDCT縮小デコードを指定
+        denominator = _jpeg_scale_denominator(width, height, max_side)
+        if denominator > 1:
+            image_pil.draft('RGB', (width // denominator, height // denominator))
+    
+    # RGB形式に変換（RGBA, Lなど他の形式の場合）
+    if image_pil.mode != 'RGB':
+        image_pil = image_pil.convert('RGB')
+    
+    return image_pil, (width, height)
+
+
+def decode_image(image_bytes: bytes, source_key: str, max_side: int = None) -> tuple:
+    """
+    画像データをRGBのnumpy arrayにデコード
+    
+    JPEGはTurboJPEGが利用可能な場合はTurboJPEGでRGBに直接デコードし、
+    それ以外（PNG等）はPillowでデコードする。
+    デコード前にヘッダーから画像サイズを取得し、MAX_IMAGE_PIXELSを超える画像は
+    デコードせずに ImageRejectedError を送出する。
+    
+    Args:
+        image_bytes: 画像データ
+        source_key: ソースS3オブジェクトキー（ログ用）
+        max_side: 指定した場合、JPEGは長辺がこの値を下回らない範囲でDCT縮小デコードする
+        
+    Returns:
+        tuple: (image_rgb: np.ndarray, decode_scale: (sx, sy))
+               decode_scale は元画像サイズ / デコード後サイズ（縮小しない場合は (1.0, 1.0)）
+    """
+    if TURBOJPEG_AVAILABLE and is_jpeg(image_bytes):
+        # JPEG（SOIマーカー）はTurboJPEGでRGBに直接デコード
+        width, height, _, _ = _turbo_jpeg.decode_header(image_bytes)
+        _validate_image_size(source_key, width, height)
+        denominator = _jpeg_scale_denominator(width, height, max_side) if max_side else 1
+        if denominator > 1:
+            image_rgb = _turbo_jpeg.decode(
+                image_bytes, pixel_format=TJPF_RGB, scaling_factor=(1, denominator)
+            )
+        else:
+            image_rgb = _turbo_jpeg.decode(image_bytes, pixel_format=TJPF_RGB)
+    else:
+        image_pil, (width, height) = open_image_pil(image_bytes, source_key, max_side)
+        
+        # numpy array (RGB) に変換
+        image_rgb = np.array(image_pil)
+    
+    decoded_height, decoded_width = image_rgb.shape[:2]
+    return image_rgb, (width / decoded_width, height / decoded_height)
+
+
+def load_image_from_s3(source_bucket: str, source_key: str, max_side: int = None) -> tuple:
     """
-    S3から画像を読み込み、numpy arrayとPIL Imageで返す
+    S3から画像を読み込み、numpy arrayで返す
     
     Args:
         source_bucket: ソースS3バケット名
         source_key: ソースS3オブジェクトキー
+        max_side: 指定した場合、JPEGは長辺がこの値を下回らない範囲で縮小デコードする（decode_image参照）
         
     Returns:
-        tuple: (image_rgb: np.ndarray, image_pil: PIL.Image, image_bytes: bytes)
+        tuple: (image_rgb: np.ndarray, image_bytes: bytes, decode_scale: (sx, sy))
     """
     try:
         # S3から画像データを取得
@@ -126,20 +356,15 @@ def load_image_from_s3(source_bucket: str, source_key: str) -> tuple:
         if len(image_bytes) == 0:
             raise ValueError(f"画像が空です: {source_key}")
         
-        # PIL Imageに変換
-        image_pil = Image.open(io.BytesIO(image_bytes))
-        
-        # RGB形式に変換（RGBA, Lなど他の形式の場合）
-        if image_pil.mode != 'RGB':
-            image_pil = image_pil.convert('RGB')
-        
-        # numpy array (RGB) に変換
-        image_rgb = np.array(image_pil)
+        image_rgb, decode_scale = decode_image(image_bytes, source_key, max_side)
         
-        logger.info(f"画像読み込み完了: {source_key}, サイズ={image_rgb.shape}")
+        logger.info(f"画像読み込み完了: {source_key}, サイズ={image_rgb.shape}, 縮小率={decode_scale}")
         
-        return image_rgb, image_pil, image_bytes
+        return image_rgb, image_bytes, decode_scale
         
+    except ImageRejectedError as e:
+        logger.warning(f"処理対象外の画像: {e}")
+        raise
     except ClientError as e:
         logger.error(f"S3画像の取得に失敗: {e}")
         raise
@@ -148,38 +373,35 @@ def load_image_from_s3(source_bucket: str, source_key: str) -> tuple:
         raise
 
 
-def create_annotated_image(image_rgb: np.ndarray, filtered_detections: list) -> Image.Image:
+def create_annotated_image(image, filtered_detections: list) -> Image.Image:
     """
     検出結果をアノテーションした画像を作成
     
     Args:
-        image_rgb: 元画像（RGB形式）
+        image: 元画像（RGB形式のnumpy array またはPIL Image）
+               PIL Imageの場合はコピーせずにそのまま描画する
         filtered_detections: フィルタ後の検出結果
         
     Returns:
         アノテーション済み画像（PIL Image）
     """
-    # numpy配列からPIL Imageに変換
-    image_pil = Image.fromarray(image_rgb)
+    # numpy配列の場合のみPIL Imageに変換（描画にはPIL Imageが必要）
+    image_pil = Image.fromarray(image) if isinstance(image, np.ndarray) else image
     draw = ImageDraw.Draw(image_pil)
     
-    # デフォルトフォント（Lambda環境用）
-    try:
-        font = ImageFont.truetype("/usr/share/fonts/dejavu/DejaVuSans.ttf", 14)
-    except (IOError, OSError):
-        font = ImageFont.load_default()
+    font = get_annotation_font()
     
-    for det in filtered_detections:
-        x1, y1, x2, y2 = [int(v) for v in det['bbox']]
-        class_name = det['class']
-        confidence = det['confidence']
-        
-        # ボックス描画（緑色）
-        color = (0, 255, 0)
+    # ボックス座標はまとめて整数に変換
+    bboxes = np.asarray([det['bbox'] for det in filtered_detections], dtype=np.float32).astype(np.int32).tolist()
+    labels = [f"{det['class']} {det['confidence']:.2f}" for det in filtered_detections]
+    
+    # ボックス描画（緑色）
+    color = (0, 255, 0)
+    for x1, y1, x2, y2 in bboxes:
         draw.rectangle([x1, y1, x2, y2], outline=color, width=2)
-        
-        # ラベル描画
-        label = f"{class_name} {confidence:.2f}"
+    
+    # ラベル描画（ボックスより後に描画し、隣接するボックスに隠れないようにする）
+    for (x1, y1, _, _), label in zip(bboxes, labels):
         # テキストサイズを取得
         bbox = draw.textbbox((0, 0), label, font=font)
         text_width = bbox[2] - bbox[0]
@@ -194,7 +416,7 @@ def create_annotated_image(image_rgb: np.ndarray, filtered_detections: list) ->
 
 
 def save_images_to_s3(
-    image_rgb: np.ndarray,
+    image_bytes: bytes,
     annotated_pil: Image.Image,
     camera_id: str,
     collector_id: str,
@@ -203,13 +425,27 @@ def save_images_to_s3(
     """
     元画像とアノテーション画像をS3に保存
     
+    元画像はS3から読み込んだデータを再エンコードせずにそのまま保存する（JPEG/PNG）。
+    
+    Args:
+        image_bytes: 元画像のデータ（load_image_from_s3で読み込んだもの）
+        annotated_pil: アノテーション画像
+        camera_id: カメラID
+        collector_id: コレクターID
+        timestamp: タイムスタンプ
+    
     Returns:
         tuple: (s3path_orig, s3path_detect, s3_key_orig, s3_key_detect)
     """
+    if is_jpeg(image_bytes):
+        orig_extension, orig_content_type = 'jpeg', 'image/jpeg'
+    else:
+        orig_extension, orig_content_type = 'png', 'image/png'
+    
     # 元画像のS3パス生成
     s3_key_orig, s3path_orig = generate_s3_path(
         camera_id, collector_id, 'image',
-        timestamp, BUCKET_NAME, 'jpeg'
+        timestamp, BUCKET_NAME, orig_extension
     )
     
     # アノテーション画像のS3パス生成
@@ -218,88 +454,108 @@ def save_images_to_s3(
         timestamp, BUCKET_NAME, 'jpeg'
     )
     
-    # 元画像をJPEGに変換してアップロード
-    image_pil = Image.fromarray(image_rgb)
-    img_byte_arr = io.BytesIO()
-    image_pil.save(img_byte_arr, format='JPEG', quality=95)
-    img_bytes_orig = img_byte_arr.getvalue()
+    # アノテーション画像のみJPEGに変換
+    annotated_bytes = encode_jpeg(
+        annotated_pil, quality=get_jpeg_quality('jpeg_quality_detect', JPEG_QUALITY_DETECT), full_chroma=True
+    )
     
-    if not upload_to_s3_with_retry(s3_client, BUCKET_NAME, s3_key_orig, img_bytes_orig, 'image/jpeg'):
+    # 2つの画像を並列にアップロード
+    orig_future = _s3_pool.submit(
+        upload_to_s3_with_retry, s3_client, BUCKET_NAME, s3_key_orig, image_bytes, orig_content_type
+    )
+    detect_future = _s3_pool.submit(
+        upload_to_s3_with_retry, s3_client, BUCKET_NAME, s3_key_detect, annotated_bytes, 'image/jpeg'
+    )
+    
+    if not orig_future.result():
         raise Exception(f"元画像のS3アップロードに失敗: {s3path_orig}")
     logger.info(f"元画像をS3に保存: {s3path_orig}")
     
-    # アノテーション画像をJPEGに変換してアップロード
-    annotated_byte_arr = io.BytesIO()
-    annotated_pil.save(annotated_byte_arr, format='JPEG', quality=95)
-    annotated_bytes = annotated_byte_arr.getvalue()
-    
-    if not upload_to_s3_with_retry(s3_client, BUCKET_NAME, s3_key_detect, annotated_bytes, 'image/jpeg'):
+    if not detect_future.result():
         raise Exception(f"アノテーション画像のS3アップロードに失敗: {s3path_detect}")
     logger.info(f"アノテーション画像をS3に保存: {s3path_detect}")
     
     return s3path_orig, s3path_detect, s3_key_orig, s3_key_detect
 
 
-def process_s3_image(source_bucket: str, source_key: str, event_time: str, event_publisher=None):
+def _parse_event_time(event_time) -> datetime:
     """
-    S3画像を処理してYOLO検出を実行
+    イベント時刻をdatetimeに変換
     
     Args:
-        source_bucket: ソースS3バケット名
-        source_key: ソースS3オブジェクトキー
-        event_time: イベント発生時刻
-        event_publisher: EventBridgePublisher（オプション）
+        event_time: イベント発生時刻（ISO 8601文字列またはdatetime）
         
     Returns:
-        処理結果の辞書
+        datetime: イベント時刻（変換できない場合は現在時刻）
     """
-    try:
-        # カメラ情報を取得
-        camera_info = get_camera_info(CAMERA_ID)
-        if not camera_info:
-            logger.error(f"カメラ情報が見つかりません: {CAMERA_ID}")
-            return {'statusCode': 400, 'error': f'カメラ情報が見つかりません: {CAMERA_ID}'}
-
-        # カメラタイプを検証（s3タイプをサポート）
-        if camera_info.get('type') != 's3':
-            logger.error(f"サポートされていないカメラタイプ: {camera_info.get('type')}")
-            return {'statusCode': 400, 'error': f'サポートされていないカメラタイプ: {camera_info.get("type")}'}
+    if isinstance(event_time, str):
+        return datetime.fromisoformat(event_time.replace('Z', '+00:00'))
+    elif isinstance(event_time, datetime):
+        return event_time
+    else:
+        from shared.timezone_utils import now_utc
+        return now_utc()
 
-        logger.info(f"カメラ情報取得: {CAMERA_ID} (type: {camera_info.get('type')})")
 
-        # イベント時刻をdatetimeに変換
-        if isinstance(event_time, str):
-            timestamp = datetime.fromisoformat(event_time.replace('Z', '+00:00'))
-        elif isinstance(event_time, datetime):
-            timestamp = event_time
-        else:
-            from shared.timezone_utils import now_utc
-            timestamp = now_utc()
-        
-        logger.info(f"イベント時刻: {timestamp}")
+def _error_result(message: str, e: Exception) -> dict:
+    """
+    例外をログに出力し、エラーの処理結果を返す
+    """
+    logger.error(f"{message}: {e}")
+    import traceback
+    logger.error(f"詳細: {traceback.format_exc()}")
+    return {'statusCode': 500, 'error': f'処理中にエラーが発生: {str(e)}'}
 
-        # コレクター設定を取得
-        settings = get_collector_settings()
-        
-        # 設定値を取得（カンマまたは|区切り）
-        collect_class_str = settings.get('collect_class', 'person')
-        import re
-        collect_classes = [c.strip() for c in re.split(r'[,|]', collect_class_str) if c.strip()]
-        confidence_threshold = float(settings.get('confidence', 0.5))
-        model_path = settings.get('model_path', 'v9-s')
-        collector_mode = settings.get('collector_mode', 'image')
-        
-        logger.info(f"検出設定: collect_classes={collect_classes}, confidence={confidence_threshold}, model={model_path}")
 
-        # 仮想Detectorを取得/作成
-        detector_id = ensure_virtual_detector(CAMERA_ID, collector_mode)
+def process_detections(
+    source_bucket: str,
+    source_key: str,
+    event_time,
+    image_rgb: np.ndarray,
+    image_bytes: bytes,
+    decode_scale: tuple,
+    detections: list,
+    camera_info: dict,
+    collect_classes: list,
+    confidence_threshold: float,
+    detector_id: str
+) -> tuple:
+    """
+    1画像分のYOLO検出結果を処理（フィルタ・画像保存・DynamoDB記録の準備）
+    
+    DynamoDBへの書き込みとイベント発行はバッチ全体でまとめて行うため、
+    ここでは書き込む項目と発行するイベントの内容を返すだけにする。
+    
+    Args:
+        source_bucket: ソースS3バケット名
+        source_key: ソースS3オブジェクトキー
+        event_time: イベント発生時刻
+        image_rgb: 検出に使用した画像（RGB形式、縮小デコードされている場合がある）
+        image_bytes: 元画像のデータ（S3から読み込んだもの）
+        decode_scale: 元画像サイズ / image_rgbのサイズ (sx, sy)
+        detections: detector.detect_batch() の1画像分の検出結果
+        camera_info: カメラ情報（初回キャプチャ保存時にcaptureを設定する）
+        collect_classes: 検出対象クラス
+        confidence_threshold: 信頼度閾値
+        detector_id: 仮想DetectorのID
         
-        # YoloDetectorを取得
-        detector = get_yolo_detector(model_path)
+    Returns:
+        (処理結果の辞書, 保留中の書き込み・イベント) のタプル
+        （検出がない場合やエラー時は保留中の書き込み・イベントはNone）
+    """
+    try:
+        timestamp = _parse_event_time(event_time)
+        logger.info(f"イベント時刻: {timestamp}")
         
-        # S3から画像を読み込み
-        image_rgb, image_pil, image_bytes = load_image_from_s3(source_bucket, source_key)
-        image_height, image_width = image_rgb.shape[:2]
+        # 縮小デコードした画像で検出した場合は、座標を元画像のサイズに戻す
+        scale_x, scale_y = decode_scale
+        if scale_x != 1.0 or scale_y != 1.0:
+            for det in detections:
+                x1, y1, x2, y2 = det['bbox']
+                det['bbox'] = [x1 * scale_x, y1 * scale_y, x2 * scale_x, y2 * scale_y]
+                if 'center' in det:
+                    cx, cy = det['center']
+                    det['center'] = (cx * scale_x, cy * scale_y)
         
         # captureフィールドの確認と初回画像保存処理
         capture_path = camera_info.get('capture')
@@ -309,21 +565,20 @@ def process_s3_image(source_bucket: str, source_key: str, event_time: str, event
                 s3_key_capture = f"collect/{CAMERA_ID}/capture.jpg"
                 s3path_capture = f"s3://{BUCKET_NAME}/{s3_key_capture}"
                 
-                # 元画像をcaptureとして保存
-                img_byte_arr = io.BytesIO()
-                image_pil.save(img_byte_arr, format='JPEG', quality=95)
-                capture_bytes = img_byte_arr.getvalue()
+                # 元画像をcaptureとして保存（JPEGの場合は再エンコードしない）
+                capture_bytes = image_bytes if is_jpeg(image_bytes) else encode_jpeg(
+                    image_rgb, quality=get_jpeg_quality('jpeg_quality_orig', JPEG_QUALITY_ORIG)
+                )
                 
                 if upload_to_s3_with_retry(s3_client, BUCKET_NAME, s3_key_capture, capture_bytes, 'image/jpeg'):
                     logger.info(f"初回キャプチャ画像を保存: {s3path_capture}")
+                    # 同じバッチの後続画像で再保存しないよう、保存済みとして記録
+                    camera_info['capture'] = s3path_capture
                     if update_camera_capture_image(dynamodb, CAMERA_ID, s3path_capture):
                         logger.info(f"DynamoDBのcaptureフィールドを更新: {CAMERA_ID}")
             except Exception as e:
                 logger.error(f"初回キャプチャ画像の保存エラー: {e}")
         
-        # YOLO検出実行
-        logger.info("YOLO検出を実行中...")
-        detections = detector.detect(image_rgb)
         logger.info(f"YOLO検出完了: {len(detections)}個の検出")
         
         # クラス+信頼度でフィルタリング
@@ -340,78 +595,61 @@ def process_s3_image(source_bucket: str, source_key: str, event_time: str, event
                 'message': '検出なし',
                 'detection_count': 0,
                 'source_path': f"s3://{source_bucket}/{source_key}"
-            }
+            }, None
+        
+        # 検出があった場合のみ、アノテーション用に元の解像度でデコードし直す
+        # （描画はPIL Imageで行うため、numpy arrayを経由せずPIL Imageに直接デコードする）
+        if scale_x != 1.0 or scale_y != 1.0:
+            annotation_image, (image_width, image_height) = open_image_pil(image_bytes, source_key)
+        else:
+            annotation_image = image_rgb
+            image_height, image_width = image_rgb.shape[:2]
         
         # アノテーション画像を作成
-        annotated_bgr = create_annotated_image(image_rgb, filtered_detections)
+        annotated_bgr = create_annotated_image(annotation_image, filtered_detections)
         
         # 画像をS3に保存
         s3path_orig, s3path_detect, _, _ = save_images_to_s3(
-            image_rgb, annotated_bgr, CAMERA_ID, COLLECTOR_ID, timestamp
+            image_bytes, annotated_bgr, CAMERA_ID, COLLECTOR_ID, timestamp
         )
         
-        # FILE_TABLEにレコードを挿入
-        file_id = insert_file_record(
-            dynamodb, CAMERA_ID, timestamp, timestamp,
+        # FILE_TABLEのレコードを構築（書き込みはバッチ全体でまとめて行う）
+        file_data = build_file_record_item(
+            CAMERA_ID, timestamp, timestamp,
             s3path_orig, COLLECTOR_ID, 'image',
             s3path_detect=s3path_detect
         )
+        file_id = file_data['file_id']
+        writes = [(FILE_TABLE, file_data)]
         
-        if not file_id:
-            logger.error("ファイルレコードの保存に失敗")
-            return {'statusCode': 500, 'error': 'ファイルレコードの保存に失敗'}
-        
-        logger.info(f"ファイルレコード保存: file_id={file_id}")
-        
-        # detect-log保存用のデータを構築
+        # detect-logの項目を構築
         detections_data = build_class_detect_data(detections, filtered_detections)
-        
-        # file_dataを構築
-        file_data = {
-            'file_id': file_id,
-            'camera_id': CAMERA_ID,
-            'collector_id': COLLECTOR_ID,
-            'file_type': 'image',
-            's3path': s3path_orig,
-            's3path_detect': s3path_detect,
-            'start_time': format_for_db(timestamp),
-            'end_time': format_for_db(timestamp)
-        }
-        
-        # detect-log保存
-        detect_log_result = save_class_detect_log(
+        detect_log_data = build_class_detect_log_item(
             detector_id=detector_id,
             file_data=file_data,
             detections=detections_data,
             track_log_id=None,  # s3yoloではtrack_logなし
             s3path_detect=s3path_detect
         )
-        
-        if detect_log_result:
-            logger.info(f"detect-log保存完了: detect_log_id={detect_log_result.get('detect_log_id')}")
+        if detect_log_data:
+            writes.append((DETECT_LOG_TABLE, detect_log_data))
         else:
-            logger.warning("detect-log保存に失敗")
+            logger.warning("detect-logの構築に失敗")
         
-        # EventBridge ClassDetectEvent発行
-        if event_publisher and filtered_detections:
-            try:
-                logger.info(f"ClassDetectEvent発行: collector_id={COLLECTOR_ID}")
-                event_publisher.publish_class_detect_event(
-                    camera_id=CAMERA_ID,
-                    collector_id=COLLECTOR_ID,
-                    file_id=file_id,
-                    s3path=s3path_orig,
-                    s3path_detect=s3path_detect,
-                    track_log_id=None,
-                    detections=detections,
-                    filtered_detections=filtered_detections,
-                    image_width=image_width,
-                    image_height=image_height,
-                    timestamp=timestamp
-                )
-                logger.info("ClassDetectEvent発行完了")
-            except Exception as e:
-                logger.error(f"EventBridge発行エラー: {e}")
+        # ClassDetectEventの内容（書き込み完了後に発行）
+        event = {
+            'camera_id': CAMERA_ID,
+            'collector_id': COLLECTOR_ID,
+            'file_id': file_id,
+            's3path': s3path_orig,
+            's3path_detect': s3path_detect,
+            'track_log_id': None,
+            'detections': detections,
+            'filtered_detections': filtered_detections,
+            'image_width': image_width,
+            'image_height': image_height,
+            'timestamp': timestamp
+        }
         
         return {
             'statusCode': 200,
@@ -421,19 +659,179 @@ def process_s3_image(source_bucket: str, source_key: str, event_time: str, event
             's3path_detect': s3path_detect,
             'detection_count': len(filtered_detections),
             'source_path': f"s3://{source_bucket}/{source_key}"
-        }
+        }, {'writes': writes, 'detect_log': detect_log_data, 'event': event}
         
     except Exception as e:
-        logger.error(f"画像処理中にエラーが発生: {e}")
-        import traceback
-        logger.error(f"詳細: {traceback.format_exc()}")
-        return {'statusCode': 500, 'error': f'処理中にエラーが発生: {str(e)}'}
+        return _error_result("画像処理中にエラーが発生", e), None
+
+
+def process_s3_images(targets: list, event_publisher=None) -> list:
+    """
+    複数のS3画像をまとめてYOLO検出（推論はMAX_BATCH_SIZE枚ごとに1回のバッチ実行）
+    
+    Args:
+        targets: (source_bucket, source_key, event_time) のリスト
+        event_publisher: EventBridgePublisher（オプション）
+        
+    Returns:
+        画像ごとの処理結果の辞書のリスト（targetsと同じ順序）
+    """
+    try:
+        # カメラ情報を取得
+        camera_info = get_cached_camera_info()
+        if not camera_info:
+            logger.error(f"カメラ情報が見つかりません: {CAMERA_ID}")
+            return [{'statusCode': 400, 'error': f'カメラ情報が見つかりません: {CAMERA_ID}'}] * len(targets)
+
+        # カメラタイプを検証（s3タイプをサポート）
+        if camera_info.get('type') != 's3':
+            logger.error(f"サポートされていないカメラタイプ: {camera_info.get('type')}")
+            return [{'statusCode': 400, 'error': f'サポートされていないカメラタイプ: {camera_info.get("type")}'}] * len(targets)
+
+        logger.info(f"カメラ情報取得: {CAMERA_ID} (type: {camera_info.get('type')})")
+
+        # コレクター設定を取得
+        settings = get_collector_settings()
+        
+        # 設定値を取得
+        collect_classes = get_collect_classes()
+        confidence_threshold = float(settings.get('confidence', 0.5))
+        model_path = settings.get('model_path', 'v9-s')
+        collector_mode = settings.get('collector_mode', 'image')
+        
+        logger.info(f"検出設定: collect_classes={collect_classes}, confidence={confidence_threshold}, model={model_path}")
+
+        # 仮想Detectorを取得/作成
+        detector_id = ensure_virtual_detector(CAMERA_ID, collector_mode)
+        
+        # YoloDetectorを取得
+        detector = get_yolo_detector(model_path)
+    except Exception as e:
+        return [_error_result("画像処理中にエラーが発生", e)] * len(targets)
+    
+    results = [None] * len(targets)
+    # 検出があった画像の (インデックス, 保留中の書き込み・イベント)
+    pending = []
+    
+    # メモリ使用量を抑えるため、MAX_BATCH_SIZE枚ごとに読み込み・推論・後処理を行う
+    for batch_start in range(0, len(targets), MAX_BATCH_SIZE):
+        # S3から画像を並列に読み込み（読み込みに失敗した画像はその画像のみエラー）
+        futures = {
+            _s3_pool.submit(load_image_from_s3, targets[i][0], targets[i][1], DETECT_DECODE_MAX_SIDE): i
+            for i in range(batch_start, min(batch_start + MAX_BATCH_SIZE, len(targets)))
+        }
+        loaded = []
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                image_rgb, image_bytes, decode_scale = future.result()
+                loaded.append((i, image_rgb, image_bytes, decode_scale))
+            except ImageRejectedError as e:
+                # 再試行しても処理できないため、エラーにせずスキップ
+                source_bucket, source_key, _ = targets[i]
+                results[i] = {
+                    'statusCode': 200,
+                    'message': f'処理対象外の画像のためスキップ: {e}',
+                    'detection_count': 0,
+                    'source_path': f"s3://{source_bucket}/{source_key}"
+                }
+            except Exception as e:
+                results[i] = _error_result("画像の読み込み中にエラーが発生", e)
+        
+        if not loaded:
+            continue
+        
+        # 完了順ではなくイベントの順序で推論・後処理する
+        loaded.sort(key=lambda item: item[0])
+        
+        # YOLO検出実行（バッチ内の画像を1回の推論で処理）
+        logger.info(f"YOLO検出を実行中... ({len(loaded)}枚)")
+        try:
+            detections_list = detector.detect_batch([image_rgb for _, image_rgb, _, _ in loaded])
+        except Exception as e:
+            error_result = _error_result("YOLO検出中にエラーが発生", e)
+            for i, _, _, _ in loaded:
+                results[i] = error_result
+            continue
+        
+        for (i, image_rgb, image_bytes, decode_scale), detections in zip(loaded, detections_list):
+            source_bucket, source_key, event_time = targets[i]
+            results[i], pending_entry = process_detections(
+                source_bucket, source_key, event_time,
+                image_rgb, image_bytes, decode_scale, detections,
+                camera_info, collect_classes, confidence_threshold,
+                detector_id
+            )
+            if pending_entry:
+                pending.append((i, pending_entry))
+    
+    if pending:
+        _flush_pending(pending, results, event_publisher)
+    
+    return results
+
+
+def _flush_pending(pending: list, results: list, event_publisher=None):
+    """
+    保留中のファイルレコード・detect-logをまとめて書き込み、ClassDetectEventを発行
+    
+    FILE_TABLE / DETECT_LOG_TABLE への書き込みはBatchWriteItem（最大25件/回）、
+    イベントはPutEvents（最大10件/回）でまとめて行う。
+    イベントは書き込みが完了してから発行する（イベント受信側がレコードを参照できるように）。
+    
+    Args:
+        pending: (画像のインデックス, 保留中の書き込み・イベント) のリスト
+        results: 画像ごとの処理結果のリスト（書き込みに失敗した画像はエラーに置き換える）
+        event_publisher: EventBridgePublisher（オプション）
+    """
+    writes = [write for _, entry in pending for write in entry['writes']]
+    if not flush_pending_writes(dynamodb, writes):
+        logger.error("ファイルレコード・detect-logの保存に失敗")
+        for i, _ in pending:
+            results[i] = {'statusCode': 500, 'error': 'ファイルレコードの保存に失敗'}
+        return
+    
+    logger.info(f"ファイルレコード・detect-log保存完了: {len(pending)}画像 ({len(writes)}件)")
+    
+    # タグ・時系列データを保存
+    for _, entry in pending:
+        if entry['detect_log']:
+            save_detect_log_index(entry['detect_log'])
+    
+    # EventBridge ClassDetectEvent発行（PutEvents 1回につき最大10件をまとめて発行）
+    if event_publisher:
+        try:
+            logger.info(f"ClassDetectEvent発行: {len(pending)}件")
+            events = [event_publisher.build_class_detect_event(**entry['event']) for _, entry in pending]
+            if event_publisher.publish_batch(events):
+                logger.info("ClassDetectEvent発行完了")
+        except Exception as e:
+            logger.error(f"EventBridge発行エラー: {e}")
+
+
+def process_s3_image(source_bucket: str, source_key: str, event_time: str, event_publisher=None):
+    """
+    S3画像を処理してYOLO検出を実行
+    
+    Args:
+        source_bucket: ソースS3バケット名
+        source_key: ソースS3オブジェクトキー
+        event_time: イベント発生時刻
+        event_publisher: EventBridgePublisher（オプション）
+        
+    Returns:
+        処理結果の辞書
+    """
+    return process_s3_images([(source_bucket, source_key, event_time)], event_publisher)[0]
 
 
 def lambda_handler(event, context):
     """
     Lambda関数のメインハンドラー
     S3イベントを受け取り、YOLO検出を実行する
+    
+    Recordsに複数のS3イベントが含まれる場合（SQS/EventBridge Pipesのバッチ等）は、
+    まとめてYOLO推論を行い、失敗したレコードのみ batchItemFailures で返す。
     """
     logger.info(f"Lambda関数が開始されました")
     logger.info(f"環境変数 - CAMERA_ID: {CAMERA_ID}, COLLECTOR_ID: {COLLECTOR_ID}, BUCKET_NAME: {BUCKET_NAME}")
@@ -453,7 +851,8 @@ def lambda_handler(event, context):
         event_publisher = None
 
     try:
-        # EventBridgeからのS3イベントを解析
+        # 処理対象の画像 (source_bucket, source_key, event_time, item_identifier) を列挙
+        targets = []
         if 'detail' in event and 'bucket' in event['detail'] and 'object' in event['detail']:
             # EventBridge経由のS3イベント
             detail = event['detail']
@@ -465,25 +864,32 @@ def lambda_handler(event, context):
             logger.info(f"  Bucket: {source_bucket}")
             logger.info(f"  Key: {source_key}")
             logger.info(f"  EventTime: {event_time}")
+            targets.append((source_bucket, source_key, event_time, None))
             
         elif 'Records' in event:
-            # 直接のS3イベント（テスト用）
+            # 直接のS3イベント（テスト用）、またはSQS/EventBridge Pipesのバッチ
             if len(event['Records']) == 0:
                 return {'statusCode': 400, 'body': json.dumps({'error': 'レコードが空です'})}
             
-            record = event['Records'][0]
-            if 's3' not in record:
-                return {'statusCode': 400, 'body': json.dumps({'error': 'S3イベントではありません'})}
-            
-            s3_info = record['s3']
-            source_bucket = s3_info['bucket']['name']
-            source_key = s3_info['object']['key']
-            event_time = record.get('eventTime', format_for_db(now_utc()))
+            for record in event['Records']:
+                parsed = parse_s3_event_record(record)
+                if parsed is None:
+                    # 解釈できないレコードは再試行しても成功しないため、バッチを止めずにスキップする
+                    logger.warning(f"S3イベントではないためスキップ: {json.dumps(record, default=str, ensure_ascii=False)}")
+                    continue
+                
+                for source_bucket, source_key, event_time in parsed:
+                    logger.info(f"S3イベント: Bucket={source_bucket}, Key={source_key}, EventTime={event_time}")
+                    # 部分バッチレスポンスの識別子はmessageIdを持つレコード（SQS等）のみ
+                    targets.append((source_bucket, source_key, event_time, record.get('messageId')))
             
-            logger.info(f"直接S3イベント:")
-            logger.info(f"  Bucket: {source_bucket}")
-            logger.info(f"  Key: {source_key}")
-            logger.info(f"  EventTime: {event_time}")
+            is_record_batch = any('messageId' in record for record in event['Records'])
+            if not targets:
+                logger.info("処理対象のS3オブジェクトがありません")
+                response = {'statusCode': 200, 'body': json.dumps([], ensure_ascii=False)}
+                if is_record_batch:
+                    response['batchItemFailures'] = []
+                return response
             
         else:
             # テスト用のマニュアルイベント
@@ -495,34 +901,65 @@ def lambda_handler(event, context):
             logger.info(f"  Bucket: {source_bucket}")
             logger.info(f"  Key: {source_key}")
             logger.info(f"  EventTime: {event_time}")
+            targets.append((source_bucket, source_key, event_time, None))
 
         # 画像ファイルのみ処理
-        key_lower = source_key.lower()
-        if not (key_lower.endswith('.jpg') or key_lower.endswith('.jpeg') or key_lower.endswith('.png')):
-            logger.info(f"画像ファイルではないためスキップ: {source_key}")
-            return {
-                'statusCode': 200,
-                'body': json.dumps({'message': '画像ファイルではないためスキップ'}, ensure_ascii=False)
-            }
+        results = [None] * len(targets)
+        image_indices = []
+        for i, (_, source_key, _, _) in enumerate(targets):
+            key_lower = source_key.lower()
+            if not (key_lower.endswith('.jpg') or key_lower.endswith('.jpeg') or key_lower.endswith('.png')):
+                logger.info(f"画像ファイルではないためスキップ: {source_key}")
+                results[i] = {'statusCode': 200, 'message': '画像ファイルではないためスキップ'}
+            else:
+                image_indices.append(i)
 
         # YOLO検出処理を実行
-        result = process_s3_image(source_bucket, source_key, event_time, event_publisher)
-        
-        logger.info(f"処理結果: {result}")
+        if image_indices:
+            image_results = process_s3_images(
+                [targets[i][:3] for i in image_indices], event_publisher
+            )
+            for i, result in zip(image_indices, image_results):
+                results[i] = result
+        
+        batch_item_failures = []
+        for (_, _, _, item_identifier), result in zip(targets, results):
+            logger.info(f"処理結果: {result}")
+            # 1メッセージに複数オブジェクトが含まれる場合も識別子は1回だけ返す
+            if (result['statusCode'] != 200 and item_identifier is not None
+                    and {'itemIdentifier': item_identifier} not in batch_item_failures):
+                batch_item_failures.append({'itemIdentifier': item_identifier})
+        
+        if len(results) == 1:
+            response = {
+                'statusCode': results[0]['statusCode'],
+                'body': json.dumps(results[0], ensure_ascii=False)
+            }
+        else:
+            failed_results = [result for result in results if result['statusCode'] != 200]
+            response = {
+                'statusCode': failed_results[0]['statusCode'] if failed_results else 200,
+                'body': json.dumps(results, ensure_ascii=False)
+            }
         
-        return {
-            'statusCode': result['statusCode'],
-            'body': json.dumps(result, ensure_ascii=False)
-        }
+        # レコード形式の呼び出しでは部分バッチレスポンス形式で失敗したレコードのみ返す
+        if any(item_identifier is not None for _, _, _, item_identifier in targets):
+            response['batchItemFailures'] = batch_item_failures
+        return response
 
     except Exception as e:
         logger.error(f"Lambda関数でエラーが発生: {e}")
         import traceback
         logger.error(f"詳細: {traceback.format_exc()}")
-        return {
+        response = {
             'statusCode': 500,
             'body': json.dumps({'error': f'Lambda関数でエラーが発生: {str(e)}'}, ensure_ascii=False)
         }
+        # 部分バッチレスポンスではbatchItemFailuresがないと全件成功として削除されるため、全レコードを失敗として返す
+        message_ids = [record['messageId'] for record in event.get('Records', []) if 'messageId' in record]
+        if message_ids:
+            response['batchItemFailures'] = [{'itemIdentifier': message_id} for message_id in message_ids]
+        return response
 
 
 # ローカルテスト用
@@ -1,3 +1,7 @@
+import asyncio
+import base64
+import json
+import time
 from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import List, Optional
 from pydantic import BaseModel
@@ -9,8 +13,41 @@ from shared.common import *
 router = APIRouter()
 
 # Initialize DynamoDB resource
-session = create_boto3_session()
-dynamodb = session.resource('dynamodb')
+# keep-alive・コネクションプール設定済みの共有リソースを使い、リクエストごとのTLSハンドシェイクを避ける
+dynamodb = get_dynamodb_resource()
+
+# Tableオブジェクトはリクエストごとに作らず使い回す
+detect_log_table = dynamodb.Table(DETECT_LOG_TABLE)
+
+# クエリで取得する属性（レスポンスで使う属性のみを読み込み、転送量とデシリアライズを減らす）
+NOTIFICATION_PROJECTION = (
+    "detect_log_id, place_name, camera_name, start_time, detect_notify_reason, camera_id, "
+    "file_id, detector, detector_id, file_type, collector, collector_id"
+)
+FILE_DETECT_LOG_PROJECTION = (
+    "detect_log_id, file_id, detector_id, detector, detect_result, detect_tag, "
+    "detect_notify_flg, detect_notify_reason, start_time, confidence_score"
+)
+
+# 通知履歴の総件数のキャッシュ有効期間（秒）
+# 総件数の取得は対象期間の全件を読むため、ページ切り替えのたびに数え直さない
+NOTIFICATION_COUNT_CACHE_TTL_SEC = 60
+# days → (総件数, 有効期限)
+_notification_count_cache = {}
+
+def _encode_cursor(last_evaluated_key: dict) -> str:
+    """LastEvaluatedKeyをページングカーソル（URLセーフなbase64文字列）に変換"""
+    return base64.urlsafe_b64encode(json.dumps(last_evaluated_key).encode('utf-8')).decode('ascii')
+
+def _decode_cursor(cursor: str) -> dict:
+    """ページングカーソルをExclusiveStartKeyに変換（不正な場合は400）"""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(key, dict):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key
 
 class NotifyUpdateRequest(BaseModel):
     notify_flg: bool
@@ -26,26 +63,30 @@ async def get_file_detect_logs(
     指定されたファイルIDの検出ログを取得
     """
     try:
-        table = dynamodb.Table(DETECT_LOG_TABLE)
+        table = detect_log_table
         
         if detector_id:
             # detector_idが指定されている場合、file_idとdetector_idの両方でクエリ（globalindex4使用）
-            response = table.query(
+            response = await asyncio.to_thread(
+                table.query,
                 IndexName='globalindex4',
                 KeyConditionExpression='file_id = :file_id AND detector_id = :detector_id',
                 ExpressionAttributeValues={
                     ':file_id': file_id,
                     ':detector_id': detector_id
-                }
+                },
+                ProjectionExpression=FILE_DETECT_LOG_PROJECTION
             )
         else:
             # detector_idが指定されていない場合、file_idのみでクエリ（globalindex4使用）
-            response = table.query(
+            response = await asyncio.to_thread(
+                table.query,
                 IndexName='globalindex4',
                 KeyConditionExpression='file_id = :file_id',
                 ExpressionAttributeValues={
                     ':file_id': file_id
-                }
+                },
+                ProjectionExpression=FILE_DETECT_LOG_PROJECTION
             )
         
         logs = response.get('Items', [])
@@ -94,9 +135,10 @@ async def get_detect_log_details(
     指定された検出ログの詳細情報を取得
     """
     try:
-        table = dynamodb.Table(DETECT_LOG_TABLE)
+        table = detect_log_table
         
-        response = table.get_item(
+        response = await asyncio.to_thread(
+            table.get_item,
             Key={'detect_log_id': detect_log_id}
         )
         
@@ -134,7 +176,7 @@ async def update_notify_flag(
     検出ログの通知フラグを更新
     """
     try:
-        table = dynamodb.Table(DETECT_LOG_TABLE)
+        table = detect_log_table
         
         # 更新項目を準備
         update_expression = "SET detect_notify_flg = :notify_flg"
@@ -144,7 +186,8 @@ async def update_notify_flag(
             update_expression += ", detect_notify_reason = :notify_reason"
             expression_values[':notify_reason'] = request.notify_reason
         
-        response = table.update_item(
+        response = await asyncio.to_thread(
+            table.update_item,
             Key={'detect_log_id': detect_log_id},
             UpdateExpression=update_expression,
             ExpressionAttributeValues=expression_values,
@@ -169,7 +212,7 @@ async def get_recent_notifications(
     print(f"Current user: {current_user}")
     
     try:
-        table = dynamodb.Table(DETECT_LOG_TABLE)
+        table = detect_log_table
         print("DynamoDB table initialized")
         
         # 1時間前の時刻を計算
@@ -180,7 +223,8 @@ async def get_recent_notifications(
         
         # globalindex2を使用してdetect_notify_flg='true'でクエリ
         print("Executing DynamoDB query...")
-        response = table.query(
+        response = await asyncio.to_thread(
+            table.query,
             IndexName='globalindex2',
             KeyConditionExpression='detect_notify_flg = :notify_flg AND start_time >= :start_time',
             ExpressionAttributeValues={
@@ -188,7 +232,8 @@ async def get_recent_notifications(
                 ':start_time': one_hour_ago_str
             },
             ScanIndexForward=False,  # start_timeで降順ソート（最新順）
-            Limit=20  # 最大20件
+            Limit=20,  # 最大20件
+            ProjectionExpression=NOTIFICATION_PROJECTION
         )
         
         logs = response.get('Items', [])
@@ -235,21 +280,27 @@ async def get_recent_notifications(
 
 @router.get("/notifications/history")
 async def get_notification_history(
-    page: int = Query(1, ge=1, description="Page number (starting from 1)"),
+    page: int = Query(1, ge=1, description="Page number (starting from 1). Deprecated: use cursor"),
     limit: int = Query(20, ge=1, le=100, description="Number of items per page"),
     days: int = Query(30, ge=1, le=365, description="Number of days to look back"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
     current_user: dict = Depends(get_current_user)
 ):
     """
     過去の通知を取得（ページング付き）
     detect_notify_flg=trueの通知をstart_timeの降順で返す
     globalindex2を使用して効率的にクエリ
+    
+    cursorを指定した場合は前のページの続きからlimit件のみを取得する。
+    pageのみを指定した場合は先頭から読み飛ばすため、後ろのページほど読み込み件数が増える。
     """
     print(f"=== get_notification_history API called ===")
-    print(f"Current user: {current_user}, page: {page}, limit: {limit}, days: {days}")
+    print(f"Current user: {current_user}, page: {page}, limit: {limit}, days: {days}, cursor: {cursor}")
+    
+    start_key = _decode_cursor(cursor) if cursor else None
     
     try:
-        table = dynamodb.Table(DETECT_LOG_TABLE)
+        table = detect_log_table
         print("DynamoDB table initialized")
         
         # 指定日数前の時刻を計算
@@ -259,12 +310,12 @@ async def get_notification_history(
         print(f"Searching for notifications since: {start_date_str}")
         
         # globalindex2を使用してdetect_notify_flg='true'でクエリ
-        # ページングのためにスキップする件数を計算
-        skip_count = (page - 1) * limit
+        # ページングのためにスキップする件数を計算（カーソル指定時はカーソルの位置から読むためスキップ不要）
+        skip_count = 0 if start_key else (page - 1) * limit
         fetch_count = skip_count + limit  # 必要な件数まで取得
         
         all_items = []
-        last_evaluated_key = None
+        last_evaluated_key = start_key
         
         while len(all_items) < fetch_count:
             query_kwargs = {
@@ -275,13 +326,14 @@ async def get_notification_history(
                     ':start_time': start_date_str
                 },
                 'ScanIndexForward': False,  # start_timeで降順ソート（最新順）
-                'Limit': min(100, fetch_count - len(all_items))  # 一度に取得する件数を制限
+                'Limit': min(100, fetch_count - len(all_items)),  # 一度に取得する件数を制限
+                'ProjectionExpression': NOTIFICATION_PROJECTION
             }
             
             if last_evaluated_key:
                 query_kwargs['ExclusiveStartKey'] = last_evaluated_key
             
-            response = table.query(**query_kwargs)
+            response = await asyncio.to_thread(table.query, **query_kwargs)
             items = response.get('Items', [])
             all_items.extend(items)
             
@@ -313,31 +365,46 @@ async def get_notification_history(
             }
             formatted_notifications.append(formatted_notification)
         
-        # 総件数を取得するために追加クエリ（Countのみ）
-        count_response = table.query(
-            IndexName='globalindex2',
-            KeyConditionExpression='detect_notify_flg = :notify_flg AND start_time >= :start_time',
-            ExpressionAttributeValues={
-                ':notify_flg': 'true',
-                ':start_time': start_date_str
-            },
-            Select='COUNT'
-        )
-        total_count = count_response.get('Count', len(all_items))
-        
-        # ページネーションがある場合は全件カウントを取得
-        while count_response.get('LastEvaluatedKey'):
-            count_response = table.query(
+        # 総件数を取得
+        now = time.monotonic()
+        cached_count = _notification_count_cache.get(days)
+        if not last_evaluated_key and not start_key:
+            # 先頭から最後まで取得済みの場合は取得した件数が総件数
+            total_count = len(all_items)
+            _notification_count_cache[days] = (total_count, now + NOTIFICATION_COUNT_CACHE_TTL_SEC)
+        elif cached_count and cached_count[1] > now:
+            # キャッシュが有効な場合は再集計しない
+            total_count = max(cached_count[0], len(all_items))
+        else:
+            # 総件数を取得するために追加クエリ（Countのみ）
+            count_response = await asyncio.to_thread(
+                table.query,
                 IndexName='globalindex2',
                 KeyConditionExpression='detect_notify_flg = :notify_flg AND start_time >= :start_time',
                 ExpressionAttributeValues={
                     ':notify_flg': 'true',
                     ':start_time': start_date_str
                 },
-                Select='COUNT',
-                ExclusiveStartKey=count_response['LastEvaluatedKey']
+                Select='COUNT'
             )
-            total_count += count_response.get('Count', 0)
+            total_count = count_response.get('Count', len(all_items))
+            
+            # ページネーションがある場合は全件カウントを取得
+            while count_response.get('LastEvaluatedKey'):
+                count_response = await asyncio.to_thread(
+                    table.query,
+                    IndexName='globalindex2',
+                    KeyConditionExpression='detect_notify_flg = :notify_flg AND start_time >= :start_time',
+                    ExpressionAttributeValues={
+                        ':notify_flg': 'true',
+                        ':start_time': start_date_str
+                    },
+                    Select='COUNT',
+                    ExclusiveStartKey=count_response['LastEvaluatedKey']
+                )
+                total_count += count_response.get('Count', 0)
+            
+            _notification_count_cache[days] = (total_count, now + NOTIFICATION_COUNT_CACHE_TTL_SEC)
         
         total_pages = (total_count + limit - 1) // limit  # 切り上げ
         
@@ -348,9 +415,11 @@ async def get_notification_history(
                 "total_pages": total_pages,
                 "total_count": total_count,
                 "page_size": limit,
-                "has_next": page < total_pages,
+                "has_next": bool(last_evaluated_key) if start_key else page < total_pages,
                 "has_prev": page > 1,
-                "days_range": days
+                "days_range": days,
+                # 次のページの取得に使うカーソル（最後のページの場合はNone）
+                "next_cursor": _encode_cursor(last_evaluated_key) if last_evaluated_key else None
             }
         }
         
@@ -1,8 +1,11 @@
 from fastapi import APIRouter, HTTPException, Depends
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from boto3.dynamodb.conditions import Key
 from botocore.exceptions import ClientError
 from datetime import datetime, timedelta, timezone
+import asyncio
+import itertools
 import logging
 from shared.auth import get_current_user
 from shared.common import *
@@ -13,8 +16,20 @@ from analytics.api.routers.search import search_notifications, SearchRequest, co
 router = APIRouter()
 
 # Initialize DynamoDB resource
-session = create_boto3_session()
-dynamodb = session.resource('dynamodb')
+# keep-alive・コネクションプール設定済みの共有リソースを使い、リクエストごとのTLSハンドシェイクを避ける
+dynamodb = get_dynamodb_resource()
+
+# Tableオブジェクトはリクエストごとに作らず使い回す
+detector_table = dynamodb.Table(DETECTOR_TABLE)
+camera_table = dynamodb.Table(CAMERA_TABLE)
+timeseries_table = dynamodb.Table(DETECT_TAG_TIMESERIES_TABLE)
+
+# 粒度ごとのtime_keyの日時フォーマット
+TIME_KEY_FORMATS = {
+    'MINUTE': '%Y-%m-%dT%H:%M',
+    'HOUR': '%Y-%m-%dT%H',
+    'DAY': '%Y-%m-%d',
+}
 
 class TagsResponse(BaseModel):
     tags: List[str]
@@ -38,10 +53,14 @@ class DetailLogsRequest(BaseModel):
     tag_name: str
     place_id: Optional[str] = None
     camera_id: Optional[str] = None
+    # OpenSearchの検索ウィンドウ（from + size <= 10000）を超えないよう上限を設ける
+    page: int = Field(1, ge=1, le=100)
+    limit: int = Field(50, ge=1, le=100)
 
 class DetailLogsResponse(BaseModel):
     logs: List[Dict[str, Any]]
     total_count: int
+    pagination: Optional[Dict[str, Any]] = None
 
 def generate_time_range(granularity: str):
     """
@@ -79,20 +98,24 @@ async def get_detector_tags(
     指定された条件に基づいてdetectorテーブルからタグリストを取得
     """
     try:
-        table = dynamodb.Table(DETECTOR_TABLE)
+        table = detector_table
         
         if camera_id:
-            # カメラIDで絞り込み
-            response = table.scan(
-                FilterExpression="camera_id = :camera_id",
-                ExpressionAttributeValues={':camera_id': camera_id}
+            # カメラIDで絞り込み（GSI-2: camera_id）
+            response = await asyncio.to_thread(
+                table.query,
+                IndexName='globalindex2',
+                KeyConditionExpression=Key('camera_id').eq(camera_id),
+                ProjectionExpression='tag_list'
             )
+            items = response.get('Items', [])
         elif place_id:
-            # 場所IDで絞り込み - camera テーブルから該当するカメラIDを取得してから検索
-            camera_table = dynamodb.Table(CAMERA_TABLE)
-            camera_response = camera_table.scan(
-                FilterExpression="place_id = :place_id",
-                ExpressionAttributeValues={':place_id': place_id}
+            # 場所IDで絞り込み - camera テーブルから該当するカメラIDを取得してから検索（GSI-1: place_id）
+            camera_response = await asyncio.to_thread(
+                camera_table.query,
+                IndexName='globalindex1',
+                KeyConditionExpression=Key('place_id').eq(place_id),
+                ProjectionExpression='camera_id'
             )
             
             camera_ids = [camera['camera_id'] for camera in camera_response.get('Items', [])]
@@ -100,32 +123,26 @@ async def get_detector_tags(
             if not camera_ids:
                 return TagsResponse(tags=[])
             
-            # 複数のカメラIDで検索
-            if len(camera_ids) == 1:
-                response = table.scan(
-                    FilterExpression="camera_id = :camera_id_0",
-                    ExpressionAttributeValues={':camera_id_0': camera_ids[0]}
-                )
-            else:
-                # DynamoDBではINクエリはscanでのみ利用可能で、より複雑な構文が必要
-                filter_conditions = []
-                expression_values = {}
-                for i, camera_id in enumerate(camera_ids):
-                    filter_conditions.append(f"camera_id = :camera_id_{i}")
-                    expression_values[f':camera_id_{i}'] = camera_id
-                
-                filter_expression = " OR ".join(filter_conditions)
-                response = table.scan(
-                    FilterExpression=filter_expression,
-                    ExpressionAttributeValues=expression_values
+            # カメラごとのクエリを並列に実行（detectorテーブルのキーはdetector_idのみで
+            # カメラIDからは引けないため、BatchGetItemではなくGSI-2へのQueryを使う）
+            responses = await asyncio.gather(*[
+                asyncio.to_thread(
+                    table.query,
+                    IndexName='globalindex2',
+                    KeyConditionExpression=Key('camera_id').eq(camera_id),
+                    ProjectionExpression='tag_list'
                 )
+                for camera_id in camera_ids
+            ])
+            items = [item for response in responses for item in response.get('Items', [])]
         else:
             # 全体のタグリスト取得
-            response = table.scan()
+            response = await asyncio.to_thread(table.scan, ProjectionExpression='tag_list')
+            items = response.get('Items', [])
         
-        # tag_listからタグを抽出
+        # tag_listからタグを抽出（各読み取りはProjectionExpressionでtag_listのみ取得）
         all_tags = set()
-        for item in response.get('Items', []):
+        for item in items:
             tag_list = item.get('tag_list', '')
             if tag_list:
                 # パイプ区切りでタグを分割
@@ -149,7 +166,7 @@ async def get_timeseries_data(
     """
     try:
         logger.debug(f" Received request: {request}")
-        table = dynamodb.Table(DETECT_TAG_TIMESERIES_TABLE)
+        table = timeseries_table
         logger.debug(f" Table created successfully")
         
         # 時間範囲の取得（リクエストから取得、なければgenerate_time_rangeを使用）
@@ -175,51 +192,59 @@ async def get_timeseries_data(
         
         logger.debug(f" Final time range (UTC): {start_time} to {end_time}")
         
-        all_data = []
+        # time_keyの範囲はタグによらず同じなので、ループの外で1回だけ組み立てる
+        time_key_format = TIME_KEY_FORMATS.get(request.granularity, '%Y-%m-%d')
+        start_key = f"{request.granularity}|{start_time.strftime(time_key_format)}"
+        end_key = f"{request.granularity}|{end_time.strftime(time_key_format)}"
         
-        for tag_name in request.tags:
+        async def query_tag(tag_name: str) -> List[Dict[str, Any]]:
+            """1タグ分の時系列データを取得"""
             if request.camera_id:
                 # カメラ別検索 (globalindex2)
                 pk_value = f"{request.camera_id}|{tag_name}"
-                response = table.query(
+                response = await asyncio.to_thread(
+                    table.query,
                     IndexName='globalindex2',
                     KeyConditionExpression="camera_tag_key = :pk AND time_key BETWEEN :start_key AND :end_key",
                     ExpressionAttributeValues={
                         ':pk': pk_value,
-                        ':start_key': f"{request.granularity}|{start_time.strftime('%Y-%m-%dT%H:%M' if request.granularity == 'MINUTE' else '%Y-%m-%dT%H' if request.granularity == 'HOUR' else '%Y-%m-%d')}",
-                        ':end_key': f"{request.granularity}|{end_time.strftime('%Y-%m-%dT%H:%M' if request.granularity == 'MINUTE' else '%Y-%m-%dT%H' if request.granularity == 'HOUR' else '%Y-%m-%d')}"
+                        ':start_key': start_key,
+                        ':end_key': end_key
                     }
                 )
             elif request.place_id:
                 # 場所別検索 (globalindex1)
                 pk_value = f"{request.place_id}|{tag_name}"
-                response = table.query(
+                response = await asyncio.to_thread(
+                    table.query,
                     IndexName='globalindex1',
                     KeyConditionExpression="place_tag_key = :pk AND time_key BETWEEN :start_key AND :end_key",
                     ExpressionAttributeValues={
                         ':pk': pk_value,
-                        ':start_key': f"{request.granularity}|{start_time.strftime('%Y-%m-%dT%H:%M' if request.granularity == 'MINUTE' else '%Y-%m-%dT%H' if request.granularity == 'HOUR' else '%Y-%m-%d')}",
-                        ':end_key': f"{request.granularity}|{end_time.strftime('%Y-%m-%dT%H:%M' if request.granularity == 'MINUTE' else '%Y-%m-%dT%H' if request.granularity == 'HOUR' else '%Y-%m-%d')}"
+                        ':start_key': start_key,
+                        ':end_key': end_key
                     }
                 )
             else:
                 # 全体検索 (メインテーブル)
-                response = table.query(
+                response = await asyncio.to_thread(
+                    table.query,
                     KeyConditionExpression="tag_name = :pk AND time_key BETWEEN :start_key AND :end_key",
                     ExpressionAttributeValues={
                         ':pk': tag_name,
-                        ':start_key': f"{request.granularity}|{start_time.strftime('%Y-%m-%dT%H:%M' if request.granularity == 'MINUTE' else '%Y-%m-%dT%H' if request.granularity == 'HOUR' else '%Y-%m-%d')}",
-                        ':end_key': f"{request.granularity}|{end_time.strftime('%Y-%m-%dT%H:%M' if request.granularity == 'MINUTE' else '%Y-%m-%dT%H' if request.granularity == 'HOUR' else '%Y-%m-%d')}"
+                        ':start_key': start_key,
+                        ':end_key': end_key
                     }
                 )
             
             # データを追加
+            tag_data = []
             for item in response.get('Items', []):
                 # ✅ DynamoDBから取得したstart_time/end_time（UTC）をそのまま返却（API仕様変更）
                 start_time_utc = item.get('start_time')
                 end_time_utc = item.get('end_time')
                 
-                all_data.append({
+                tag_data.append({
                     'tag_name': tag_name,
                     'time_key': item['time_key'],
                     'count': int(item.get('count', 0)),
@@ -229,6 +254,11 @@ async def get_timeseries_data(
                     'place_id': item.get('place_id'),
                     'camera_id': item.get('camera_id')
                 })
+            return tag_data
+        
+        # タグごとのクエリを並列に実行（結果はリクエストのタグ順で結合）
+        results = await asyncio.gather(*[query_tag(tag_name) for tag_name in request.tags])
+        all_data = list(itertools.chain.from_iterable(results))
         
         logger.debug(f" Returning {len(all_data)} data points")
         return TimeseriesDataResponse(
@@ -276,8 +306,8 @@ async def get_detail_logs(
             query=None,  # テキスト検索は使用しない
             tags=[request.tag_name],  # タグでフィルタリング
             tag_search_mode="AND",  # 指定されたタグを含む
-            page=1,
-            limit=1000,  # 十分大きな値を設定（必要に応じて調整）
+            page=request.page,
+            limit=request.limit,  # 必要なページ分だけOpenSearchから取得する
             place_id=request.place_id,
             camera_id=request.camera_id,
             collector=None,
@@ -318,7 +348,8 @@ async def get_detail_logs(
         
         return DetailLogsResponse(
             logs=logs,
-            total_count=search_result["total_count"]
+            total_count=search_result["total_count"],  # OpenSearchのhits.total.value
+            pagination=search_result["pagination"]
         )
         
     except Exception as e:
@@ -12,7 +12,8 @@ router = APIRouter()
 
 # Initialize DynamoDB resource
 session = create_boto3_session()
-dynamodb = session.resource('dynamodb')
+# keep-alive・コネクションプール設定済みの共有リソースを使い、リクエストごとのTLSハンドシェイクを避ける
+dynamodb = get_dynamodb_resource()
 
 # ロガーの設定
 logger = setup_logger(__name__)
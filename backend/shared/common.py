@@ -35,12 +35,19 @@ Cedix システム用の共通ライブラリ
 """
 
 import os
+import json
 import boto3
 import logging
 import sys
+import threading
 import time
 import uuid
+from io import BytesIO
+from urllib.parse import unquote_plus
 from datetime import datetime, timedelta, timezone
+from boto3.dynamodb.types import TypeSerializer
+from boto3.s3.transfer import TransferConfig
+from botocore.client import Config
 from botocore.exceptions import ClientError, EndpointConnectionError
 from typing import Optional, Dict, Any, List
 
@@ -135,39 +142,150 @@ def create_boto3_session(access_key: Optional[str] = None, secret_access_key: Op
 
     return boto3.Session(**session_params)
 
+# S3/DynamoDBクライアント共通の接続設定
+# - コネクションプールを並列アップロード数より大きくし、keep-alive接続を再利用する
+#   （並列度の高いコレクターはAWS_MAX_POOL_CONNECTIONS環境変数で拡張する）
+# - TCP keepaliveでアイドル中の接続切断を防ぎ、TLSハンドシェイクのやり直しを減らす
+# - タイムアウトはAWS_CONNECT_TIMEOUT / AWS_READ_TIMEOUT環境変数を設定したコンテナのみ短くする
+#   （未設定時はbotocoreのデフォルト。動画全体のput_object等、長時間かかる呼び出しを打ち切らないため）
+# - リトライはbotocore標準のAWS_RETRY_MODE / AWS_MAX_ATTEMPTS環境変数で設定する
+_client_config_params = {
+    'max_pool_connections': int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', '16')),
+    'tcp_keepalive': True,
+}
+if os.environ.get('AWS_CONNECT_TIMEOUT'):
+    _client_config_params['connect_timeout'] = float(os.environ['AWS_CONNECT_TIMEOUT'])
+if os.environ.get('AWS_READ_TIMEOUT'):
+    _client_config_params['read_timeout'] = float(os.environ['AWS_READ_TIMEOUT'])
+AWS_CLIENT_CONFIG = Config(**_client_config_params)
+
+# S3エンドポイントの上書き（未設定時はリージョン付きエンドポイントを使用）
+# - S3_ENDPOINT_URL: 任意のエンドポイントURL（S3 Express One Zoneのディレクトリバケット等。
+#   ディレクトリバケットの場合はIAMで s3express:CreateSession の許可が必要）
+# - S3_USE_ACCELERATE_ENDPOINT: Transfer Accelerationエンドポイントを使用（バケット側で有効化が必要）
+S3_ENDPOINT_URL = os.environ.get('S3_ENDPOINT_URL')
+S3_USE_ACCELERATE_ENDPOINT = os.environ.get('S3_USE_ACCELERATE_ENDPOINT', '').lower() in ('1', 'true', 'yes')
+
+# 作成済みクライアントのキャッシュ（再接続ループ等で作り直さないため）
+_aws_client_cache = {}
+_aws_client_cache_lock = threading.Lock()
+
 def get_s3_client(signature_version: Optional[str] = None) -> boto3.client:
     """
-    S3クライアントを作成します
+    S3クライアントを取得します（署名バージョンごとに1つ作成し、以降は再利用）
     
     Args:
-        signature_version: 署名バージョン（オプション。指定時のみConfigを適用）
+        signature_version: 署名バージョン（オプション）
         
     Returns:
         boto3.client: S3クライアント
     """
-    from botocore.client import Config
-    session = create_boto3_session()
+    cache_key = ('s3', signature_version)
+    client = _aws_client_cache.get(cache_key)
+    if client is not None:
+        return client
     
-    # リージョン付きエンドポイントを使用（CORSのため）
-    # bucket.s3.region.amazonaws.com 形式のURLを生成
-    region = REGION
-    endpoint_url = f"https://s3.{region}.amazonaws.com"
+    with _aws_client_cache_lock:
+        client = _aws_client_cache.get(cache_key)
+        if client is None:
+            session = create_boto3_session()
+            
+            # リージョン付きエンドポイントを使用（CORSのため）
+            # bucket.s3.region.amazonaws.com 形式のURLを生成
+            region = REGION
+            endpoint_url = S3_ENDPOINT_URL or f"https://s3.{region}.amazonaws.com"
+            
+            config_params = {'s3': {'addressing_style': 'virtual'}}
+            if S3_USE_ACCELERATE_ENDPOINT:
+                # Accelerateエンドポイントはカスタムエンドポイントと併用できないため、botocoreに解決させる
+                config_params['s3']['use_accelerate_endpoint'] = True
+                endpoint_url = None
+            if signature_version:
+                config_params['signature_version'] = signature_version
+            
+            config = AWS_CLIENT_CONFIG.merge(Config(**config_params))
+            client = session.client('s3', endpoint_url=endpoint_url, config=config)
+            _aws_client_cache[cache_key] = client
+    return client
+
+# DynamoDBリソース・Tableのスレッドごとのキャッシュ
+# boto3のリソースはスレッドセーフではないため、スレッドごとに1つ作成して使い回す
+# （呼び出しごとにセッションを作成すると毎回HTTPS接続（TLSハンドシェイク）が張り直されるため）
+_dynamodb_thread_local = threading.local()
+_dynamodb_session = None
+
+def _get_thread_dynamodb_resource():
+    """
+    呼び出し元スレッド専用のDynamoDBリソースを取得します（スレッドごとに1つ作成し、以降は再利用）
     
-    config_params = {'s3': {'addressing_style': 'virtual'}}
-    if signature_version:
-        config_params['signature_version'] = signature_version
+    Returns:
+        boto3.resource: DynamoDBリソース
+    """
+    global _dynamodb_session
+    resource = getattr(_dynamodb_thread_local, 'resource', None)
+    if resource is None:
+        # セッションもスレッドセーフではないため、共有セッションからの作成はロック内で行う
+        with _aws_client_cache_lock:
+            if _dynamodb_session is None:
+                _dynamodb_session = create_boto3_session()
+            resource = _dynamodb_session.resource('dynamodb', config=AWS_CLIENT_CONFIG)
+        _dynamodb_thread_local.resource = resource
+        _dynamodb_thread_local.tables = {}
+    return resource
+
+def _get_shared_table(table_name: str):
+    """
+    呼び出し元スレッド専用のTableオブジェクトを取得します（テーブル名ごとにキャッシュ）
     
-    return session.client('s3', endpoint_url=endpoint_url, config=Config(**config_params))
+    Args:
+        table_name: テーブル名
+        
+    Returns:
+        DynamoDB Tableオブジェクト
+    """
+    resource = _get_thread_dynamodb_resource()
+    table = _dynamodb_thread_local.tables.get(table_name)
+    if table is None:
+        table = resource.Table(table_name)
+        _dynamodb_thread_local.tables[table_name] = table
+    return table
+
+class _ThreadLocalTable:
+    """
+    呼び出し元スレッド専用のTableオブジェクトに委譲するTable
+    
+    モジュールレベルで保持したTableを複数スレッド（ThreadPoolExecutor、asyncio.to_thread等）から
+    使っても、実際の呼び出しはスレッドごとのリソースで行われる。
+    """
+    
+    def __init__(self, table_name: str):
+        self._table_name = table_name
+    
+    def __getattr__(self, name):
+        return getattr(_get_shared_table(self._table_name), name)
+
+class _ThreadLocalDynamoDBResource:
+    """呼び出し元スレッド専用のDynamoDBリソースに委譲するリソース"""
+    
+    def Table(self, table_name: str) -> _ThreadLocalTable:
+        return _ThreadLocalTable(table_name)
+    
+    def __getattr__(self, name):
+        return getattr(_get_thread_dynamodb_resource(), name)
+
+_shared_dynamodb_resource = _ThreadLocalDynamoDBResource()
 
 def get_dynamodb_resource() -> boto3.resource:
     """
-    DynamoDBリソースを作成します
+    DynamoDBリソースを取得します
+    
+    返すリソースはスレッド間で共有できる。実際のboto3リソースはスレッドごとに1つ作成・再利用され、
+    Table(...) で取得したTableも呼び出し元スレッドのリソースで処理される。
     
     Returns:
         boto3.resource: DynamoDBリソース
     """
-    session = create_boto3_session()
-    return session.resource('dynamodb')
+    return _shared_dynamodb_resource
 
 def get_kinesis_video_client(camera_info: Optional[Dict[str, Any]] = None) -> boto3.client:
     """Kinesis Video Streamsのクライアントを作成"""
@@ -243,9 +361,7 @@ def get_camera_info(camera_id: str) -> Optional[Dict[str, Any]]:
         カメラ情報の辞書、見つからない場合はNone
     """
     logger = logging.getLogger(__name__)
-    session = create_boto3_session()
-    dynamodb = session.resource('dynamodb')
-    camera_table = dynamodb.Table(CAMERA_TABLE)
+    camera_table = _get_shared_table(CAMERA_TABLE)
     
     try:
         response = camera_table.get_item(
@@ -261,6 +377,14 @@ def get_camera_info(camera_id: str) -> Optional[Dict[str, Any]]:
         logger.error(f"カメラ情報の取得中にエラーが発生しました: {e}")
         return None
 
+# 大きなデータのアップロード設定（8MBを超える場合は8MBごとのマルチパートで並列アップロード）
+S3_MULTIPART_THRESHOLD = 8 * 1024 * 1024
+S3_UPLOAD_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=S3_MULTIPART_THRESHOLD,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=8
+)
+
 def upload_to_s3_with_retry(
     s3_client: boto3.client,
     bucket: str,
@@ -272,6 +396,9 @@ def upload_to_s3_with_retry(
     """
     S3への画像アップロードをリトライ機能付きで実行
     
+    S3_MULTIPART_THRESHOLDを超えるデータはマルチパートで並列にアップロードする
+    （それ以下は1回のPutObjectで送る）。
+    
     Args:
         s3_client: S3クライアント
         bucket: バケット名
@@ -287,12 +414,19 @@ def upload_to_s3_with_retry(
     
     for attempt in range(max_retries):
         try:
-            s3_client.put_object(
-                Bucket=bucket,
-                Key=key,
-                Body=body,
-                ContentType=content_type
-            )
+            if len(body) > S3_MULTIPART_THRESHOLD:
+                s3_client.upload_fileobj(
+                    BytesIO(body), bucket, key,
+                    ExtraArgs={'ContentType': content_type},
+                    Config=S3_UPLOAD_TRANSFER_CONFIG
+                )
+            else:
+                s3_client.put_object(
+                    Bucket=bucket,
+                    Key=key,
+                    Body=body,
+                    ContentType=content_type
+                )
             return True
         except (ClientError, EndpointConnectionError) as e:
             if attempt < max_retries - 1:
@@ -321,8 +455,7 @@ def upload_to_s3_with_retry(
     
     return False
 
-def insert_file_record(
-    dynamodb: boto3.resource,
+def build_file_record_item(
     camera_id: str,
     start_time: datetime,
     end_time: datetime,
@@ -330,12 +463,11 @@ def insert_file_record(
     collector_id: str,
     file_type: str,
     s3path_detect: Optional[str] = None
-) -> Optional[str]:
+) -> Dict[str, Any]:
     """
-    DynamoDBにファイルレコードを挿入
+    FILE_TABLE に保存するファイルレコードを構築（書き込みは行わない）
     
     Args:
-        dynamodb: DynamoDBリソース
         camera_id: カメラID
         start_time: 開始時刻
         end_time: 終了時刻
@@ -345,19 +477,19 @@ def insert_file_record(
         s3path_detect: S3パス（アノテーション画像/動画）
         
     Returns:
-        ファイルID、失敗した場合はNone
+        ファイルレコード（新規採番した file_id を含む）
     """
-    logger = logging.getLogger(__name__)
-    file_table = dynamodb.Table(FILE_TABLE)
     file_id = f"file-{uuid.uuid4().hex[:8]}"
     collector_id_file_type = f"{collector_id}|{file_type}"
     
     # ✅ UTC（タイムゾーン情報なし）で保存
+    start_time_str = format_for_db(start_time)  # UTC文字列に変換
+    end_time_str = start_time_str if end_time == start_time else format_for_db(end_time)
     item = {
         'file_id': file_id,
-        'start_time': format_for_db(start_time),  # UTC文字列に変換
+        'start_time': start_time_str,
         'camera_id': camera_id,
-        'end_time': format_for_db(end_time),  # UTC文字列に変換
+        'end_time': end_time_str,
         's3path': s3path,
         'collector_id': collector_id,
         'file_type': file_type,
@@ -368,10 +500,46 @@ def insert_file_record(
     if s3path_detect:
         item['s3path_detect'] = s3path_detect
     
+    return item
+
+def insert_file_record(
+    dynamodb: boto3.resource,
+    camera_id: str,
+    start_time: datetime,
+    end_time: datetime,
+    s3path: str,
+    collector_id: str,
+    file_type: str,
+    s3path_detect: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    DynamoDBにファイルレコードを挿入
+    
+    Args:
+        dynamodb: DynamoDBリソース
+        camera_id: カメラID
+        start_time: 開始時刻
+        end_time: 終了時刻
+        s3path: S3パス（元画像/動画）
+        collector_id: コレクターID (UUID)
+        file_type: ファイルタイプ ('image', 'video')
+        s3path_detect: S3パス（アノテーション画像/動画）
+        
+    Returns:
+        挿入したファイルレコード（file_id を含む、FILE_TABLE の項目と同じ形式）、失敗した場合はNone
+    """
+    logger = logging.getLogger(__name__)
+    file_table = dynamodb.Table(FILE_TABLE)
+    item = build_file_record_item(
+        camera_id, start_time, end_time, s3path,
+        collector_id, file_type, s3path_detect
+    )
+    file_id = item['file_id']
+    
     try:
         file_table.put_item(Item=item)
         logger.info(f"DynamoDBにファイルレコードを挿入しました: {file_id}")
-        return file_id
+        return item
     except Exception as e:
         logger.error(f"DynamoDBへのファイルレコード挿入中にエラーが発生しました: {e}")
         return None
@@ -407,6 +575,115 @@ def update_camera_capture_image(
         logger.error(f"DynamoDB更新中にエラーが発生しました: {e}")
         return False
 
+def insert_file_record_with_capture(
+    dynamodb: boto3.resource,
+    file_item: Dict[str, Any],
+    camera_id: str,
+    capture_s3path: str
+) -> bool:
+    """
+    ファイルレコードの挿入とカメラテーブルのキャプチャ画像列の更新を1回のリクエストで実行
+    
+    TransactWriteItemsで両方を書き込むため、DynamoDBへの往復が1回で済む。
+    
+    Args:
+        dynamodb: DynamoDBリソース
+        file_item: build_file_record_item() で構築したファイルレコード
+        camera_id: カメラID
+        capture_s3path: キャプチャ画像のS3パス
+        
+    Returns:
+        成功した場合True
+    """
+    logger = logging.getLogger(__name__)
+    serializer = TypeSerializer()
+    
+    try:
+        dynamodb.meta.client.transact_write_items(
+            TransactItems=[
+                {
+                    'Update': {
+                        'TableName': CAMERA_TABLE,
+                        'Key': {'camera_id': serializer.serialize(camera_id)},
+                        'UpdateExpression': 'SET capture = :val1',
+                        'ExpressionAttributeValues': {':val1': serializer.serialize(capture_s3path)}
+                    }
+                },
+                {
+                    'Put': {
+                        'TableName': FILE_TABLE,
+                        'Item': {key: serializer.serialize(value) for key, value in file_item.items()}
+                    }
+                }
+            ]
+        )
+        logger.info(f"DynamoDBにファイルレコードを挿入し、capture列を更新しました: {file_item['file_id']}, {capture_s3path}")
+        return True
+    except Exception as e:
+        logger.error(f"DynamoDBへのファイルレコード挿入・capture列更新中にエラーが発生しました: {e}")
+        return False
+
+# BatchWriteItemの1リクエストあたりの最大件数（DynamoDBの上限）
+BATCH_WRITE_MAX_ITEMS = 25
+# UnprocessedItems（スロットリング等で書き込まれなかった項目）の再送回数と初回待機時間（秒）
+BATCH_WRITE_MAX_RETRIES = 5
+BATCH_WRITE_RETRY_BASE_DELAY_SEC = 0.05
+
+def flush_pending_writes(
+    dynamodb: boto3.resource,
+    pending: List[tuple]
+) -> bool:
+    """
+    溜めておいた書き込みをBatchWriteItemでまとめてDynamoDBに保存
+
+    1件ずつPutItemする代わりに最大25件を1回のリクエストで書き込むため、
+    複数画像を処理する場合のDynamoDBへの往復回数を減らせる。
+    書き込まれなかった項目（UnprocessedItems）は待機時間を倍にしながら再送する。
+
+    Args:
+        dynamodb: DynamoDBリソース
+        pending: (テーブル名, 項目) のタプルのリスト
+                 （build_file_record_item() / build_detect_log_item() で構築した項目）
+
+    Returns:
+        全件の書き込みに成功した場合True
+    """
+    logger = logging.getLogger(__name__)
+    if not pending:
+        return True
+
+    serializer = TypeSerializer()
+    client = dynamodb.meta.client
+    success = True
+
+    for chunk_start in range(0, len(pending), BATCH_WRITE_MAX_ITEMS):
+        request_items = {}
+        for table_name, item in pending[chunk_start:chunk_start + BATCH_WRITE_MAX_ITEMS]:
+            request_items.setdefault(table_name, []).append({
+                'PutRequest': {'Item': {key: serializer.serialize(value) for key, value in item.items()}}
+            })
+
+        try:
+            for attempt in range(BATCH_WRITE_MAX_RETRIES + 1):
+                response = client.batch_write_item(RequestItems=request_items)
+                request_items = response.get('UnprocessedItems') or {}
+                if not request_items:
+                    break
+                if attempt < BATCH_WRITE_MAX_RETRIES:
+                    time.sleep(BATCH_WRITE_RETRY_BASE_DELAY_SEC * (2 ** attempt))
+
+            if request_items:
+                unprocessed_count = sum(len(requests) for requests in request_items.values())
+                logger.error(f"DynamoDBへの一括書き込みで未処理の項目が残りました: {unprocessed_count}件")
+                success = False
+        except Exception as e:
+            logger.error(f"DynamoDBへの一括書き込み中にエラーが発生しました: {e}")
+            success = False
+
+    if success:
+        logger.info(f"DynamoDBに一括書き込みしました: {len(pending)}件")
+    return success
+
 def generate_s3_path(camera_id: str, collector_id: str, file_type: str, timestamp: datetime, bucket_name: str, file_extension: str = 'jpg') -> tuple[str, str]:
     """
     S3パスを生成（collector_id ベース）
@@ -571,6 +848,60 @@ def parse_s3_path(s3path: str) -> tuple[str, str]:
     bucket, key = s3path.split('/', 1)
     return bucket, key
 
+def parse_s3_event_record(record: Dict[str, Any]) -> Optional[List[tuple]]:
+    """
+    Lambdaイベントの Records の1レコードから (source_bucket, source_key, event_time) のリストを取得
+    
+    S3起点のLambda（s3rec、s3yolo）で共通して使う。直接のS3イベントと、SQS/EventBridge Pipes経由のS3イベント（bodyにJSON）に対応する。
+    bodyはEventBridgeのS3イベント（detail形式）と、S3からSQSへの通知（Records形式）のどちらも受け付ける。
+    
+    Args:
+        record: Recordsの1レコード
+        
+    Returns:
+        list: (source_bucket, source_key, event_time) のリスト（s3:TestEvent等、対象がない場合は空）。
+              解釈できないレコードの場合はNone
+    """
+    if 's3' in record:
+        s3_info = record['s3']
+        # S3通知のキーはURLエンコードされている
+        return [(
+            s3_info['bucket']['name'],
+            unquote_plus(s3_info['object']['key']),
+            record.get('eventTime', format_for_db(now_utc()))
+        )]
+    
+    body = record.get('body')
+    if isinstance(body, str):
+        try:
+            body = json.loads(body)
+        except ValueError:
+            return None
+    if not isinstance(body, dict):
+        return None
+    
+    detail = body.get('detail')
+    if isinstance(detail, dict) and 'bucket' in detail and 'object' in detail:
+        return [(
+            detail['bucket']['name'],
+            detail['object']['key'],
+            body.get('time', format_for_db(now_utc()))
+        )]
+    
+    if 'Records' in body:
+        # S3→SQSの通知（1メッセージに複数のS3レコードを含む場合がある）
+        targets = []
+        for s3_record in body['Records']:
+            if 's3' not in s3_record:
+                return None
+            targets.extend(parse_s3_event_record(s3_record))
+        return targets
+    
+    if body.get('Event') == 's3:TestEvent':
+        # 通知設定時にS3が送るテストイベント
+        return []
+    return None
+
 def get_file_data(s3_key: str, bucket_name: str) -> Optional[Dict[str, Any]]:
     """
     S3キーから FILE_TABLE_NAME テーブルのファイルデータを取得
@@ -724,7 +1055,7 @@ def get_detector_settings(collector_id: str, file_type: str, detector: str) -> O
         logger.error(f"Detector設定の取得中にエラーが発生しました: {e}")
         return None
 
-def save_detect_log(
+def build_detect_log_item(
     detector_id: str,
     detect_result: str,
     detect_notify: bool,
@@ -736,7 +1067,7 @@ def save_detect_log(
     s3path_detect: Optional[str] = None
 ) -> Optional[Dict[str, Any]]:
     """
-    検出結果をDynamoDBに保存
+    DETECT_LOG_TABLE に保存する検出ログを構築（書き込みは行わない）
     
     Args:
         detector_id: 検出器ID
@@ -750,164 +1081,214 @@ def save_detect_log(
         s3path_detect: 検出結果画像のS3パス（オプション）
         
     Returns:
-        成功時は保存したデータ、失敗時はNone
+        検出ログ（新規採番した detect_log_id を含む）、file_dataが不足している場合はNone
     """
     logger = logging.getLogger(__name__)
     
-    try:
-        session = create_boto3_session()
-        dynamodb = session.resource('dynamodb')
-        detect_log_table = dynamodb.Table(DETECT_LOG_TABLE)
-        
-        # file_dataから必要な情報を取得
-        file_id = file_data.get('file_id')
-        s3path = file_data.get('s3path')
-        camera_id = file_data.get('camera_id')
-        collector_id = file_data.get('collector_id')
-        file_type = file_data.get('file_type')
-        start_time = file_data.get('start_time')
-        end_time = file_data.get('end_time')
-        
-        if not all([file_id, s3path, camera_id, collector_id, file_type, start_time]):
-            logger.error("file_dataに必要な情報が不足しています")
-            return None
-        
-        # Get collector name from collector_id for logging
-        from .database import get_collector_by_id
-        collector_obj = get_collector_by_id(collector_id)
-        collector = collector_obj.get('collector', 'unknown') if collector_obj else 'unknown'
-        
-        # カメラ情報を取得
-        camera_info = get_camera_info(camera_id)
-        
-        # 場所情報を取得
-        place_id = camera_info.get('place_id', 'unknown') if camera_info else 'unknown'
-        camera_name = camera_info.get('name', 'unknown') if camera_info else 'unknown'
-        
-        # 場所名を取得
-        place_name = 'unknown'
-        if place_id != 'unknown':
+    # file_dataから必要な情報を取得
+    file_id = file_data.get('file_id')
+    s3path = file_data.get('s3path')
+    camera_id = file_data.get('camera_id')
+    collector_id = file_data.get('collector_id')
+    file_type = file_data.get('file_type')
+    start_time = file_data.get('start_time')
+    end_time = file_data.get('end_time')
+    
+    if not all([file_id, s3path, camera_id, collector_id, file_type, start_time]):
+        logger.error("file_dataに必要な情報が不足しています")
+        return None
+    
+    # Get collector name from collector_id for logging
+    from .database import get_collector_by_id
+    collector_obj = get_collector_by_id(collector_id)
+    collector = collector_obj.get('collector', 'unknown') if collector_obj else 'unknown'
+    
+    # カメラ情報を取得
+    camera_info = get_camera_info(camera_id)
+    
+    # 場所情報を取得
+    place_id = camera_info.get('place_id', 'unknown') if camera_info else 'unknown'
+    camera_name = camera_info.get('name', 'unknown') if camera_info else 'unknown'
+    
+    # 場所名を取得
+    place_name = 'unknown'
+    if place_id != 'unknown':
+        try:
+            place_table = _get_shared_table(PLACE_TABLE)
+            place_response = place_table.get_item(Key={'place_id': place_id})
+            if 'Item' in place_response:
+                place_name = place_response['Item'].get('name', 'unknown')
+        except:
+            pass
+    
+    # end_timeがない場合はstart_timeと同じにする（画像ファイルの場合など）
+    if not end_time:
+        end_time = start_time
+    
+    # ✅ start_time/end_timeを確実にUTC文字列に統一
+    # file_dataから取得した時刻は、UTC（新データ）またはJST（旧データ）の可能性がある
+    # parse_any_strで柔軟にパースし、format_for_dbでUTCに統一
+    start_time_utc = format_for_db(parse_any_str(start_time))
+    end_time_utc = format_for_db(parse_any_str(end_time))
+    
+    # ログID生成
+    detect_log_id = f"log-{uuid.uuid4().hex[:8]}"
+    
+    # タグをセット形式に変換（空の場合は空のリストで保存）
+    if detect_tags:
+        # タグがある場合はセット形式で保存
+        detect_tag = set(detect_tags)
+    else:
+        # タグが空の場合は空のリストで保存
+        detect_tag = []
+    
+    # 結合キー
+    collector_id_file_type = f"{collector_id}|{file_type}"
+    collector_id_detector_id = f"{collector_id}|{detector_id}"  # GSI-5用
+    
+    # 通知フラグを文字列に変換
+    notify_flg = 'true' if detect_notify else 'false'
+    
+    # DynamoDBアイテム
+    item = {
+        'detect_log_id': detect_log_id,
+        'detector_id': detector_id,
+        'file_id': file_id,
+        's3path': s3path,
+        'collector': collector,  # ログ情報として残す
+        'collector_id': collector_id,  # 新設計: collector_idを追加
+        'start_time': start_time_utc,  # ✅ UTC文字列
+        'end_time': end_time_utc,  # ✅ UTC文字列
+        'detect_result': detect_result,
+        'detect_tag': detect_tag,
+        'detect_notify_flg': notify_flg,
+        'detect_notify_reason': detect_notify_reason,
+        'place_id': place_id,
+        'place_name': place_name,
+        'camera_id': camera_id,
+        'camera_name': camera_name,
+        'file_type': file_type,
+        'detector': detector,
+        'collector_id_file_type': collector_id_file_type,
+        'collector_id_detector_id': collector_id_detector_id,  # GSI-5用
+    }
+    
+    # オプショナルフィールドを追加
+    if track_log_id:
+        item['track_log_id'] = track_log_id
+    
+    if s3path_detect:
+        item['s3path_detect'] = s3path_detect
+    
+    return item
+
+def save_detect_log_tags(item: Dict[str, Any]) -> None:
+    """
+    検出ログのタグをタグテーブルに保存（既に存在するタグはスキップ）
+    
+    Args:
+        item: build_detect_log_item() で構築した検出ログ
+    """
+    logger = logging.getLogger(__name__)
+    detect_tags = item.get('detect_tag')
+    place_id = item.get('place_id')
+    camera_id = item.get('camera_id')
+    
+    # タグテーブルに一意のタグを保存（3パターン: TAG, PLACE|{place_id}, CAMERA|{camera_id}）
+    if detect_tags:
+        detect_tag_table = _get_shared_table(DETECT_LOG_TAG_TABLE)
+        for tag in detect_tags:
+            # (1) 全体タグ（data_type = "TAG"）
             try:
-                place_table = dynamodb.Table(PLACE_TABLE)
-                place_response = place_table.get_item(Key={'place_id': place_id})
-                if 'Item' in place_response:
-                    place_name = place_response['Item'].get('name', 'unknown')
-            except:
-                pass
-        
-        # end_timeがない場合はstart_timeと同じにする（画像ファイルの場合など）
-        if not end_time:
-            end_time = start_time
-        
-        # ✅ start_time/end_timeを確実にUTC文字列に統一
-        # file_dataから取得した時刻は、UTC（新データ）またはJST（旧データ）の可能性がある
-        # parse_any_strで柔軟にパースし、format_for_dbでUTCに統一
-        start_time_utc = format_for_db(parse_any_str(start_time))
-        end_time_utc = format_for_db(parse_any_str(end_time))
-        
-        # ログID生成
-        detect_log_id = f"log-{uuid.uuid4().hex[:8]}"
-        
-        # タグをセット形式に変換（空の場合は空のリストで保存）
-        if detect_tags:
-            # タグがある場合はセット形式で保存
-            detect_tag = set(detect_tags)
-        else:
-            # タグが空の場合は空のリストで保存
-            detect_tag = []
-        
-        # 結合キー
-        collector_id_file_type = f"{collector_id}|{file_type}"
-        collector_id_detector_id = f"{collector_id}|{detector_id}"  # GSI-5用
-        
-        # 通知フラグを文字列に変換
-        notify_flg = 'true' if detect_notify else 'false'
-        
-        # DynamoDBアイテム
-        item = {
-            'detect_log_id': detect_log_id,
-            'detector_id': detector_id,
-            'file_id': file_id,
-            's3path': s3path,
-            'collector': collector,  # ログ情報として残す
-            'collector_id': collector_id,  # 新設計: collector_idを追加
-            'start_time': start_time_utc,  # ✅ UTC文字列
-            'end_time': end_time_utc,  # ✅ UTC文字列
-            'detect_result': detect_result,
-            'detect_tag': detect_tag,
-            'detect_notify_flg': notify_flg,
-            'detect_notify_reason': detect_notify_reason,
-            'place_id': place_id,
-            'place_name': place_name,
-            'camera_id': camera_id,
-            'camera_name': camera_name,
-            'file_type': file_type,
-            'detector': detector,
-            'collector_id_file_type': collector_id_file_type,
-            'collector_id_detector_id': collector_id_detector_id,  # GSI-5用
-        }
-        
-        # オプショナルフィールドを追加
-        if track_log_id:
-            item['track_log_id'] = track_log_id
-        
-        if s3path_detect:
-            item['s3path_detect'] = s3path_detect
-        
-        # DynamoDBに保存
-        detect_log_table.put_item(Item=item)
-        logger.info(f"検出ログを保存しました: {detect_log_id}")
-        
-        # タグテーブルに一意のタグを保存（3パターン: TAG, PLACE|{place_id}, CAMERA|{camera_id}）
-        if detect_tags:
-            detect_tag_table = dynamodb.Table(DETECT_LOG_TAG_TABLE)
-            for tag in detect_tags:
-                # (1) 全体タグ（data_type = "TAG"）
+                detect_tag_table.put_item(
+                    Item={'data_type': 'TAG', 'detect_tag_name': tag},
+                    ConditionExpression='attribute_not_exists(data_type) AND attribute_not_exists(detect_tag_name)'
+                )
+                logger.info(f"新しいタグを保存しました (TAG): {tag}")
+            except ClientError as e:
+                if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                    logger.debug(f"タグは既に存在します (TAG): {tag}")
+                else:
+                    logger.warning(f"タグ保存エラー (TAG): {tag}, エラー: {e}")
+            except Exception as e:
+                logger.warning(f"タグ保存エラー (TAG): {tag}, エラー: {e}")
+            
+            # (2) 場所別タグ（data_type = "PLACE|{place_id}"）
+            if place_id and place_id != 'unknown':
                 try:
                     detect_tag_table.put_item(
-                        Item={'data_type': 'TAG', 'detect_tag_name': tag},
+                        Item={'data_type': f'PLACE|{place_id}', 'detect_tag_name': tag},
                         ConditionExpression='attribute_not_exists(data_type) AND attribute_not_exists(detect_tag_name)'
                     )
-                    logger.info(f"新しいタグを保存しました (TAG): {tag}")
+                    logger.info(f"新しいタグを保存しました (PLACE|{place_id}): {tag}")
                 except ClientError as e:
                     if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
-                        logger.debug(f"タグは既に存在します (TAG): {tag}")
+                        logger.debug(f"タグは既に存在します (PLACE|{place_id}): {tag}")
                     else:
-                        logger.warning(f"タグ保存エラー (TAG): {tag}, エラー: {e}")
-                except Exception as e:
-                    logger.warning(f"タグ保存エラー (TAG): {tag}, エラー: {e}")
-                
-                # (2) 場所別タグ（data_type = "PLACE|{place_id}"）
-                if place_id and place_id != 'unknown':
-                    try:
-                        detect_tag_table.put_item(
-                            Item={'data_type': f'PLACE|{place_id}', 'detect_tag_name': tag},
-                            ConditionExpression='attribute_not_exists(data_type) AND attribute_not_exists(detect_tag_name)'
-                        )
-                        logger.info(f"新しいタグを保存しました (PLACE|{place_id}): {tag}")
-                    except ClientError as e:
-                        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
-                            logger.debug(f"タグは既に存在します (PLACE|{place_id}): {tag}")
-                        else:
-                            logger.warning(f"タグ保存エラー (PLACE|{place_id}): {tag}, エラー: {e}")
-                    except Exception as e:
                         logger.warning(f"タグ保存エラー (PLACE|{place_id}): {tag}, エラー: {e}")
-                
-                # (3) カメラ別タグ（data_type = "CAMERA|{camera_id}"）
-                if camera_id:
-                    try:
-                        detect_tag_table.put_item(
-                            Item={'data_type': f'CAMERA|{camera_id}', 'detect_tag_name': tag},
-                            ConditionExpression='attribute_not_exists(data_type) AND attribute_not_exists(detect_tag_name)'
-                        )
-                        logger.info(f"新しいタグを保存しました (CAMERA|{camera_id}): {tag}")
-                    except ClientError as e:
-                        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
-                            logger.debug(f"タグは既に存在します (CAMERA|{camera_id}): {tag}")
-                        else:
-                            logger.warning(f"タグ保存エラー (CAMERA|{camera_id}): {tag}, エラー: {e}")
-                    except Exception as e:
+                except Exception as e:
+                    logger.warning(f"タグ保存エラー (PLACE|{place_id}): {tag}, エラー: {e}")
+            
+            # (3) カメラ別タグ（data_type = "CAMERA|{camera_id}"）
+            if camera_id:
+                try:
+                    detect_tag_table.put_item(
+                        Item={'data_type': f'CAMERA|{camera_id}', 'detect_tag_name': tag},
+                        ConditionExpression='attribute_not_exists(data_type) AND attribute_not_exists(detect_tag_name)'
+                    )
+                    logger.info(f"新しいタグを保存しました (CAMERA|{camera_id}): {tag}")
+                except ClientError as e:
+                    if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                        logger.debug(f"タグは既に存在します (CAMERA|{camera_id}): {tag}")
+                    else:
                         logger.warning(f"タグ保存エラー (CAMERA|{camera_id}): {tag}, エラー: {e}")
+                except Exception as e:
+                    logger.warning(f"タグ保存エラー (CAMERA|{camera_id}): {tag}, エラー: {e}")
+
+def save_detect_log(
+    detector_id: str,
+    detect_result: str,
+    detect_notify: bool,
+    detect_notify_reason: str,
+    detect_tags: List[str],
+    file_data: Dict[str, Any],
+    detector: str,
+    track_log_id: Optional[str] = None,
+    s3path_detect: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    検出結果をDynamoDBに保存
+    
+    Args:
+        detector_id: 検出器ID
+        detect_result: 検出結果の詳細
+        detect_notify: 通知フラグ
+        detect_notify_reason: 通知理由
+        detect_tags: 検出タグのリスト
+        file_data: FILE_TABLE テーブルのファイルデータ
+        detector: 検出器名 ('bedrock', 'yolo', 'nova' など)
+        track_log_id: トラックログID（hlsYoloから呼ばれた場合）
+        s3path_detect: 検出結果画像のS3パス（オプション）
+        
+    Returns:
+        成功時は保存したデータ、失敗時はNone
+    """
+    logger = logging.getLogger(__name__)
+    
+    try:
+        item = build_detect_log_item(
+            detector_id, detect_result, detect_notify, detect_notify_reason,
+            detect_tags, file_data, detector, track_log_id, s3path_detect
+        )
+        if not item:
+            return None
+        
+        # DynamoDBに保存
+        _get_shared_table(DETECT_LOG_TABLE).put_item(Item=item)
+        logger.info(f"検出ログを保存しました: {item['detect_log_id']}")
+        
+        # タグテーブルに一意のタグを保存（3パターン: TAG, PLACE|{place_id}, CAMERA|{camera_id}）
+        save_detect_log_tags(item)
         
         return item
         
@@ -932,9 +1313,7 @@ def save_tag_timeseries(detect_log_data: Dict[str, Any]) -> bool:
         import boto3
         from botocore.exceptions import ClientError
         
-        session = create_boto3_session()
-        dynamodb = session.resource('dynamodb')
-        timeseries_table = dynamodb.Table(DETECT_TAG_TIMESERIES_TABLE)
+        timeseries_table = _get_shared_table(DETECT_TAG_TIMESERIES_TABLE)
         
         # detect_log_dataから必要な情報を取得
         start_time_str = detect_log_data.get('start_time')
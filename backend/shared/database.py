@@ -12,8 +12,8 @@ from .timezone_utils import (
 )
 
 # Initialize DynamoDB client
-session = create_boto3_session()
-dynamodb = session.resource('dynamodb')
+# keep-alive・コネクションプール設定済みの共有リソースを使い、リクエストごとのTLSハンドシェイクを避ける
+dynamodb = get_dynamodb_resource()
 
 # テーブル名はcommon.pyから取得
 
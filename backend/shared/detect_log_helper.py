@@ -20,7 +20,12 @@ from decimal import Decimal
 from .common import (
     create_boto3_session,
     DETECTOR_TABLE,
+    DETECT_LOG_TABLE,
+    build_detect_log_item,
+    flush_pending_writes,
+    get_dynamodb_resource,
     save_detect_log,
+    save_detect_log_tags,
     save_tag_timeseries,
     setup_logger
 )
@@ -258,7 +263,7 @@ def save_area_detect_log(
         return None
 
 
-def save_class_detect_log(
+def build_class_detect_log_item(
     detector_id: str,
     file_data: Dict[str, Any],
     detections: Dict[str, Any],
@@ -266,7 +271,10 @@ def save_class_detect_log(
     s3path_detect: Optional[str] = None
 ) -> Optional[Dict[str, Any]]:
     """
-    ClassDetectEvent の情報を detect-log に保存
+    ClassDetectEvent の情報から detect-log の項目を構築（書き込みは行わない）
+    
+    複数画像の detect-log をまとめて書き込む場合に使用し、書き込み後に
+    save_detect_log_index() でタグ・時系列データを保存する。
     
     Args:
         detector_id: 検出器ID (仮想 Detector の ID)
@@ -276,7 +284,7 @@ def save_class_detect_log(
         s3path_detect: 検出結果画像のS3パス
         
     Returns:
-        保存したデータ、エラー時は None
+        detect-log の項目、エラー時は None
     """
     try:
         # 検出情報を取得
@@ -302,8 +310,8 @@ def save_class_detect_log(
         
         logger.info(f"ClassDetectEvent保存: {detect_notify_reason}")
         
-        # detect-log に保存（検出されたクラス名をタグとして設定）
-        detect_log_data = save_detect_log(
+        # 検出されたクラス名をタグとして設定
+        return build_detect_log_item(
             detector_id=detector_id,
             detect_result=detect_result,
             detect_notify=True,
@@ -315,13 +323,64 @@ def save_class_detect_log(
             s3path_detect=s3path_detect
         )
         
+    except Exception as e:
+        logger.error(f"ClassDetect ログ構築エラー: {e}")
+        import traceback
+        logger.error(f"スタックトレース: {traceback.format_exc()}")
+        return None
+
+
+def save_detect_log_index(detect_log_data: Dict[str, Any]) -> None:
+    """
+    書き込み済みの detect-log のタグ・時系列データを保存
+    
+    Args:
+        detect_log_data: build_class_detect_log_item() で構築し、書き込んだ detect-log
+    """
+    # タグテーブルに一意のタグを保存（条件付き書き込みのため1件ずつ）
+    save_detect_log_tags(detect_log_data)
+    
+    # 時系列データを保存（カウンタの加算のため1件ずつ）
+    if not save_tag_timeseries(detect_log_data):
+        logger.warning("時系列データの保存に失敗（警告レベル）")
+
+
+def save_class_detect_log(
+    detector_id: str,
+    file_data: Dict[str, Any],
+    detections: Dict[str, Any],
+    track_log_id: Optional[str] = None,
+    s3path_detect: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    ClassDetectEvent の情報を detect-log に保存
+    
+    Args:
+        detector_id: 検出器ID (仮想 Detector の ID)
+        file_data: ファイルデータ
+        detections: 検出情報 (classes, tracks, total_count, filtered_count)
+        track_log_id: トラックログID
+        s3path_detect: 検出結果画像のS3パス
+        
+    Returns:
+        保存したデータ、エラー時は None
+    """
+    try:
+        detect_log_data = build_class_detect_log_item(
+            detector_id, file_data, detections, track_log_id, s3path_detect
+        )
+        
         if not detect_log_data:
+            return None
+        
+        # detect-log に保存
+        if not flush_pending_writes(get_dynamodb_resource(), [(DETECT_LOG_TABLE, detect_log_data)]):
             logger.error("detect-log への保存に失敗")
             return None
+        logger.info(f"検出ログを保存しました: {detect_log_data['detect_log_id']}")
         
-        # 時系列データを保存
-        if not save_tag_timeseries(detect_log_data):
-            logger.warning("時系列データの保存に失敗（警告レベル）")
+        # タグ・時系列データを保存
+        save_detect_log_index(detect_log_data)
         
         return detect_log_data
         
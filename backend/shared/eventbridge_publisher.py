@@ -12,19 +12,79 @@ EventBridge イベント発行モジュール
 import boto3
 import json
 import logging
+import time
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from decimal import Decimal
 from .timezone_utils import format_for_db
 
 logger = logging.getLogger(__name__)
 
+# orjson（イベントペイロードの高速シリアライズ用、オプション）
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # イベント名定数
 EVENT_TYPE_CLASS_DETECT = 'ClassDetectEvent'
 EVENT_TYPE_AREA_DETECT = 'AreaDetectEvent'
 EVENT_TYPE_SAVE_IMAGE = 'SaveImageEvent'
 EVENT_TYPE_SAVE_VIDEO = 'SaveVideoEvent'
 
+# PutEvents 1回あたりの最大エントリ数
+PUT_EVENTS_MAX_ENTRIES = 10
+# PutEvents 1回あたりのエントリ合計サイズの上限（256KB）
+PUT_EVENTS_MAX_REQUEST_SIZE = 256 * 1024
+# publish_batch で失敗したエントリを再送する最大回数
+PUT_EVENTS_MAX_RETRIES = 3
+
+
+def put_events_entry_size(entry: Dict[str, Any]) -> int:
+    """
+    PutEventsのエントリサイズを計算（AWSのサイズ計算方法に準拠: Source・DetailType・DetailのUTF-8バイト数）
+    
+    Args:
+        entry: PutEventsのエントリ
+        
+    Returns:
+        int: エントリサイズ（バイト）
+    """
+    size = 14 if entry.get('Time') else 0
+    for key in ('Source', 'DetailType', 'Detail'):
+        size += len(entry.get(key, '').encode('utf-8'))
+    for resource in entry.get('Resources', []):
+        size += len(resource.encode('utf-8'))
+    return size
+
+
+def chunk_put_events_entries(entries: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """
+    エントリをPutEvents 1回分ずつに分割（件数10件以内かつ合計サイズ256KB以内）
+    
+    Args:
+        entries: PutEventsのエントリのリスト
+        
+    Returns:
+        list: エントリのリストのリスト（元の順序を保つ）
+    """
+    chunks = []
+    chunk = []
+    chunk_size = 0
+    for entry in entries:
+        entry_size = put_events_entry_size(entry)
+        if chunk and (len(chunk) >= PUT_EVENTS_MAX_ENTRIES
+                      or chunk_size + entry_size > PUT_EVENTS_MAX_REQUEST_SIZE):
+            chunks.append(chunk)
+            chunk = []
+            chunk_size = 0
+        chunk.append(entry)
+        chunk_size += entry_size
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
 
 def decimal_to_float(obj):
     """Decimal型をfloatに変換するヘルパー"""
@@ -33,6 +93,27 @@ def decimal_to_float(obj):
     raise TypeError
 
 
+def serialize_detail(detail: Dict[str, Any]) -> str:
+    """
+    イベント詳細をJSON文字列に変換
+    
+    orjsonが利用可能な場合はorjsonで高速にシリアライズする（NumPy型にも対応）。
+    
+    Args:
+        detail: イベントの詳細
+        
+    Returns:
+        str: JSON文字列
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            detail,
+            default=decimal_to_float,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        ).decode('utf-8')
+    return json.dumps(detail, default=decimal_to_float)
+
+
 class EventBridgePublisher:
     """EventBridgeイベント発行クラス"""
     
@@ -82,6 +163,44 @@ class EventBridgePublisher:
         Returns:
             bool: 発行成功したらTrue
         """
+        return self._publish_event(*self.build_class_detect_event(
+            camera_id, collector_id, file_id, s3path, s3path_detect, track_log_id,
+            detections, filtered_detections, image_width, image_height, timestamp
+        ))
+    
+    def build_class_detect_event(
+        self, 
+        camera_id: str,
+        collector_id: str,
+        file_id: str,
+        s3path: str,
+        s3path_detect: str,
+        track_log_id: str,
+        detections: List[Dict],
+        filtered_detections: List[Dict],
+        image_width: int,
+        image_height: int,
+        timestamp: datetime
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Class Detectイベントを構築（発行は publish_batch でまとめて行う）
+        
+        Args:
+            camera_id: カメラID
+            collector_id: コレクターID（EventBridge Rule のフィルタキー）
+            file_id: ファイルID
+            s3path: S3パス（元画像）
+            s3path_detect: S3パス（アノテーション画像）
+            track_log_id: トラックログID
+            detections: 全検出結果
+            filtered_detections: フィルタ後の検出結果
+            image_width: 画像幅
+            image_height: 画像高さ
+            timestamp: タイムスタンプ
+            
+        Returns:
+            tuple: (detail_type, detail)
+        """
         detail = {
             'eventType': 'class_detect',
             'camera_id': camera_id,
@@ -105,7 +224,7 @@ class EventBridgePublisher:
             }
         }
         
-        return self._publish_event(EVENT_TYPE_CLASS_DETECT, detail)
+        return EVENT_TYPE_CLASS_DETECT, detail
     
     def publish_area_detect_event(
         self,
@@ -241,6 +360,31 @@ class EventBridgePublisher:
         Returns:
             bool: 発行成功したらTrue
         """
+        return self._publish_event(*self.build_save_image_event(
+            camera_id, collector_id, file_id, s3path, timestamp
+        ))
+    
+    def build_save_image_event(
+        self,
+        camera_id: str,
+        collector_id: str,
+        file_id: str,
+        s3path: str,
+        timestamp: datetime
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Save Imageイベントを構築（発行は publish_batch でまとめて行う）
+        
+        Args:
+            camera_id: カメラID
+            collector_id: コレクターID（EventBridge Rule のフィルタキー）
+            file_id: ファイルID
+            s3path: S3パス（元画像のみ）
+            timestamp: タイムスタンプ
+            
+        Returns:
+            tuple: (detail_type, detail)
+        """
         detail = {
             'eventType': 'save_image',
             'camera_id': camera_id,
@@ -254,7 +398,7 @@ class EventBridgePublisher:
             }
         }
         
-        return self._publish_event(EVENT_TYPE_SAVE_IMAGE, detail)
+        return EVENT_TYPE_SAVE_IMAGE, detail
     
     def publish_save_video_event(
         self,
@@ -281,6 +425,33 @@ class EventBridgePublisher:
         Returns:
             bool: 発行成功したらTrue
         """
+        return self._publish_event(*self.build_save_video_event(
+            camera_id, collector_id, file_id, s3path, timestamp, video_duration
+        ))
+    
+    def build_save_video_event(
+        self,
+        camera_id: str,
+        collector_id: str,
+        file_id: str,
+        s3path: str,
+        timestamp: datetime,
+        video_duration: Optional[float] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Save Videoイベントを構築（発行は publish_batch でまとめて行う）
+        
+        Args:
+            camera_id: カメラID
+            collector_id: コレクターID（EventBridge Rule のフィルタキー）
+            file_id: ファイルID
+            s3path: S3パス（動画ファイル）
+            timestamp: タイムスタンプ
+            video_duration: 動画の長さ（秒、オプション）
+            
+        Returns:
+            tuple: (detail_type, detail)
+        """
         video_info = {'format': 'mp4'}
         if video_duration is not None:
             video_info['duration'] = video_duration
@@ -296,7 +467,84 @@ class EventBridgePublisher:
             'video_info': video_info
         }
         
-        return self._publish_event(EVENT_TYPE_SAVE_VIDEO, detail)
+        return EVENT_TYPE_SAVE_VIDEO, detail
+    
+    def publish_batch(self, events: List[Tuple[str, Dict[str, Any]]]) -> bool:
+        """
+        複数のイベントをまとめて発行（PutEvents 1回につき最大10件・合計256KBまで）
+        
+        失敗したエントリのみ指数バックオフで再送する。リクエスト全体が拒否された場合
+        （サイズ超過等のValidationException）は、同じリクエストを再送せず1件ずつ発行する。
+        
+        Args:
+            events: (detail_type, detail) のリスト（build_save_*_event の戻り値）
+            
+        Returns:
+            bool: 全件発行成功したらTrue
+        """
+        entries = [
+            {
+                'Source': self.source,
+                'DetailType': detail_type,
+                'Detail': serialize_detail(detail),
+                'EventBusName': self.event_bus_name
+            }
+            for detail_type, detail in events
+        ]
+        
+        all_published = True
+        for chunk in chunk_put_events_entries(entries):
+            if self._put_entries(chunk):
+                logger.info(f"EventBridge一括発行成功: {len(chunk)}件")
+            else:
+                all_published = False
+        
+        return all_published
+    
+    def _put_entries(self, entries: List[Dict[str, Any]]) -> bool:
+        """
+        PutEvents 1回分のエントリを発行（失敗したエントリのみ再送）
+        
+        Args:
+            entries: PutEventsのエントリのリスト
+            
+        Returns:
+            bool: 全件発行成功したらTrue
+        """
+        pending = entries
+        for attempt in range(PUT_EVENTS_MAX_RETRIES + 1):
+            try:
+                response = self.events_client.put_events(Entries=pending)
+            except Exception as e:
+                error_code = getattr(e, 'response', {}).get('Error', {}).get('Code')
+                if error_code == 'ValidationException':
+                    # 同じリクエストは再送しても拒否されるため、複数件なら1件ずつ発行する
+                    if len(pending) > 1:
+                        logger.warning(f"EventBridge一括発行が拒否されたため1件ずつ発行します ({len(pending)}件): {e}")
+                        results = [self._put_entries([entry]) for entry in pending]
+                        return all(results)
+                    logger.error(f"EventBridge発行が拒否されました: {e}")
+                    return False
+                logger.error(f"EventBridge一括発行エラー ({len(pending)}件): {e}", exc_info=True)
+                response = None
+            
+            if response is not None:
+                if response['FailedEntryCount'] == 0:
+                    return True
+                # レスポンスのEntriesはリクエストと同じ順序で、失敗したものにErrorCodeが付く
+                pending = [
+                    entry for entry, result in zip(pending, response['Entries'])
+                    if result.get('ErrorCode')
+                ]
+                if not pending:
+                    return True
+                logger.warning(f"EventBridge一括発行で{len(pending)}件が失敗しました: {response['Entries']}")
+            
+            if attempt < PUT_EVENTS_MAX_RETRIES:
+                time.sleep(2 ** attempt * 0.1)  # nosemgrep: arbitrary-sleep - 意図的な待機（再送間隔）
+        
+        logger.error(f"EventBridge一括発行: {len(pending)}件を発行できませんでした")
+        return False
     
     def _publish_event(self, detail_type: str, detail: Dict[str, Any]) -> bool:
         """
@@ -315,7 +563,7 @@ class EventBridgePublisher:
                     {
                         'Source': self.source,
                         'DetailType': detail_type,
-                        'Detail': json.dumps(detail, default=decimal_to_float),
+                        'Detail': serialize_detail(detail),
                         'EventBusName': self.event_bus_name
                     }
                 ]
@@ -0,0 +1,139 @@
+"""
+common.py のDynamoDB一括書き込み・S3イベント解析のテストコード
+"""
+import pytest
+import json
+import sys
+import os
+from unittest import mock
+
+# パスを追加してsharedモジュールをインポート可能にする
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+# common.py はAWS_REGION未設定時に終了するため、テスト用のリージョンを設定
+os.environ.setdefault('AWS_REGION', 'us-east-1')
+
+pytest.importorskip('boto3')
+
+from shared import common
+from shared.common import (
+    flush_pending_writes,
+    parse_s3_event_record,
+    BATCH_WRITE_MAX_ITEMS,
+    BATCH_WRITE_MAX_RETRIES,
+)
+
+
+def make_dynamodb(responses):
+    """batch_write_item が responses を順に返すDynamoDBリソースのモック"""
+    dynamodb = mock.Mock()
+    dynamodb.meta.client.batch_write_item.side_effect = responses
+    return dynamodb
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    """再送間隔の待機をスキップ"""
+    monkeypatch.setattr(common.time, 'sleep', lambda seconds: None)
+
+
+class TestFlushPendingWrites:
+    """flush_pending_writes のテスト"""
+
+    def test_empty(self):
+        """書き込む項目がない場合はリクエストを送らずTrueを返すこと"""
+        dynamodb = make_dynamodb([])
+        assert flush_pending_writes(dynamodb, []) is True
+        dynamodb.meta.client.batch_write_item.assert_not_called()
+
+    def test_serialize_and_group_by_table(self):
+        """項目をDynamoDB形式に変換し、テーブルごとにまとめること"""
+        dynamodb = make_dynamodb([{'UnprocessedItems': {}}])
+        pending = [
+            ('cedix-file', {'file_id': 'f1', 'size': 3}),
+            ('cedix-detect-log', {'detect_log_id': 'd1'}),
+            ('cedix-file', {'file_id': 'f2', 'size': 4}),
+        ]
+        assert flush_pending_writes(dynamodb, pending) is True
+
+        request_items = dynamodb.meta.client.batch_write_item.call_args.kwargs['RequestItems']
+        assert [request['PutRequest']['Item'] for request in request_items['cedix-file']] == [
+            {'file_id': {'S': 'f1'}, 'size': {'N': '3'}},
+            {'file_id': {'S': 'f2'}, 'size': {'N': '4'}},
+        ]
+        assert len(request_items['cedix-detect-log']) == 1
+
+    def test_split_into_chunks(self):
+        """BATCH_WRITE_MAX_ITEMS件ごとにリクエストを分けること"""
+        dynamodb = make_dynamodb([{'UnprocessedItems': {}}] * 3)
+        pending = [('cedix-file', {'file_id': str(i)}) for i in range(BATCH_WRITE_MAX_ITEMS * 2 + 1)]
+        assert flush_pending_writes(dynamodb, pending) is True
+
+        calls = dynamodb.meta.client.batch_write_item.call_args_list
+        assert [len(call.kwargs['RequestItems']['cedix-file']) for call in calls] == [
+            BATCH_WRITE_MAX_ITEMS, BATCH_WRITE_MAX_ITEMS, 1
+        ]
+
+    def test_retry_unprocessed_items(self):
+        """UnprocessedItemsのみ再送すること"""
+        unprocessed = {'cedix-file': [{'PutRequest': {'Item': {'file_id': {'S': 'f2'}}}}]}
+        dynamodb = make_dynamodb([{'UnprocessedItems': unprocessed}, {'UnprocessedItems': {}}])
+        pending = [('cedix-file', {'file_id': 'f1'}), ('cedix-file', {'file_id': 'f2'})]
+        assert flush_pending_writes(dynamodb, pending) is True
+
+        calls = dynamodb.meta.client.batch_write_item.call_args_list
+        assert len(calls) == 2
+        assert calls[1].kwargs['RequestItems'] == unprocessed
+
+    def test_retry_exhausted(self):
+        """再送回数を使い切っても未処理の項目が残る場合はFalseを返すこと"""
+        unprocessed = {'cedix-file': [{'PutRequest': {'Item': {'file_id': {'S': 'f1'}}}}]}
+        dynamodb = make_dynamodb([{'UnprocessedItems': unprocessed}] * (BATCH_WRITE_MAX_RETRIES + 1))
+        assert flush_pending_writes(dynamodb, [('cedix-file', {'file_id': 'f1'})]) is False
+        assert dynamodb.meta.client.batch_write_item.call_count == BATCH_WRITE_MAX_RETRIES + 1
+
+    def test_error_continues_with_next_chunk(self):
+        """リクエストがエラーになっても残りのチャンクは書き込み、Falseを返すこと"""
+        dynamodb = make_dynamodb([Exception('throttled'), {'UnprocessedItems': {}}])
+        pending = [('cedix-file', {'file_id': str(i)}) for i in range(BATCH_WRITE_MAX_ITEMS + 1)]
+        assert flush_pending_writes(dynamodb, pending) is False
+        assert dynamodb.meta.client.batch_write_item.call_count == 2
+
+
+def s3_record(bucket, key, event_time='2024-01-01T00:00:00.000Z'):
+    return {'eventTime': event_time, 's3': {'bucket': {'name': bucket}, 'object': {'key': key}}}
+
+
+class TestParseS3EventRecord:
+    """parse_s3_event_record のテスト"""
+
+    def test_direct_s3_record(self):
+        """直接のS3イベントからURLデコードしたキーを取得すること"""
+        record = s3_record('src', 'cam/a+b%2B1.jpg')
+        assert parse_s3_event_record(record) == [('src', 'cam/a b+1.jpg', '2024-01-01T00:00:00.000Z')]
+
+    def test_sqs_eventbridge_body(self):
+        """SQS経由のEventBridge S3イベント（detail形式）を解析すること"""
+        body = {'time': '2024-01-01T00:00:00Z', 'detail': {'bucket': {'name': 'src'}, 'object': {'key': 'cam/a.jpg'}}}
+        record = {'messageId': 'm1', 'body': json.dumps(body)}
+        assert parse_s3_event_record(record) == [('src', 'cam/a.jpg', '2024-01-01T00:00:00Z')]
+
+    def test_sqs_native_s3_body(self):
+        """S3からSQSへの通知（Records形式）の全レコードを展開すること"""
+        body = {'Records': [s3_record('src', 'cam/a.jpg'), s3_record('src', 'cam/b.jpg')]}
+        record = {'messageId': 'm1', 'body': json.dumps(body)}
+        assert [key for _, key, _ in parse_s3_event_record(record)] == ['cam/a.jpg', 'cam/b.jpg']
+
+    def test_s3_test_event(self):
+        """s3:TestEvent は対象なし（空リスト）として扱うこと"""
+        record = {'messageId': 'm1', 'body': json.dumps({'Service': 'Amazon S3', 'Event': 's3:TestEvent'})}
+        assert parse_s3_event_record(record) == []
+
+    @pytest.mark.parametrize('record', [
+        {'messageId': 'm1', 'body': 'not json'},
+        {'messageId': 'm1', 'body': json.dumps(['list'])},
+        {'messageId': 'm1', 'body': json.dumps({'Records': [{'eventSource': 'aws:sqs'}]})},
+        {'eventSource': 'aws:sns'},
+    ])
+    def test_unparseable(self, record):
+        """解釈できないレコードはNoneを返すこと"""
+        assert parse_s3_event_record(record) is None
@@ -0,0 +1,49 @@
+"""
+detect_log.py の通知履歴ページングカーソルのテストコード
+"""
+import pytest
+import base64
+import json
+import sys
+import os
+
+# パスを追加してshared・detectorモジュールをインポート可能にする
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+os.environ.setdefault('AWS_REGION', 'us-east-1')
+
+pytest.importorskip('fastapi')
+pytest.importorskip('jose')
+
+from fastapi import HTTPException
+
+from detector.api.routers.detect_log import _encode_cursor, _decode_cursor
+
+
+class TestCursor:
+    """_encode_cursor / _decode_cursor のテスト"""
+
+    def test_round_trip(self):
+        """エンコードしたカーソルを元のLastEvaluatedKeyに戻せること"""
+        key = {'detect_log_id': 'log-1', 'detect_notify_flg': 'true', 'start_time': '2024-01-01T00:00:00'}
+        cursor = _encode_cursor(key)
+        assert _decode_cursor(cursor) == key
+
+    def test_url_safe(self):
+        """カーソルはURLにそのまま載せられる文字のみで構成されること"""
+        cursor = _encode_cursor({'detect_log_id': '?' * 30 + '>' * 30})
+        assert '+' not in cursor and '/' not in cursor
+
+    @pytest.mark.parametrize('cursor', [
+        'not-base64!',
+        'abc',
+        base64.urlsafe_b64encode(b'not json').decode('ascii'),
+        base64.urlsafe_b64encode(b'\xff\xfe').decode('ascii'),
+        base64.urlsafe_b64encode(json.dumps(['list']).encode()).decode('ascii'),
+        base64.urlsafe_b64encode(json.dumps('string').encode()).decode('ascii'),
+        'カーソル',
+    ])
+    def test_invalid_cursor(self, cursor):
+        """不正なカーソルは400エラーになること"""
+        with pytest.raises(HTTPException) as exc_info:
+            _decode_cursor(cursor)
+        assert exc_info.value.status_code == 400
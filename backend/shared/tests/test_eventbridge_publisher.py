@@ -0,0 +1,138 @@
+"""
+eventbridge_publisher.py の一括発行（publish_batch）のテストコード
+"""
+import pytest
+import sys
+import os
+
+# パスを追加してsharedモジュールをインポート可能にする
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from botocore.exceptions import ClientError
+
+from shared import eventbridge_publisher
+from shared.eventbridge_publisher import (
+    EventBridgePublisher,
+    chunk_put_events_entries,
+    put_events_entry_size,
+    PUT_EVENTS_MAX_ENTRIES,
+    PUT_EVENTS_MAX_REQUEST_SIZE,
+)
+
+
+class FakeEventsClient:
+    """put_events の呼び出しを記録するEventBridgeクライアント"""
+
+    def __init__(self, handler=None):
+        self.calls = []
+        self.handler = handler
+
+    def put_events(self, Entries):
+        self.calls.append(list(Entries))
+        if self.handler:
+            return self.handler(Entries, len(self.calls))
+        return {'FailedEntryCount': 0, 'Entries': [{'EventId': 'id'} for _ in Entries]}
+
+
+def make_publisher(client):
+    """AWSに接続せずにEventBridgePublisherを作成"""
+    publisher = EventBridgePublisher.__new__(EventBridgePublisher)
+    publisher.events_client = client
+    publisher.source = 'cedix.test'
+    publisher.event_bus_name = 'default'
+    return publisher
+
+
+def make_entry(detail_size):
+    return {'Source': 'cedix.test', 'DetailType': 'ClassDetectEvent', 'Detail': 'x' * detail_size}
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    """再送間隔の待機をスキップ"""
+    monkeypatch.setattr(eventbridge_publisher.time, 'sleep', lambda seconds: None)
+
+
+class TestChunkEntries:
+    """PutEvents 1回分への分割のテスト"""
+
+    def test_entry_size(self):
+        """Source・DetailType・DetailのUTF-8バイト数を合計すること"""
+        entry = {'Source': 'ab', 'DetailType': 'cd', 'Detail': 'あ', 'EventBusName': 'ignored'}
+        assert put_events_entry_size(entry) == 2 + 2 + 3
+
+    def test_split_by_count(self):
+        """小さなエントリは10件ごとに分割されること"""
+        chunks = chunk_put_events_entries([make_entry(10)] * 25)
+        assert [len(chunk) for chunk in chunks] == [PUT_EVENTS_MAX_ENTRIES, PUT_EVENTS_MAX_ENTRIES, 5]
+
+    def test_split_by_size(self):
+        """合計サイズが256KBを超えないように分割されること"""
+        chunks = chunk_put_events_entries([make_entry(60000)] * 10)
+        assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+        for chunk in chunks:
+            assert sum(put_events_entry_size(entry) for entry in chunk) <= PUT_EVENTS_MAX_REQUEST_SIZE
+
+    def test_oversized_entry_alone(self):
+        """単独で上限を超えるエントリも1件のリクエストとして残ること"""
+        chunks = chunk_put_events_entries([make_entry(10), make_entry(PUT_EVENTS_MAX_REQUEST_SIZE), make_entry(10)])
+        assert [len(chunk) for chunk in chunks] == [1, 1, 1]
+
+
+class TestPublishBatch:
+    """publish_batch のテスト"""
+
+    def test_publish_all(self):
+        """全件成功した場合Trueを返すこと"""
+        client = FakeEventsClient()
+        publisher = make_publisher(client)
+        assert publisher.publish_batch([('SaveImageEvent', {'n': i}) for i in range(12)]) is True
+        assert [len(call) for call in client.calls] == [10, 2]
+
+    def test_retry_failed_entries_only(self):
+        """失敗したエントリのみ再送すること"""
+        def handler(entries, call_count):
+            if call_count == 1:
+                return {
+                    'FailedEntryCount': 1,
+                    'Entries': [{'EventId': 'id'}, {'ErrorCode': 'InternalFailure'}]
+                }
+            return {'FailedEntryCount': 0, 'Entries': [{'EventId': 'id'} for _ in entries]}
+
+        client = FakeEventsClient(handler)
+        publisher = make_publisher(client)
+        assert publisher.publish_batch([('SaveImageEvent', {'n': 0}), ('SaveImageEvent', {'n': 1})]) is True
+        assert len(client.calls) == 2
+        assert client.calls[1] == [client.calls[0][1]]
+
+    def test_retry_exhausted(self):
+        """再送回数を使い切った場合Falseを返すこと"""
+        def handler(entries, call_count):
+            return {'FailedEntryCount': len(entries), 'Entries': [{'ErrorCode': 'ThrottlingException'} for _ in entries]}
+
+        client = FakeEventsClient(handler)
+        publisher = make_publisher(client)
+        assert publisher.publish_batch([('SaveImageEvent', {'n': 0})]) is False
+        assert len(client.calls) == eventbridge_publisher.PUT_EVENTS_MAX_RETRIES + 1
+
+    def test_rejected_request_falls_back_to_single_entries(self):
+        """リクエスト全体が拒否された場合、同じリクエストを再送せず1件ずつ発行すること"""
+        def handler(entries, call_count):
+            if len(entries) > 1:
+                raise ClientError({'Error': {'Code': 'ValidationException', 'Message': 'too large'}}, 'PutEvents')
+            return {'FailedEntryCount': 0, 'Entries': [{'EventId': 'id'}]}
+
+        client = FakeEventsClient(handler)
+        publisher = make_publisher(client)
+        assert publisher.publish_batch([('ClassDetectEvent', {'n': i}) for i in range(3)]) is True
+        assert [len(call) for call in client.calls] == [3, 1, 1, 1]
+
+    def test_rejected_single_entry_not_resent(self):
+        """1件のリクエストが拒否された場合は再送しないこと"""
+        def handler(entries, call_count):
+            raise ClientError({'Error': {'Code': 'ValidationException', 'Message': 'too large'}}, 'PutEvents')
+
+        client = FakeEventsClient(handler)
+        publisher = make_publisher(client)
+        assert publisher.publish_batch([('ClassDetectEvent', {'n': 0})]) is False
+        assert len(client.calls) == 1
@@ -0,0 +1,131 @@
+"""
+hlsrec.py の DropOldestExecutor のテストコード
+"""
+import pytest
+import atexit
+import sys
+import os
+import threading
+
+# パスを追加してshared・hlsrecモジュールをインポート可能にする
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../collector/docker/hlsrec')))
+# hlsrec.py は必須の環境変数が未設定の場合に終了するため、テスト用の値を設定
+os.environ.setdefault('AWS_REGION', 'us-east-1')
+os.environ.setdefault('COLLECTOR_ID', 'test-collector')
+
+pytest.importorskip('av')
+
+import hlsrec
+from hlsrec import DropOldestExecutor
+
+# モジュールのワーカープールはテストでは使わないため、終了時（pytestの出力を閉じた後）のシャットダウンログを出さない
+atexit.unregister(hlsrec.cleanup_executors)
+
+
+class BlockingTask:
+    """イベントがセットされるまでワーカーを止めておくタスク"""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.started.set()
+        self.release.wait(5)
+
+
+class TestDropOldestExecutor:
+    """DropOldestExecutor のテスト"""
+
+    def test_run_tasks(self):
+        """投入したタスクを引数付きで実行すること"""
+        executor = DropOldestExecutor(max_workers=2, maxsize=4, thread_name_prefix='test')
+        results = []
+        lock = threading.Lock()
+
+        def task(value, scale=1):
+            with lock:
+                results.append(value * scale)
+
+        for i in range(4):
+            executor.submit(task, i, scale=10)
+        executor.shutdown(wait=True)
+        assert sorted(results) == [0, 10, 20, 30]
+
+    def test_drop_oldest_when_full(self):
+        """キューが満杯の場合は最も古いタスクを破棄し、on_dropに破棄タスクの引数を渡すこと"""
+        dropped = []
+        executed = []
+        executor = DropOldestExecutor(
+            max_workers=1, maxsize=2, thread_name_prefix='test',
+            on_drop=lambda *args, **kwargs: dropped.append((args, kwargs))
+        )
+        blocker = BlockingTask()
+        executor.submit(blocker)
+        assert blocker.started.wait(5)
+
+        # ワーカーが止まっている間に maxsize + 1 件投入する
+        for i in range(3):
+            executor.submit(executed.append, i)
+        assert executor.dropped_count == 1
+        assert dropped == [((0,), {})]
+
+        blocker.release.set()
+        executor.shutdown(wait=True)
+        assert executed == [1, 2]
+
+    def test_on_drop_error_does_not_block_submit(self):
+        """on_dropが例外を送出しても新しいタスクは投入されること"""
+        def failing_on_drop(*args, **kwargs):
+            raise RuntimeError('cleanup failed')
+
+        executed = []
+        executor = DropOldestExecutor(max_workers=1, maxsize=1, thread_name_prefix='test', on_drop=failing_on_drop)
+        blocker = BlockingTask()
+        executor.submit(blocker)
+        assert blocker.started.wait(5)
+
+        executor.submit(executed.append, 'old')
+        executor.submit(executed.append, 'new')
+        blocker.release.set()
+        executor.shutdown(wait=True)
+        assert executed == ['new']
+        assert executor.dropped_count == 1
+
+    def test_task_error_does_not_stop_worker(self):
+        """タスクが例外を送出してもワーカーは後続のタスクを実行すること"""
+        executed = []
+
+        def failing_task():
+            raise ValueError('boom')
+
+        executor = DropOldestExecutor(max_workers=1, maxsize=4, thread_name_prefix='test')
+        executor.submit(failing_task)
+        executor.submit(executed.append, 'after')
+        executor.shutdown(wait=True)
+        assert executed == ['after']
+
+    def test_shutdown_drains_queue(self):
+        """shutdownはキューに残ったタスクを処理してからワーカーを停止すること"""
+        executed = []
+        executor = DropOldestExecutor(max_workers=1, maxsize=8, thread_name_prefix='test')
+        blocker = BlockingTask()
+        executor.submit(blocker)
+        assert blocker.started.wait(5)
+        for i in range(5):
+            executor.submit(executed.append, i)
+
+        # shutdown(wait=True) で待機している間にワーカーを再開させる
+        threading.Timer(0.05, blocker.release.set).start()
+        executor.shutdown(wait=True)
+        assert executed == [0, 1, 2, 3, 4]
+        assert all(not thread.is_alive() for thread in executor._threads)
+
+    def test_submit_after_shutdown(self):
+        """shutdown後のsubmitはRuntimeErrorになり、shutdownの再呼び出しは何もしないこと"""
+        executor = DropOldestExecutor(max_workers=1, maxsize=1, thread_name_prefix='test')
+        executor.shutdown(wait=True)
+        with pytest.raises(RuntimeError):
+            executor.submit(print)
+        executor.shutdown(wait=True)
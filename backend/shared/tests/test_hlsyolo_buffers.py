@@ -0,0 +1,196 @@
+"""
+hlsyolo.py の FrameRingBuffer / TrackLogBuffer のテストコード
+"""
+import pytest
+import sys
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from queue import Empty
+from unittest import mock
+
+# パスを追加してshared・hlsyoloモジュールをインポート可能にする
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../collector/docker/hlsyolo')))
+# hlsyolo.py は必須の環境変数が未設定の場合に終了するため、テスト用の値を設定
+os.environ.setdefault('AWS_REGION', 'us-east-1')
+os.environ.setdefault('COLLECTOR_ID', 'test-collector')
+
+pytest.importorskip('av')
+pytest.importorskip('torch')
+
+import hlsyolo
+from hlsyolo import FrameRingBuffer, TrackLogBuffer
+
+
+class TestFrameRingBuffer:
+    """FrameRingBuffer のテスト"""
+
+    def test_fifo(self):
+        """古い順に取り出すこと"""
+        buffer = FrameRingBuffer(maxlen=3)
+        for i in range(3):
+            assert buffer.put(i) is None
+        assert [buffer.get(timeout=0) for _ in range(3)] == [0, 1, 2]
+
+    def test_drop_oldest_when_full(self):
+        """満杯の場合は最も古いフレームを破棄し、破棄したフレームを返すこと"""
+        buffer = FrameRingBuffer(maxlen=2)
+        buffer.put('a')
+        buffer.put('b')
+        assert buffer.put('c') == 'a'
+        assert buffer.get_batch(10, timeout=0) == ['b', 'c']
+
+    def test_get_timeout(self):
+        """空のままtimeoutを過ぎた場合はEmptyを送出すること"""
+        buffer = FrameRingBuffer(maxlen=1)
+        with pytest.raises(Empty):
+            buffer.get(timeout=0.01)
+        with pytest.raises(Empty):
+            buffer.get_batch(4, timeout=0.01)
+
+    def test_get_batch_limit(self):
+        """get_batchは最大max_items件を取り出し、残りは次回に回すこと"""
+        buffer = FrameRingBuffer(maxlen=10)
+        for i in range(5):
+            buffer.put(i)
+        assert buffer.get_batch(3, timeout=0) == [0, 1, 2]
+        assert buffer.get_batch(3, timeout=0) == [3, 4]
+
+    def test_wakes_waiting_consumer(self):
+        """待機中のコンシューマーがフレーム投入で起床すること"""
+        buffer = FrameRingBuffer(maxlen=1)
+        result = []
+        consumer = threading.Thread(target=lambda: result.append(buffer.get(timeout=5)))
+        consumer.start()
+        threading.Timer(0.05, buffer.put, args=('frame',)).start()
+        consumer.join(5)
+        assert result == ['frame']
+
+    def test_stop_signal(self):
+        """終了シグナル（None）もフレームと同様に取り出せること"""
+        buffer = FrameRingBuffer(maxlen=2)
+        buffer.put('frame')
+        buffer.put(None)
+        assert buffer.get_batch(2, timeout=0) == ['frame', None]
+
+
+class FakeTable:
+    """batch_writer で書き込まれた項目を記録するTable"""
+
+    def __init__(self, error=None):
+        self.batches = []
+        self.error = error
+        self._lock = threading.Lock()
+
+    def batch_writer(self):
+        table = self
+        items = []
+
+        class Writer:
+            def __enter__(self):
+                return self
+
+            def put_item(self, Item):
+                items.append(Item)
+
+            def __exit__(self, exc_type, exc, tb):
+                if exc_type is None:
+                    if table.error:
+                        raise table.error
+                    with table._lock:
+                        table.batches.append(list(items))
+                return False
+
+        return Writer()
+
+
+def make_buffer(table, executor=None):
+    dynamodb = mock.Mock()
+    dynamodb.Table.return_value = table
+    return TrackLogBuffer(dynamodb, executor)
+
+
+class TestTrackLogBuffer:
+    """TrackLogBuffer のテスト"""
+
+    def test_buffer_until_size(self):
+        """FLUSH_SIZE件に達するまで書き込まず、達したらまとめて書き込むこと"""
+        table = FakeTable()
+        buffer = make_buffer(table)
+        for i in range(TrackLogBuffer.FLUSH_SIZE - 1):
+            buffer.add({'track_log_id': str(i)})
+        assert table.batches == []
+
+        buffer.add({'track_log_id': 'last'})
+        assert len(table.batches) == 1
+        assert len(table.batches[0]) == TrackLogBuffer.FLUSH_SIZE
+
+    def test_async_flush_on_executor(self):
+        """executorがある場合はexecutor上で書き込むこと"""
+        table = FakeTable()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            buffer = make_buffer(table, executor)
+            for i in range(TrackLogBuffer.FLUSH_SIZE):
+                buffer.add({'track_log_id': str(i)})
+        assert [len(batch) for batch in table.batches] == [TrackLogBuffer.FLUSH_SIZE]
+
+    def test_immediate_flush(self):
+        """flush=Trueの場合は呼び出し元で即時に書き込むこと"""
+        table = FakeTable()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            buffer = make_buffer(table, executor)
+            buffer.add({'track_log_id': '1'})
+            buffer.add({'track_log_id': '2'}, flush=True)
+            # executorを待たずに書き込み済みであること
+            assert table.batches == [[{'track_log_id': '1'}, {'track_log_id': '2'}]]
+
+    def test_immediate_flush_raises_on_error(self):
+        """即時フラッシュの書き込み失敗は例外を送出すること（非同期フラッシュは送出しない）"""
+        table = FakeTable(error=RuntimeError('write failed'))
+        buffer = make_buffer(table)
+        with pytest.raises(RuntimeError):
+            buffer.add({'track_log_id': '1'}, flush=True)
+        buffer.add({'track_log_id': '2'})
+        buffer.flush()
+
+    def test_flush_if_due_waits_for_interval(self, monkeypatch):
+        """最も古いアイテムがFLUSH_INTERVAL_SECを超えるまではflush_if_dueで書き込まないこと"""
+        now = [1000.0]
+        monkeypatch.setattr(hlsyolo.time, 'monotonic', lambda: now[0])
+        table = FakeTable()
+        buffer = make_buffer(table)
+
+        buffer.flush_if_due()
+        buffer.add({'track_log_id': '1'})
+        now[0] += TrackLogBuffer.FLUSH_INTERVAL_SEC / 2
+        buffer.add({'track_log_id': '2'})
+        buffer.flush_if_due()
+        assert table.batches == []
+
+        # 最も古いアイテムからの経過時間で判定する（新しいアイテムの追加で延長しない）
+        now[0] += TrackLogBuffer.FLUSH_INTERVAL_SEC / 2
+        buffer.flush_if_due()
+        assert table.batches == [[{'track_log_id': '1'}, {'track_log_id': '2'}]]
+
+    def test_first_item_after_idle_is_batched(self, monkeypatch):
+        """しばらく追加がなかった後の最初のアイテムは単独でフラッシュしないこと"""
+        now = [1000.0]
+        monkeypatch.setattr(hlsyolo.time, 'monotonic', lambda: now[0])
+        table = FakeTable()
+        buffer = make_buffer(table)
+
+        now[0] += TrackLogBuffer.FLUSH_INTERVAL_SEC * 10
+        buffer.add({'track_log_id': '1'})
+        buffer.add({'track_log_id': '2'})
+        assert table.batches == []
+
+    def test_flush_writes_pending(self):
+        """flushは残っているアイテムをすべて書き込み、空のときは何もしないこと"""
+        table = FakeTable()
+        buffer = make_buffer(table)
+        buffer.flush()
+        buffer.add({'track_log_id': '1'})
+        buffer.flush()
+        buffer.flush()
+        assert table.batches == [[{'track_log_id': '1'}]]
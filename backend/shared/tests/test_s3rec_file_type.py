@@ -0,0 +1,62 @@
+"""
+s3rec.py の get_file_extension_and_type のテストコード
+"""
+import pytest
+import sys
+import os
+from unittest import mock
+
+# パスを追加してshared・s3recモジュールをインポート可能にする
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../collector/docker/s3rec')))
+# s3rec.py は必須の環境変数が未設定の場合に終了するため、テスト用の値を設定
+os.environ.setdefault('AWS_REGION', 'us-east-1')
+os.environ.setdefault('CAMERA_ID', 'test-camera')
+os.environ.setdefault('COLLECTOR_ID', 'test-collector')
+os.environ.setdefault('BUCKET_NAME', 'test-bucket')
+
+pytest.importorskip('boto3')
+
+# s3rec.py は起動時にカメラ情報を検証するため、DynamoDBを参照せずにs3タイプのカメラを返す
+with mock.patch('shared.common.get_camera_info', return_value={'camera_id': 'test-camera', 'type': 's3'}):
+    from s3rec import get_file_extension_and_type
+
+
+class TestGetFileExtensionAndType:
+    """get_file_extension_and_type のテスト"""
+
+    @pytest.mark.parametrize('content_type, key, expected', [
+        ('image/jpeg', 'cam/a.jpeg', ('jpg', 'image')),
+        ('image/png', 'cam/a.png', ('png', 'image')),
+        ('video/mp4', 'cam/a.mp4', ('mp4', 'video')),
+        ('IMAGE/JPEG', 'cam/a', ('jpg', 'image')),
+    ])
+    def test_known_content_type(self, content_type, key, expected):
+        """既知のContent-Typeはキーの拡張子より優先すること"""
+        assert get_file_extension_and_type(content_type, key) == expected
+
+    def test_content_type_wins_over_extension(self):
+        """Content-Typeと拡張子が食い違う場合はContent-Typeで判定すること"""
+        assert get_file_extension_and_type('video/mp4', 'cam/a.jpg') == ('mp4', 'video')
+
+    @pytest.mark.parametrize('content_type, key, expected', [
+        ('image/webp', 'cam/a.PNG', ('png', 'image')),
+        ('image/webp', 'cam/a.mp4', ('jpg', 'image')),
+        ('image/webp', 'cam/a', ('jpg', 'image')),
+        ('video/quicktime', 'cam/a.mov', ('mov', 'video')),
+        ('video/quicktime', 'cam/a.bin', ('mp4', 'video')),
+    ])
+    def test_unknown_subtype(self, content_type, key, expected):
+        """未知のサブタイプは同じタイプの拡張子を使い、なければタイプのデフォルトにすること"""
+        assert get_file_extension_and_type(content_type, key) == expected
+
+    @pytest.mark.parametrize('content_type, key, expected', [
+        ('', 'cam/a.JPEG', ('jpg', 'image')),
+        (None, 'cam/a.avi', ('avi', 'video')),
+        ('application/octet-stream', 'cam/a.gif', ('gif', 'image')),
+        ('', 'cam/a.unknown', ('jpg', 'image')),
+        ('', 'cam/no_extension', ('jpg', 'image')),
+    ])
+    def test_fallback_to_extension(self, content_type, key, expected):
+        """Content-Typeで判定できない場合はキーの拡張子で判定し、不明ならjpg画像とすること"""
+        assert get_file_extension_and_type(content_type, key) == expected
@@ -17,10 +17,17 @@ YOLO検出処理を提供します。
 """
 
 from .detector import YoloDetector
-from .class_detect import filter_detections_by_class, build_class_detect_data
+from .class_detect import (
+    filter_detections_by_class,
+    build_detection_arrays,
+    class_filter_mask,
+    build_class_detect_data
+)
 
 __all__ = [
     'YoloDetector',
     'filter_detections_by_class',
+    'build_detection_arrays',
+    'class_filter_mask',
     'build_class_detect_data'
 ]
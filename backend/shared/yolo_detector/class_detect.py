@@ -6,6 +6,7 @@ hlsyolo / s3yolo で共通利用する class_detect 処理を提供します。
 
 from typing import List, Dict, Any
 import logging
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +27,16 @@ def filter_detections_by_class(
     Returns:
         フィルタ後の検出結果
     """
-    collect_classes_lower = [c.lower() for c in collect_classes]
+    collect_classes_lower = frozenset(c.lower() for c in collect_classes)
+    
+    if len(collect_classes_lower) == 1:
+        # 単一クラス（例: ['person']）の場合は文字列比較のみで判定
+        (target_class,) = collect_classes_lower
+        return [
+            d for d in detections
+            if d['class'].lower() == target_class
+            and d['confidence'] >= confidence_threshold
+        ]
     
     return [
         d for d in detections
@@ -35,6 +45,68 @@ def filter_detections_by_class(
     ]
 
 
+def build_detection_arrays(detections: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    検出結果（辞書のリスト）をフィールドごとのNumPy配列に変換
+    
+    フィルタリングやエリア判定をベクトル化して一括処理するために使用する。
+    
+    Args:
+        detections: YoloDetector.detect()の結果
+        
+    Returns:
+        フィールドごとの配列 {
+            'classes': クラス名（小文字）(N,),
+            'confidences': 信頼度 (N,),
+            'bboxes': [x1, y1, x2, y2] (N, 4),
+            'centers': [cx, cy] (N, 2)
+        }
+    """
+    count = len(detections)
+    if count == 0:
+        return {
+            'classes': np.empty(0, dtype=str),
+            'confidences': np.empty(0, dtype=np.float64),
+            'bboxes': np.empty((0, 4), dtype=np.float64),
+            'centers': np.empty((0, 2), dtype=np.float64)
+        }
+    
+    return {
+        'classes': np.array([d['class'].lower() for d in detections]),
+        'confidences': np.fromiter((d['confidence'] for d in detections), dtype=np.float64, count=count),
+        'bboxes': np.asarray([d['bbox'] for d in detections], dtype=np.float64),
+        'centers': np.asarray([d['center'] for d in detections], dtype=np.float64)
+    }
+
+
+def class_filter_mask(
+    detection_arrays: Dict[str, np.ndarray],
+    collect_classes: List[str],
+    confidence_threshold: float
+) -> np.ndarray:
+    """
+    クラスと信頼度によるフィルタリング結果をbool配列で取得（ベクトル化版）
+    
+    Args:
+        detection_arrays: build_detection_arrays()の結果
+        collect_classes: 収集対象クラスリスト（例: ['person', 'car']）
+        confidence_threshold: 信頼度閾値
+        
+    Returns:
+        検出ごとのフィルタ通過判定（bool配列）
+    """
+    collect_classes_lower = [c.lower() for c in collect_classes]
+    classes = detection_arrays['classes']
+    
+    if len(collect_classes_lower) == 1:
+        # 単一クラス（例: ['person']）の場合はnp.isinを使わず要素ごとの比較で判定
+        class_mask = classes == collect_classes_lower[0]
+    else:
+        class_mask = np.isin(classes, collect_classes_lower)
+    
+    return class_mask & (detection_arrays['confidences'] >= confidence_threshold)
+
+
 def build_class_detect_data(
     detections: List[Dict[str, Any]],
     filtered_detections: List[Dict[str, Any]]
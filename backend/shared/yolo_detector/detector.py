@@ -35,6 +35,10 @@ IS_LAMBDA = os.environ.get('AWS_LAMBDA_FUNCTION_NAME') is not None
 if IS_LAMBDA:
     logger.info("Lambda環境を検出しました（ワンショット検出モード）")
 
+# 事前学習済み重みの配置ディレクトリ
+# Lambda環境ではYOLOが/tmp/weightsにダウンロードするため、同じサンドボックスでの再初期化時はそれを再利用する
+YOLO_WEIGHTS_DIR = os.environ.get('YOLO_WEIGHTS_DIR', '/tmp/weights' if IS_LAMBDA else '')  # nosec B108
+
 # =============================================================================
 # 環境依存のインポート
 # - ECS Fargate: supervision/cv2を使用（トラッキング、アノテーション）
@@ -48,6 +52,76 @@ if not IS_LAMBDA:
     import supervision as sv
     import cv2
 
+# Numba（前処理の高速化用、オプション）
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    prange = range
+    NUMBA_AVAILABLE = False
+
+# レターボックスのパディング色（YOLOv9 MITのPadAndResizeと同じ114）を0-1に正規化した値
+LETTERBOX_PAD_VALUE = 114 / 255.0
+
+
+def _letterbox_to_chw(image_rgb, out_chw, scale, pad_left, pad_top, new_w, new_h, pad_value):
+    """
+    RGB画像をレターボックス（バイリニア縮小+パディング）・0-1正規化・HWC→CHW変換して書き込む
+    
+    画像を1回だけ走査し、モデル入力テンソルに直接書き込む（PIL変換・リサイズ・パディング・
+    テンソル化を個別に行う場合の複数パスをまとめる）。
+    
+    Args:
+        image_rgb: 入力画像 (H, W, 3) uint8
+        out_chw: 出力テンソル (3, out_h, out_w) float32
+        scale: 縮小率
+        pad_left: 左パディング（ピクセル）
+        pad_top: 上パディング（ピクセル）
+        new_w: リサイズ後の幅
+        new_h: リサイズ後の高さ
+        pad_value: パディング値（0-1）
+    """
+    src_h = image_rgb.shape[0]
+    src_w = image_rgb.shape[1]
+    out_h = out_chw.shape[1]
+    out_w = out_chw.shape[2]
+    inv_scale = 1.0 / scale
+    
+    for y in prange(out_h):
+        oy = y - pad_top
+        if oy < 0 or oy >= new_h:
+            for x in range(out_w):
+                for c in range(3):
+                    out_chw[c, y, x] = pad_value
+            continue
+        
+        # 出力画素中心に対応する入力座標（縦方向）
+        sy = min(max((oy + 0.5) * inv_scale - 0.5, 0.0), src_h - 1.0)
+        y0 = int(sy)
+        y1 = min(y0 + 1, src_h - 1)
+        wy = sy - y0
+        
+        for x in range(out_w):
+            ox = x - pad_left
+            if ox < 0 or ox >= new_w:
+                for c in range(3):
+                    out_chw[c, y, x] = pad_value
+                continue
+            
+            sx = min(max((ox + 0.5) * inv_scale - 0.5, 0.0), src_w - 1.0)
+            x0 = int(sx)
+            x1 = min(x0 + 1, src_w - 1)
+            wx = sx - x0
+            
+            for c in range(3):
+                top = image_rgb[y0, x0, c] * (1.0 - wx) + image_rgb[y0, x1, c] * wx
+                bottom = image_rgb[y1, x0, c] * (1.0 - wx) + image_rgb[y1, x1, c] * wx
+                out_chw[c, y, x] = (top * (1.0 - wy) + bottom * wy) / 255.0
+
+
+if NUMBA_AVAILABLE:
+    _letterbox_to_chw = njit(parallel=True, fastmath=True)(_letterbox_to_chw)
+
 
 class YoloDetector:
     """YOLO検出クラス（トラッキング付き）"""
@@ -58,7 +132,8 @@ class YoloDetector:
         custom_weights: str = None,
         custom_dataset: str = 'coco',
         conf_threshold: float = 0.3,
-        config_base_path: str = 'shared/yolo_detector/yolo/config'
+        config_base_path: str = 'shared/yolo_detector/yolo/config',
+        use_numba_preprocess: bool = False
     ):
         """
         YOLODetectorを初期化
@@ -69,6 +144,8 @@ class YoloDetector:
             custom_dataset: データセット名（デフォルト: 'coco'）
             conf_threshold: 検出信頼度閾値
             config_base_path: YOLOモデル設定ファイルのベースパス
+            use_numba_preprocess: numpy array入力の前処理をNumbaカーネルで行う
+                                  （バイリニア縮小のため、PILのLANCZOS縮小とは画素値がわずかに異なる）
         """
         self.model_path = model_path
         self.custom_weights = custom_weights
@@ -81,6 +158,14 @@ class YoloDetector:
         self.post_process = None
         self.transform = None
         self.class_names = []
+        self.image_size = (640, 640)
+        
+        # Numbaが利用できない環境では従来の前処理を使用
+        self.use_numba_preprocess = use_numba_preprocess and NUMBA_AVAILABLE
+        # Numba前処理の出力先 (N, 3, H, W)（呼び出しごとに確保せず、最大バッチサイズ分を使い回す）
+        self._preprocess_buffer = None
+        if use_numba_preprocess and not NUMBA_AVAILABLE:
+            logger.warning("Numba がインストールされていません。前処理はYOLOv9標準の変換で実行します。")
         
         # トラッキング関連
         self.tracker = None
@@ -89,8 +174,18 @@ class YoloDetector:
         
         # デバイス設定
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        # GPU環境ではFP16（autocast）で推論する（Tensor Coreを使用）
+        self.use_fp16 = self.device.type == 'cuda'
+        # CPU環境ではchannels_last（NHWC）で推論する（oneDNNの最適化カーネルを使用）
+        self.use_channels_last = self.device.type == 'cpu'
+        # GPU環境では専用CUDAストリームで転送・推論を非同期に実行する
+        self.cuda_stream = torch.cuda.Stream() if self.device.type == 'cuda' else None
         
         self._load_model()
+        
+        if self.use_numba_preprocess:
+            # 初回推論時にJITコンパイルの待ちが発生しないよう、初期化時にコンパイルしておく
+            self._preprocess_numba(np.zeros((2, 2, 3), dtype=np.uint8))
     
     def _load_model(self):
         """YOLOモデルを読み込む"""
@@ -141,14 +236,30 @@ class YoloDetector:
                 self.model = create_model(model_cfg, weight_path=self.custom_weights, class_num=class_num)
             else:
                 logger.info(f"事前学習済み重み（COCO）を使用")
-                self.model = create_model(model_cfg, weight_path=True, class_num=80)
+                weight_file = Path(YOLO_WEIGHTS_DIR) / f"{self.model_path}.pt" if YOLO_WEIGHTS_DIR else None
+                if weight_file is not None and weight_file.exists():
+                    # 配置済みの重みをmmapで読み込む（チェックポイント全体をメモリにコピーせず、ページキャッシュを利用）
+                    logger.info(f"配置済みの重みを読み込み: {weight_file}")
+                    self.model = create_model(model_cfg, weight_path=False, class_num=80)
+                    self.model.save_load_weights(
+                        torch.load(weight_file, map_location='cpu', mmap=True, weights_only=False)
+                    )
+                else:
+                    self.model = create_model(model_cfg, weight_path=True, class_num=80)
             
             self.model = self.model.to(self.device).eval()
+            if self.device.type == 'cuda':
+                # 入力サイズは640x640固定のため、cuDNNに最速の畳み込みアルゴリズムを選ばせる
+                torch.backends.cudnn.benchmark = True
+            if self.use_channels_last:
+                self.model = self.model.to(memory_format=torch.channels_last)
+                # 推論スレッド数をタスクに割り当てられたvCPU数に合わせる
+                if hasattr(os, 'sched_getaffinity'):
+                    torch.set_num_threads(len(os.sched_getaffinity(0)))
             
             # 4. ボックス変換器作成
-            image_size = (640, 640)
             self.converter = create_converter(
-                model_cfg.name, self.model, model_cfg.anchor, image_size, self.device
+                model_cfg.name, self.model, model_cfg.anchor, self.image_size, self.device
             )
             
             # 5. NMS設定
@@ -176,6 +287,8 @@ class YoloDetector:
             
             logger.info("YOLOv9 Detectorの初期化が完了しました")
             logger.info(f"  - デバイス: {self.device}")
+            logger.info(f"  - FP16推論: {self.use_fp16}")
+            logger.info(f"  - channels_last推論: {self.use_channels_last} (スレッド数: {torch.get_num_threads()})")
             logger.info(f"  - モデル: {self.model_path}")
             logger.info(f"  - クラス数: {len(self.class_names)}")
             
@@ -212,7 +325,122 @@ class YoloDetector:
                 }, ...
             ]
         """
-        # 1. フレーム変換（pyav → PIL Image）
+        image_tensor, rev_tensor = self._preprocess_batch([frame])
+        pred_bbox = self._infer(image_tensor, rev_tensor)
+        
+        return self._build_detections(pred_bbox[0] if len(pred_bbox) > 0 else [])
+    
+    def detect_batch(self, frames: List[Any]) -> List[List[Dict[str, Any]]]:
+        """
+        複数フレームをまとめて検出・トラッキング（推論は1回のバッチ実行）
+        
+        トラッキングはフレーム順に逐次更新するため、ストリームの連続フレームを渡すこと。
+        
+        Args:
+            frames: pyav.VideoFrame または numpy array (RGB) のリスト（同一ストリーム、時系列順）
+            
+        Returns:
+            フレームごとの検出結果リスト（各要素は detect() の戻り値と同じ形式）
+        """
+        if not frames:
+            return []
+        
+        image_tensor, rev_tensor = self._preprocess_batch(frames)
+        
+        # YOLOv9推論（バッチ）
+        pred_bbox = self._infer(image_tensor, rev_tensor)
+        
+        return [
+            self._build_detections(pred_bbox[i] if i < len(pred_bbox) else [])
+            for i in range(len(frames))
+        ]
+    
+    def _infer(self, image_tensor: torch.Tensor, rev_tensor: torch.Tensor) -> list:
+        """
+        YOLOv9推論とpost_process（NMS）を実行
+        
+        Args:
+            image_tensor: 画像テンソル (B, 3, H, W)
+            rev_tensor: 座標逆変換用テンソル (B, 5)
+            
+        Returns:
+            フレームごとのpost_process出力リスト
+        """
+        if self.cuda_stream is not None:
+            return self._infer_cuda(image_tensor, rev_tensor)
+        
+        image_tensor = image_tensor.to(self.device)
+        rev_tensor = rev_tensor.to(self.device)
+        if self.use_channels_last:
+            image_tensor = image_tensor.contiguous(memory_format=torch.channels_last)
+        
+        with torch.inference_mode():
+            return self.post_process(self.model(image_tensor), rev_tensor)
+    
+    def _infer_cuda(self, image_tensor: torch.Tensor, rev_tensor: torch.Tensor) -> list:
+        """
+        専用CUDAストリーム上で転送・推論・post_processを実行（_inferのGPU版）
+        
+        入力はピン留めメモリから非同期にH2D転送し、出力も非同期にD2H転送する。
+        同期は結果を読む直前の1回のみで、待機中はGILが解放されデコードスレッドが動作できる。
+        """
+        with torch.inference_mode(), torch.cuda.stream(self.cuda_stream):
+            image_tensor = image_tensor.pin_memory().to(self.device, non_blocking=True)
+            rev_tensor = rev_tensor.pin_memory().to(self.device, non_blocking=True)
+            
+            # モデル本体のみFP16で実行（post_processの座標変換・NMSはFP32のまま）
+            with torch.autocast(device_type='cuda', dtype=torch.float16, enabled=self.use_fp16):
+                predict = self.model(image_tensor)
+            pred_bbox = self.post_process(predict, rev_tensor)
+            pred_bbox = [bbox.to('cpu', non_blocking=True) for bbox in pred_bbox]
+        
+        self.cuda_stream.synchronize()
+        return pred_bbox
+    
+    def _preprocess_batch(self, frames: List[Any]) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        複数フレームをYOLOv9のバッチ入力テンソルに変換
+        
+        Numba前処理が有効でnumpy array入力の場合は、再利用バッファの各スライスに直接書き込む
+        （フレームごとのテンソル確保とスタック時のコピーを行わない）。
+        バッファは次の呼び出しで上書きされるため、推論は同一スレッドから逐次に呼び出すこと。
+        
+        Args:
+            frames: pyav.VideoFrame または numpy array (RGB) のリスト
+            
+        Returns:
+            (画像テンソル (B, 3, H, W), 座標逆変換用テンソル (B, 5))
+        """
+        if self.use_numba_preprocess and all(isinstance(frame, np.ndarray) for frame in frames):
+            target_w, target_h = self.image_size
+            if self._preprocess_buffer is None or self._preprocess_buffer.shape[0] < len(frames):
+                self._preprocess_buffer = np.empty((len(frames), 3, target_h, target_w), dtype=np.float32)
+            batch = self._preprocess_buffer[:len(frames)]
+            rev_tensor = torch.stack([
+                self._preprocess_numba(frame, batch[i])[1] for i, frame in enumerate(frames)
+            ])
+            return torch.from_numpy(batch), rev_tensor
+        
+        # 前処理（640x640にリサイズ・パディングされるため、そのままスタック可能）
+        preprocessed = [self._preprocess(frame) for frame in frames]
+        image_tensor = torch.stack([image for image, _ in preprocessed])
+        rev_tensor = torch.stack([rev for _, rev in preprocessed])
+        return image_tensor, rev_tensor
+    
+    def _preprocess(self, frame) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        フレームをYOLOv9の入力テンソルに変換
+        
+        Args:
+            frame: pyav.VideoFrame または numpy array (RGB)
+            
+        Returns:
+            (画像テンソル, 座標逆変換用テンソル)（バッチ次元なし）
+        """
+        if self.use_numba_preprocess and isinstance(frame, np.ndarray):
+            return self._preprocess_numba(frame)
+        
+        # フレーム変換（pyav → PIL Image）
         if hasattr(frame, 'to_ndarray'):
             img_np = frame.to_ndarray(format='rgb24')
             img = Image.fromarray(img_np)
@@ -220,27 +448,59 @@ class YoloDetector:
             # numpy array (RGB) → PIL Image
             img = Image.fromarray(frame)
         
-        # 2. YOLOv9の前処理
+        # YOLOv9の前処理
         image_tensor, _, rev_tensor = self.transform(img)
-        image_tensor = image_tensor.to(self.device)[None]
-        rev_tensor = rev_tensor.to(self.device)[None]
+        return image_tensor, rev_tensor
+    
+    def _preprocess_numba(self, image_rgb: np.ndarray, out_chw: np.ndarray = None) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        numpy array (RGB) をNumbaカーネルでYOLOv9の入力テンソルに変換（_preprocessの高速版）
         
-        # 3. YOLOv9推論
-        with torch.no_grad():
-            predict = self.model(image_tensor)
-            pred_bbox = self.post_process(predict, rev_tensor)
+        座標逆変換用テンソルはYOLOv9のPadAndResizeと同じ [scale, pad_left, pad_top, pad_left, pad_top]。
+        
+        Args:
+            image_rgb: numpy array (RGB, uint8)
+            out_chw: 出力先 (3, H, W) float32（省略時は新たに確保）
+            
+        Returns:
+            (画像テンソル, 座標逆変換用テンソル)（バッチ次元なし）
+        """
+        src_h, src_w = image_rgb.shape[:2]
+        target_w, target_h = self.image_size
+        scale = min(target_w / src_w, target_h / src_h)
+        new_w, new_h = int(src_w * scale), int(src_h * scale)
+        pad_left = (target_w - new_w) // 2
+        pad_top = (target_h - new_h) // 2
+        
+        if out_chw is None:
+            out_chw = np.empty((3, target_h, target_w), dtype=np.float32)
+        _letterbox_to_chw(
+            np.ascontiguousarray(image_rgb, dtype=np.uint8), out_chw,
+            float(scale), pad_left, pad_top, new_w, new_h, LETTERBOX_PAD_VALUE
+        )
+        
+        rev_tensor = torch.tensor([scale, pad_left, pad_top, pad_left, pad_top], dtype=torch.float32)
+        return torch.from_numpy(out_chw), rev_tensor
+    
+    def _build_detections(self, frame_pred_bbox) -> List[Dict[str, Any]]:
+        """
+        1フレーム分のpost_process出力を検出結果に変換（信頼度フィルタ・トラッキング）
         
+        Args:
+            frame_pred_bbox: post_process出力の1フレーム分 [class_id, x1, y1, x2, y2, confidence] (N, 6)
+            
+        Returns:
+            検出結果のリスト（detect() の戻り値と同じ形式）
+        """
         # デバッグ: post_process出力を確認
-        logger.debug(f"YOLOv9 post_process結果: pred_bbox len={len(pred_bbox)}, " + 
-                    (f"pred_bbox[0] len={len(pred_bbox[0])}" if len(pred_bbox) > 0 else "empty") +
-                    f", 信頼度閾値={self.conf_threshold}")
+        logger.debug(f"YOLOv9 post_process結果: pred_bbox len={len(frame_pred_bbox)}, 信頼度閾値={self.conf_threshold}")
         
-        # 4. 結果をnumpy arrayに変換
-        if len(pred_bbox) == 0 or len(pred_bbox[0]) == 0:
+        # 結果をnumpy arrayに変換
+        if len(frame_pred_bbox) == 0:
             logger.debug("YOLOv9検出: 0個")
             return []
         
-        boxes = np.array(pred_bbox[0])
+        boxes = np.array(frame_pred_bbox)
         
         # YOLOv9の出力形式: [class_id, x1, y1, x2, y2, confidence]
         class_ids = boxes[:, 0].astype(int)
@@ -264,7 +524,7 @@ class YoloDetector:
         
         logger.debug(f"YOLOv9検出（フィルタ後）: {len(confidences)}個 - 信頼度: {confidences[:5] if len(confidences) > 0 else []}")
         
-        # 5. トラッキング処理
+        # トラッキング処理
         # - ECS Fargate: ByteTrackでトラッキング（track_id, velocity等を付与）
         # - Lambda: ワンショット検出（トラッキングなし）
         if not IS_LAMBDA and self.tracker is not None:
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useCallback, useMemo } from 'react';
+import React, { useState, useEffect, useCallback, useMemo, useRef } from 'react';
 import { useNavigate, Link } from 'react-router-dom';
 import { 
   Container, 
@@ -666,7 +666,7 @@ const HorizontalBarChartComponent = ({ data, onDataPointClick, granularity, sele
 };
 
 // Detail Panel Component
-const DetailPanel = ({ detailLogs, isLoading, selectedDataPoint, generateDetailLogUrl, t }) => {
+const DetailPanel = ({ detailLogs, isLoading, selectedDataPoint, generateDetailLogUrl, hasMore, isLoadingMore, onLoadMore, t }) => {
   const navigate = useNavigate();
   // ISO文字列→yyyymmddhhmi変換
   const toYYYYMMDDHHMI = (isoString) => {
@@ -781,6 +781,19 @@ const DetailPanel = ({ detailLogs, isLoading, selectedDataPoint, generateDetailL
               </Box>
             ))}
           </List>
+          {hasMore && (
+            <Box sx={{ display: 'flex', justifyContent: 'center', p: 1 }}>
+              <Button
+                variant="text"
+                size="small"
+                onClick={onLoadMore}
+                disabled={isLoadingMore}
+                startIcon={isLoadingMore ? <CircularProgress size={16} /> : null}
+              >
+                {t('pages:insight.loadMoreLogs')}
+              </Button>
+            </Box>
+          )}
           {detailLogs.length === 0 && (
             <Typography variant="body2" color="text.secondary" sx={{ textAlign: 'center', p: 2 }}>
               {t('pages:insight.noLogsFound')}
@@ -970,7 +983,10 @@ const Insight = () => {
   const [selectedTags, setSelectedTags] = useState([]);
   const [timeseriesData, setTimeseriesData] = useState([]);
   const [detailLogs, setDetailLogs] = useState([]);
+  const [detailLogsPagination, setDetailLogsPagination] = useState(null);
   const [selectedDataPoint, setSelectedDataPoint] = useState(null);
+  // 非同期取得の完了時に最新の選択と比較するための参照
+  const selectedDataPointRef = useRef(null);
   const [activeTab, setActiveTab] = useState(0);
   const [timeRange, setTimeRange] = useState({ startTime: null, endTime: null });
   
@@ -982,6 +998,7 @@ const Insight = () => {
   const [isLoadingTags, setIsLoadingTags] = useState(false);
   const [isLoadingTimeseries, setIsLoadingTimeseries] = useState(false);
   const [isLoadingDetails, setIsLoadingDetails] = useState(false);
+  const [isLoadingMoreDetails, setIsLoadingMoreDetails] = useState(false);
   
   // Error state
   const [error, setError] = useState(null);
@@ -1140,7 +1157,9 @@ const Insight = () => {
     } else {
       setTimeseriesData([]);
       setSelectedDataPoint(null);
+      selectedDataPointRef.current = null;
       setDetailLogs([]);
+      setDetailLogsPagination(null);
     }
   }, [selectedTags, granularity, selectedPlace, selectedCamera, timeRange]);
 
@@ -1286,6 +1305,7 @@ const Insight = () => {
 
   const handleDataPointClick = async (dataPoint) => {
     setSelectedDataPoint(dataPoint);
+    selectedDataPointRef.current = dataPoint;
     
     // 詳細ログ取得時に自動展開
     if (isDetailPanelCollapsed) {
@@ -1309,12 +1329,44 @@ const Insight = () => {
         selectedPlace || null,
         selectedCamera || null
       );
+      // 取得中に別のデータポイントが選択された場合は古い結果で上書きしない
+      if (selectedDataPointRef.current !== dataPoint) return;
       setDetailLogs(data.logs);
+      setDetailLogsPagination(data.pagination || null);
+    } catch (err) {
+      setError(t('pages:insight.detailLogFailed'));
+      console.error(err);
+    } finally {
+      if (selectedDataPointRef.current === dataPoint) {
+        setIsLoadingDetails(false);
+      }
+    }
+  };
+
+  // 詳細ログの次ページを取得して末尾に追加
+  const handleLoadMoreDetails = async () => {
+    if (!selectedDataPoint || !detailLogsPagination?.has_next) return;
+    
+    const requestedDataPoint = selectedDataPoint;
+    try {
+      setIsLoadingMoreDetails(true);
+      const data = await getTimeseriesDetailLogs(
+        requestedDataPoint.startTime,
+        requestedDataPoint.endTime,
+        requestedDataPoint.tagName,
+        selectedPlace || null,
+        selectedCamera || null,
+        detailLogsPagination.current_page + 1
+      );
+      // 取得中に別のデータポイントが選択された場合は古い結果を追加しない
+      if (selectedDataPointRef.current !== requestedDataPoint) return;
+      setDetailLogs(prev => [...prev, ...data.logs]);
+      setDetailLogsPagination(data.pagination || null);
     } catch (err) {
       setError(t('pages:insight.detailLogFailed'));
       console.error(err);
     } finally {
-      setIsLoadingDetails(false);
+      setIsLoadingMoreDetails(false);
     }
   };
 
@@ -1451,6 +1503,9 @@ const Insight = () => {
                 isLoading={isLoadingDetails}
                 selectedDataPoint={selectedDataPoint}
                 generateDetailLogUrl={generateDetailLogUrl}
+                hasMore={!!detailLogsPagination?.has_next}
+                isLoadingMore={isLoadingMoreDetails}
+                onLoadMore={handleLoadMoreDetails}
                 t={t}
               />
             </Grid>
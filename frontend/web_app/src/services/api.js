@@ -600,7 +600,7 @@ export const getTimeseriesData = async (tags, granularity, placeId = null, camer
   }
 };
 
-export const getTimeseriesDetailLogs = async (startTime, endTime, tagName, placeId = null, cameraId = null) => {
+export const getTimeseriesDetailLogs = async (startTime, endTime, tagName, placeId = null, cameraId = null, page = 1, limit = 50) => {
   try {
     const headers = await getAuthHeaders();
     const baseUrl = getApiBaseUrl();
@@ -615,7 +615,9 @@ export const getTimeseriesDetailLogs = async (startTime, endTime, tagName, place
         end_time: endTime,
         tag_name: tagName,
         place_id: placeId,
-        camera_id: cameraId
+        camera_id: cameraId,
+        page,
+        limit
       })
     });
     
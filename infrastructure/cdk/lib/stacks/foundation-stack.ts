@@ -153,6 +153,12 @@ export class FoundationStack extends cdk.Stack {
       removalPolicy: cdk.RemovalPolicy.DESTROY,
     });
 
+    this.cameraTable.addGlobalSecondaryIndex({
+      indexName: 'globalindex1',
+      partitionKey: { name: 'place_id', type: dynamodb.AttributeType.STRING },
+      projectionType: dynamodb.ProjectionType.KEYS_ONLY,
+    });
+
     this.collectorTable = new dynamodb.Table(this, 'CollectorTable', {
       tableName: TABLE_NAMES.COLLECTOR,
       partitionKey: { name: 'collector_id', type: dynamodb.AttributeType.STRING },